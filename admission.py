@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are admitted first."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class ServerBusyError(Exception):
+    """Raised when a call is rejected because the server is at capacity."""
+
+
+class AdmissionController:
+    """Async admission control with a global limit, per-tool limits and priorities.
+
+    A call runs once both a global slot and a slot for its tool are free.
+    Otherwise it waits in a bounded queue ordered by priority (then arrival),
+    so cheap high-priority lookups overtake queued heavy calls. When the queue
+    is full the call is rejected immediately, and a call that waits longer
+    than max_wait is rejected rather than left hanging; either way the caller
+    gets a ServerBusyError instead of holding a connection it cannot use.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_wait: Optional[float] = None,
+        tool_limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            max_concurrent: Calls allowed to run at once across all guarded tools
+            max_queue: Calls allowed to wait at once; further calls are rejected
+            max_wait: Seconds a call may wait before it is rejected (None waits forever)
+            tool_limits: Per-tool concurrency limits, overriding the decorator's defaults
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.tool_limits: Dict[str, Optional[int]] = dict(tool_limits or {})
+        self._running = 0
+        self._running_by_tool: Dict[str, int] = {}
+        self._queued = 0
+        self._queued_by_tool: Dict[str, int] = {}
+        # Heap of [priority, sequence, tool, future]; entries whose future is done are stale
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def admit(self, priority: Priority = Priority.NORMAL, max_concurrent: Optional[int] = None):
+        """Decorator guarding an async tool function with admission control.
+
+        Args:
+            priority: Admission priority of the tool's calls
+            max_concurrent: Default concurrency limit for this tool (None for
+                no per-tool limit); a tool_limits entry takes precedence
+        """
+        def decorator(fn: Callable[..., Any]):
+            tool = fn.__name__
+            self.tool_limits.setdefault(tool, max_concurrent)
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                await self.acquire(tool, priority)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.release(tool)
+            return wrapper
+        return decorator
+
+    def _tool_stats(self, tool: str) -> Dict[str, Any]:
+        return self._stats.setdefault(tool, {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "waited": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0
+        })
+
+    def _has_capacity(self, tool: str) -> bool:
+        limit = self.tool_limits.get(tool)
+        return self._running < self.max_concurrent and (limit is None or self._running_by_tool.get(tool, 0) < limit)
+
+    def _start(self, tool: str) -> None:
+        self._running += 1
+        self._running_by_tool[tool] = self._running_by_tool.get(tool, 0) + 1
+
+    def _dequeue(self, tool: str) -> None:
+        self._queued -= 1
+        self._queued_by_tool[tool] -= 1
+
+    async def acquire(self, tool: str, priority: Priority = Priority.NORMAL) -> float:
+        """Wait for a slot for one call of `tool`; returns the seconds waited.
+
+        Raises:
+            ServerBusyError: If the queue is full or the wait exceeds max_wait
+        """
+        stats = self._tool_stats(tool)
+        if self._queued == 0 and self._has_capacity(tool):
+            self._start(tool)
+            stats["admitted"] += 1
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            stats["rejected_queue_full"] += 1
+            raise ServerBusyError(
+                f"Server busy: {self._running} calls running and {self._queued} waiting. Retry shortly."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [int(priority), next(self._sequence), tool, future])
+        self._queued += 1
+        self._queued_by_tool[tool] = self._queued_by_tool.get(tool, 0) + 1
+        started = time.monotonic()
+        # A higher-priority call may be admissible right away
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Admitted just as the wait ended; hand the slot on
+                self.release(tool)
+            else:
+                self._dequeue(tool)
+            if isinstance(e, asyncio.TimeoutError):
+                stats["rejected_timeout"] += 1
+                raise ServerBusyError(f"Server busy: {tool} waited {self.max_wait:g}s without a free slot. Retry shortly.")
+            raise
+
+        waited = time.monotonic() - started
+        stats["admitted"] += 1
+        stats["waited"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        return waited
+
+    def release(self, tool: str) -> None:
+        """Free the slot held by one call of `tool` and admit waiting calls."""
+        self._running -= 1
+        self._running_by_tool[tool] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiting calls in priority order while slots are free."""
+        blocked = []
+        while self._waiters and self._running < self.max_concurrent:
+            entry = heapq.heappop(self._waiters)
+            _, _, tool, future = entry
+            if future.done():
+                continue
+            if not self._has_capacity(tool):
+                # Tool at its own limit; let lower-priority calls of other tools through
+                blocked.append(entry)
+                continue
+            self._dequeue(tool)
+            self._start(tool)
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limits, current load and per-tool admission and wait metrics."""
+        tools = {}
+        for tool, stats in self._stats.items():
+            tools[tool] = dict(
+                stats,
+                limit=self.tool_limits.get(tool),
+                running=self._running_by_tool.get(tool, 0),
+                queued=self._queued_by_tool.get(tool, 0),
+                wait_seconds_total=round(stats["wait_seconds_total"], 3),
+                wait_seconds_max=round(stats["wait_seconds_max"], 3),
+                wait_seconds_avg=round(stats["wait_seconds_total"] / stats["waited"], 3) if stats["waited"] else 0.0
+            )
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "running": self._running,
+            "queued": self._queued,
+            "tools": tools
+        }
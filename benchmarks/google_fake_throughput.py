@@ -0,0 +1,80 @@
+"""Measure Google tool throughput and retry behavior against the local fake backend.
+
+Starts fake_google.FakeGoogleWorkspace in-process with the given latency,
+quota and injected errors, points the server's clients at it, fires
+concurrent read_sheet calls through the MCP tool layer and reports calls per
+second alongside the scheduler's retry/throttle counters. The server's own
+quota limits (GOOGLE_SHEETS_RPM, ...) still apply; raise them to measure the
+backend rather than the scheduler.
+
+    python benchmarks/google_fake_throughput.py --calls 200 --concurrency 16 --latency 0.05
+    python benchmarks/google_fake_throughput.py --quota sheets=120 --errors 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_google import FakeGoogleWorkspace  # noqa: E402
+
+
+async def run(args) -> dict:
+    import datahubmcp
+
+    rows = [['ID', 'Name', 'Score']] + [[i, f'Name {i}', i % 100] for i in range(1, args.rows + 1)]
+    spreadsheet_ids = [fake.add_spreadsheet(f'Bench {n}', rows) for n in range(args.spreadsheets)]
+    for _ in range(args.errors):
+        fake.inject_error('sheets', status=503)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one_call(n: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await datahubmcp.mcp.call_tool('read_sheet', {
+                'spreadsheet_id': spreadsheet_ids[n % len(spreadsheet_ids)],
+                'range_name': 'Sheet1',
+                'chunk_rows': args.rows + 1
+            })
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_call(n) for n in range(args.calls)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'calls': args.calls,
+        'elapsed_seconds': round(elapsed, 3),
+        'calls_per_second': round(args.calls / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        'scheduler': datahubmcp.google_api.stats(),
+        'sheet_cache': datahubmcp.sheet_cache.stats(),
+        'fake_backend': fake.stats()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--spreadsheets', type=int, default=10, help='distinct spreadsheets to spread calls over')
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake backend latency per request (seconds)')
+    parser.add_argument('--quota', action='append', default=[], metavar='API=RPM')
+    parser.add_argument('--errors', type=int, default=0, help='503 responses to inject into Sheets requests')
+    args = parser.parse_args()
+
+    quotas = {api: int(rpm) for api, rpm in (q.split('=', 1) for q in args.quota)}
+    fake = FakeGoogleWorkspace(latency=args.latency, quotas=quotas).start()
+    os.environ['GOOGLE_API_FAKE_URL'] = fake.url
+    try:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+    finally:
+        fake.stop()
@@ -0,0 +1,152 @@
+"""Measure per-call Python overhead of the hot query tools' SQL statements.
+
+Runs query_attendance_logs and query_drdp_records against a small, indexed
+temporary SQLite database, where the database work per call is tiny and the
+time is dominated by SQLAlchemy statement building, compilation and row
+loading. Each tool is timed next to the ORM Query chain it used to build on
+every call (same filters, ordering, limit and serialization), and the
+compiled-statement cache counters are reported to show that the tools'
+prebuilt statements hit the cache.
+
+    python benchmarks/query_overhead.py
+    python benchmarks/query_overhead.py --calls 5000 --rows 2000 --limit 20
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def use_sqlite(path: str, rows: int) -> None:
+    """Point the server's primary engine at a seeded SQLite file."""
+    import database
+    import models
+    from sqlalchemy import Index, create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{path}", query_cache_size=database.DB_QUERY_CACHE_SIZE)
+    models.Base.metadata.create_all(engine, tables=[models.DailyAttendanceLog.__table__, models.DRDPRecord.__table__])
+    Index("bench_attendance_date", models.DailyAttendanceLog.Form_Date).create(engine)
+    Index("bench_drdp_submit", models.DRDPRecord.Submit_Datetime).create(engine)
+    database._engine = engine
+    database._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    database.track_statement_cache(engine, "benchmark")
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    with database.get_db_session() as db:
+        database.bulk_insert(db, models.DailyAttendanceLog, [
+            {"Form_ID": f"A{i}", "Site_ID": f"S{i % 10}", "Room_ID": f"R{i % 40}", "Form_Date": today - timedelta(days=i % 80),
+             "DOR": today - timedelta(days=i % 80), "Breakfast": i % 12, "Lunch": i % 15, "PM_Snack": i % 9}
+            for i in range(rows)
+        ])
+        database.bulk_insert(db, models.DRDPRecord, [
+            {"Form_ID": f"D{i}", "Enroll_Year": "24-25", "Child_ID": f"C{i % 300}", "Site_ID": f"S{i % 10}", "Room_ID": f"R{i % 40}",
+             "Submit_Datetime": today - timedelta(days=i % 300), "ATL_REG_1": i % 9, "SED_1": (i + 3) % 9}
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def orm_query_attendance(site_ids, start_dt, end_dt, limit):
+    """query_attendance_logs' fetch as an ORM Query chain rebuilt on every call."""
+    import datahubmcp
+    from database import get_db_session
+    from models import DailyAttendanceLog
+
+    with get_db_session() as db:
+        query = db.query(DailyAttendanceLog)
+        query = datahubmcp.filter_ids(query, DailyAttendanceLog.Site_ID, None, site_ids)
+        query = query.filter(*datahubmcp.date_range_filter(DailyAttendanceLog.Form_Date, start_dt, end_dt, True))
+        query = query.order_by(DailyAttendanceLog.Form_Date.desc()).limit(limit)
+        return [datahubmcp.serialize_attendance_log(record) for record in query.all()]
+
+
+def orm_query_drdp(site_ids, start_dt, end_dt, limit):
+    """query_drdp_records' fetch as an ORM Query chain rebuilt on every call."""
+    import datahubmcp
+    from database import get_db_session
+    from models import DRDPRecord
+
+    with get_db_session() as db:
+        query = db.query(DRDPRecord).filter(DRDPRecord.Enroll_Year >= "20-21")
+        query = datahubmcp.filter_ids(query, DRDPRecord.Site_ID, None, site_ids)
+        query = query.filter(*datahubmcp.date_range_filter(DRDPRecord.Submit_Datetime, start_dt, end_dt, True))
+        query = query.order_by(DRDPRecord.Submit_Datetime.desc()).limit(limit)
+        return [datahubmcp.serialize_drdp_record(record) for record in query.all()]
+
+
+def time_calls(fn, calls: int) -> float:
+    """Median-of-3 microseconds per call of fn(n)."""
+    for n in range(min(calls, 200)):
+        fn(n)
+    rounds = []
+    for _ in range(3):
+        started = time.perf_counter()
+        for n in range(calls):
+            fn(n)
+        rounds.append((time.perf_counter() - started) / calls * 1e6)
+    return round(sorted(rounds)[1], 1)
+
+
+def run(args) -> dict:
+    import datahubmcp
+    from database import statement_cache_stats
+
+    # The tools' synchronous bodies, without admission control and thread pool hops
+    attendance_tool = inspect.unwrap(datahubmcp.query_attendance_logs)
+    drdp_tool = inspect.unwrap(datahubmcp.query_drdp_records)
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date, end_date = (today - timedelta(days=30)).strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+    start_dt, end_dt = today - timedelta(days=30), today
+    # Vary the bound values (and list lengths) the way real calls do
+    site_ids = [[f"S{n % 10}"] if n % 3 else [f"S{n % 10}", f"S{(n + 1) % 10}"] for n in range(10)]
+
+    checks = {
+        "attendance": attendance_tool(site_ids=site_ids[1], start_date=start_date, end_date=end_date, limit=args.limit)["records"]
+        == orm_query_attendance(site_ids[1], start_dt, end_dt, args.limit),
+        "drdp": drdp_tool(site_ids=site_ids[1], start_date=start_date, end_date=end_date, limit=args.limit)["records"]
+        == orm_query_drdp(site_ids[1], start_dt, end_dt, args.limit)
+    }
+
+    results = {}
+    for name, tool, reference in (
+        ("query_attendance_logs", attendance_tool, orm_query_attendance),
+        ("query_drdp_records", drdp_tool, orm_query_drdp)
+    ):
+        prebuilt_us = time_calls(
+            lambda n: tool(site_ids=site_ids[n % 10], start_date=start_date, end_date=end_date, limit=args.limit), args.calls
+        )
+        orm_query_us = time_calls(lambda n: reference(site_ids[n % 10], start_dt, end_dt, args.limit), args.calls)
+        results[name] = {
+            "tool_us_per_call": prebuilt_us,
+            "orm_query_us_per_call": orm_query_us,
+            "saved_us_per_call": round(orm_query_us - prebuilt_us, 1)
+        }
+
+    return {
+        "calls": args.calls,
+        "rows": args.rows,
+        "limit": args.limit,
+        "same_results": checks,
+        "tools": results,
+        "statement_cache": {"prebuilt_statements": len(datahubmcp.prebuilt_statements), **statement_cache_stats()}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000, help='timed calls per variant and round')
+    parser.add_argument('--rows', type=int, default=2000, help='rows seeded into each table')
+    parser.add_argument('--limit', type=int, default=10, help='limit passed to each call')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        use_sqlite(os.path.join(directory, 'bench.sqlite3'), args.rows)
+        print(json.dumps(run(args), indent=2))
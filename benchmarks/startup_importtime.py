@@ -0,0 +1,98 @@
+"""Measure server import time and fail when it regresses.
+
+Imports datahubmcp in fresh interpreters with `python -X importtime`, reports
+the median total and the most expensive modules, and exits non-zero if the
+median exceeds the budget or a heavy dependency that should load lazily
+(on first use of its tool family) is imported at startup.
+
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --runs 10 --budget-ms 500 --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by starting the server
+LAZY_MODULES = [
+    'sqlalchemy',
+    'pymysql',
+    'numpy',
+    'googleapiclient.discovery',
+    'google.oauth2.credentials',
+    'google_auth_oauthlib',
+    'httplib2',
+    'models',
+    'database',
+    'google_service',
+]
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure_once() -> dict:
+    """Import the server once; return {module: (self_us, cumulative_us, depth)}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import datahubmcp'],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', '600')),
+                        help='maximum median import time (default: STARTUP_BUDGET_MS or 600)')
+    parser.add_argument('--top', type=int, default=10, help='expensive modules to list')
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals_ms = [run['datahubmcp'][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"datahubmcp import: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.0f}, max {max(totals_ms):.0f}, budget {args.budget_ms:.0f})")
+    sdk_ms = statistics.median(run.get('mcp.server.fastmcp', (0, 0, 0))[1] / 1000 for run in runs)
+    print(f"  of which MCP SDK: {sdk_ms:.0f} ms; server code and its dependencies: {median_ms - sdk_ms:.0f} ms")
+
+    # Direct imports of datahubmcp and the top-level packages they pull in
+    last = runs[-1]
+    top_level = sorted(
+        ((cumulative, name) for name, (_, cumulative, depth) in last.items() if depth <= 1 and name != 'datahubmcp'),
+        reverse=True
+    )
+    print("\nMost expensive imports (last run):")
+    for cumulative, name in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"  {last['datahubmcp'][0] / 1000:8.1f} ms  datahubmcp (own module body)")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in last]
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if not failures:
+        print("\nOK")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List
 import os
+import threading
+from runtime import per_worker
+from query_control import current_query_scope
 
 load_dotenv()
 
@@ -14,30 +19,286 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{quote_plus(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(
-    DATABASE_URL, 
-    echo=False,
-    pool_pre_ping=True,  
-    pool_recycle=3600,   
-    pool_size=5,         
-    max_overflow=10,     
-    connect_args={
-        'connect_timeout': 10  
-    }
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The MySQL engine (and the pymysql driver) is created on first use, so
+# importing this module - e.g. for the local SQLite store - stays cheap
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+# Unpooled engine for KILL QUERY, created on first cancellation
+_kill_engine = None
+
+# Compiled-statement cache entries per engine (SQLAlchemy's default is 500), and
+# how executions on the tracked engines fared against it (see statement_cache_stats)
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+_statement_cache_engines: Dict[str, Any] = {}
+_statement_cache_counts: Dict[str, int] = {}
+_statement_cache_lock = threading.Lock()
+
+# Local SQLite store for data the server keeps itself (e.g. pulled form responses)
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "datahub_local.sqlite3")
+_local_engine = None
+
+# Local SQLite mirror of the MySQL tables, written by refresh_mirror and read by
+# the query tools when called with source="mirror"
+MIRROR_DB_PATH = os.getenv("MIRROR_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "datahub_mirror.sqlite3")
+_mirror_engine = None
+_mirror_read_engine = None
 
 # Create base class for models
 Base = declarative_base()
 
+def get_engine():
+    """Get the MySQL engine, creating it (and its connection pool) on first use."""
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = f"mysql+pymysql://{DB_USER}:{quote_plus(DB_PASSWORD or '')}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+                _engine = create_engine(
+                    database_url, 
+                    echo=False,
+                    pool_pre_ping=True,  
+                    pool_recycle=3600,   
+                    query_cache_size=DB_QUERY_CACHE_SIZE,
+                    # Sized for the whole deployment, shared across HTTP worker processes
+                    pool_size=per_worker(int(os.getenv("DB_POOL_SIZE", "5"))),
+                    max_overflow=per_worker(int(os.getenv("DB_MAX_OVERFLOW", "10")), minimum=0),
+                    connect_args={
+                        'connect_timeout': 10  
+                    }
+                )
+                event.listen(_engine, "before_cursor_execute", _before_cursor_execute, retval=True)
+                event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+                event.listen(_engine, "handle_error", _handle_error)
+                track_statement_cache(_engine, "mysql")
+                _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Statements of a guarded tool call: bound their run time and track the
+    # connection so a cancellation can kill them (see query_control)
+    scope = current_query_scope()
+    if scope is None:
+        return statement, parameters
+    scope.statement_started(cursor.connection.thread_id())
+    timeout_ms = scope.statement_timeout_ms
+    if timeout_ms and statement.lstrip()[:6].upper() == "SELECT":
+        statement = f"SELECT /*+ MAX_EXECUTION_TIME({timeout_ms}) */{statement.lstrip()[6:]}"
+    return statement, parameters
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    scope = current_query_scope()
+    if scope is not None:
+        scope.statement_finished(cursor.connection.thread_id())
+
+
+def _handle_error(exception_context):
+    scope = current_query_scope()
+    cursor = exception_context.cursor
+    if scope is not None and cursor is not None and cursor.connection is not None:
+        scope.statement_finished(cursor.connection.thread_id())
+
+
+def track_statement_cache(engine, name: str) -> None:
+    """Count how an engine's executions use its compiled-statement cache, under `name`."""
+    _statement_cache_engines[name] = engine
+    event.listen(engine, "after_cursor_execute", _count_statement_cache)
+
+
+def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    # CACHE_HIT, CACHE_MISS, CACHING_DISABLED, NO_CACHE_KEY or NO_DIALECT_SUPPORT
+    outcome = getattr(context, "cache_hit", None)
+    if outcome is not None:
+        with _statement_cache_lock:
+            _statement_cache_counts[outcome.name] = _statement_cache_counts.get(outcome.name, 0) + 1
+
+
+def statement_cache_stats() -> Dict[str, Any]:
+    """Compiled-statement cache outcomes of tracked executions, hit ratio and entries per engine."""
+    with _statement_cache_lock:
+        counts = dict(_statement_cache_counts)
+    hits, misses = counts.get("CACHE_HIT", 0), counts.get("CACHE_MISS", 0)
+    return {
+        "executions": {name.lower(): count for name, count in counts.items()},
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        # _compiled_cache is SQLAlchemy-internal; report 0 entries if it is missing
+        "entries": {
+            name: len(getattr(engine, "_compiled_cache", None) or ())
+            for name, engine in _statement_cache_engines.items()
+        },
+        "max_entries": DB_QUERY_CACHE_SIZE
+    }
+
+
+def kill_query(thread_id: int) -> None:
+    """Abort the statement running on a MySQL connection with KILL QUERY.
+    
+    Uses a connection outside the pool, which may be exhausted by the very
+    query being killed. The killed connection stays open and is returned to
+    the pool by its session as usual.
+    """
+    global _kill_engine
+    if _kill_engine is None:
+        from sqlalchemy.pool import NullPool
+        _kill_engine = create_engine(get_engine().url, poolclass=NullPool, connect_args={'connect_timeout': 10})
+    with _kill_engine.connect() as conn:
+        conn.execute(text(f"KILL QUERY {int(thread_id)}"))
+
+
+def __getattr__(name: str):
+    # Keep "from database import engine, SessionLocal" working without building the engine at import
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Session reused by get_db_session() inside shared_db_session(), with the thread that owns it
+_shared_session: ContextVar = ContextVar("shared_db_session", default=None)
+
+
 # Context manager for database sessions
 @contextmanager
-def get_db_session():
-    """Context manager for database sessions. Automatically handles cleanup."""
-    db = SessionLocal()
+def get_db_session(source: str = "primary"):
+    """Context manager for database sessions. Automatically handles cleanup.
+    
+    Args:
+        source: "primary" for MySQL, or "mirror" for a read-only session on the local mirror
+    """
+    if source == "mirror":
+        with get_mirror_db_session(read_only=True) as db:
+            yield db
+        return
+    shared = _shared_session.get()
+    if shared is not None and shared[1] == threading.get_ident():
+        yield shared[0]
+        return
+    get_engine()
+    db = _session_factory()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@contextmanager
+def shared_db_session():
+    """Make get_db_session() calls on this thread reuse one session until exit.
+    
+    Consecutive queries then run on a single pooled connection. Other
+    threads (e.g. date shards) still open their own sessions, since a
+    session must not be used by two threads at once.
+    """
+    with get_db_session() as db:
+        token = _shared_session.set((db, threading.get_ident()))
+        try:
+            yield db
+        finally:
+            _shared_session.reset(token)
+
+
+def check_connection() -> None:
+    """Run a trivial query to confirm MySQL is reachable (raises on failure)."""
+    with get_db_session() as db:
+        db.execute(text("SELECT 1"))
+
+
+def get_local_engine():
+    """Get the engine for the local SQLite store, creating it on first use."""
+    global _local_engine
+    if _local_engine is None:
+        _local_engine = create_engine(f"sqlite:///{LOCAL_DB_PATH}", echo=False)
+    return _local_engine
+
+
+@contextmanager
+def get_local_db_session():
+    """Context manager for sessions on the local SQLite store."""
+    db = Session(bind=get_local_engine(), autoflush=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_mirror_engine(read_only: bool = False):
+    """Get the engine for the local mirror, creating it on first use.
+    
+    The read-only engine opens the SQLite file with mode=ro, so query tools
+    reading the mirror can never modify it; only refresh_mirror writes. The
+    file is in WAL mode, so reads are not blocked by a refresh in progress.
+    """
+    global _mirror_engine, _mirror_read_engine
+    if read_only:
+        if _mirror_read_engine is None:
+            _mirror_read_engine = create_engine(
+                f"sqlite:///file:{MIRROR_DB_PATH}?mode=ro&uri=true", echo=False, query_cache_size=DB_QUERY_CACHE_SIZE
+            )
+            track_statement_cache(_mirror_read_engine, "mirror")
+        return _mirror_read_engine
+    if _mirror_engine is None:
+        _mirror_engine = create_engine(f"sqlite:///{MIRROR_DB_PATH}", echo=False)
+        event.listen(_mirror_engine, "connect", _enable_wal)
+    return _mirror_engine
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    # Write-ahead log: readers keep seeing the last committed data while a refresh writes
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
+@contextmanager
+def get_mirror_db_session(read_only: bool = False):
+    """Context manager for sessions on the local mirror."""
+    db = Session(bind=get_mirror_engine(read_only), autoflush=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]], on_duplicate: str = "error") -> None:
+    """Insert many rows in one executemany round trip.
+    
+    Args:
+        db: Database session (the caller commits)
+        model: ORM model whose table receives the rows
+        rows: Row dictionaries keyed by column name, all with the same keys
+        on_duplicate: What to do when a primary key already exists:
+            "error" (raise), "skip" (keep the existing row) or "update" (overwrite it)
+    """
+    if not rows:
+        return
+    
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    
+    if on_duplicate == "error":
+        stmt = insert(table)
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        if on_duplicate == "skip":
+            stmt = stmt.prefix_with("IGNORE")
+        else:
+            stmt = stmt.on_duplicate_key_update({
+                name: stmt.inserted[name] for name in rows[0] if not table.c[name].primary_key
+            })
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(table)
+        if on_duplicate == "skip":
+            stmt = stmt.on_conflict_do_nothing()
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.name for c in table.primary_key.columns],
+                set_={name: stmt.excluded[name] for name in rows[0] if not table.c[name].primary_key}
+            )
+    else:
+        raise ValueError(f"on_duplicate='{on_duplicate}' is not supported for {dialect}")
+    
+    db.execute(stmt, rows)
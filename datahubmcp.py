@@ -1,13 +1,281 @@
 from mcp.server.fastmcp import FastMCP
 from typing import List, Dict, Any, Optional
-from models import ChildAttendance, AgencySites, AgencySiteRooms, DailyAttendanceLog, CenterSupportReport, LessonPlansPreschool, LessonPlansIT, LessonPlansDetail, DRDPItems, DRDPRecord
-from database import get_db_session
-from google_service import get_sheets_service, get_forms_service, get_drive_service
+from dotenv import load_dotenv
+from sheet_ranges import parse_range, format_range, index_to_column
+from sheet_cache import SheetValueCache
+from drive_index import DriveMetadataIndex, SPREADSHEET_MIME_TYPE
+from google_scheduler import GoogleApiScheduler
+from sheet_diff import records_to_rows, diff_blocks
+from watermark_store import WatermarkStore
+from sheet_subscriptions import SheetSubscriptionManager
+from executors import BlockingPool, offload
+from admission import AdmissionController, Priority
+from query_control import QueryGuard, QueryScope, current_query_scope, run_in_scope
+from date_shards import ShardRunner, split_date_range, validate_shard_unit
+from text_index import TextIndex, best_field, make_snippet, tokenize
+from mirror import MIRROR_TABLES, DatabaseMirror
+from summaries import SUMMARY_PERIODS, SUMMARY_SOURCES, SummaryTables, period_start
+from runtime import WORKERS_ENV, per_worker, worker_count
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from googleapiclient.errors import HttpError
 from datetime import datetime, timedelta
+import argparse
+import asyncio
+import base64
+import inspect
 import json
+import os
+import time
+
+# Google clients, SQLAlchemy models and NumPy are imported inside the tools
+# that use them, so starting the server doesn't pay for tool families a
+# session never calls
+load_dotenv()
 
 mcp = FastMCP()
 
+# Blocking Google API and MySQL work runs on separate bounded thread pools so
+# the event loop stays free and slow calls of one kind don't queue the other.
+# Thread counts, cache sizes and quotas below are deployment-wide totals that
+# per_worker() splits across HTTP worker processes.
+google_pool = BlockingPool(
+    "google",
+    max_workers=per_worker(int(os.getenv("GOOGLE_WORKERS", "8"))),
+    timeout=float(os.getenv("GOOGLE_CALL_TIMEOUT", "120")) or None
+)
+db_pool = BlockingPool(
+    "db",
+    max_workers=per_worker(int(os.getenv("DB_WORKERS", "15"))),
+    timeout=float(os.getenv("DB_CALL_TIMEOUT", "300")) or None
+)
+
+# Connections this worker's MySQL pool can open (pool size plus overflow, as in database.get_engine)
+DB_CONNECTIONS = per_worker(int(os.getenv("DB_POOL_SIZE", "5"))) + per_worker(int(os.getenv("DB_MAX_OVERFLOW", "10")), minimum=0)
+# Date-shard threads each hold a connection while they run; they get at most
+# half of the pool, and admitted calls share what is left
+DB_SHARD_WORKERS = min(per_worker(int(os.getenv("DB_SHARD_WORKERS", "4"))), max(1, DB_CONNECTIONS // 2))
+
+# Admission control in front of the DB tools: at most as many calls run as the
+# connection pool can serve next to the shard threads, heavy tools get their
+# own lower caps, and cheap lookups are admitted ahead of queued heavy calls.
+# Calls beyond the queue bound, or waiting longer than ADMISSION_MAX_WAIT, are rejected as busy.
+db_admission = AdmissionController(
+    max_concurrent=max(1, min(
+        per_worker(int(os.getenv("ADMISSION_MAX_CONCURRENT"))) if os.getenv("ADMISSION_MAX_CONCURRENT") else DB_CONNECTIONS,
+        DB_CONNECTIONS - DB_SHARD_WORKERS
+    )),
+    max_queue=per_worker(int(os.getenv("ADMISSION_MAX_QUEUE", "50"))),
+    max_wait=float(os.getenv("ADMISSION_MAX_WAIT", "30")) or None,
+    # Per-tool overrides, e.g. "query_lesson_plans=4,query_drdp_records=6"
+    tool_limits={
+        name.strip(): per_worker(int(limit))
+        for name, limit in (item.split("=", 1) for item in os.getenv("ADMISSION_TOOL_LIMITS", "").split(",") if "=" in item)
+    }
+)
+
+
+def kill_db_query(thread_id: int) -> None:
+    from database import kill_query
+    kill_query(thread_id)
+
+
+# Statement timeouts for DB tools (MySQL MAX_EXECUTION_TIME hints on SELECTs),
+# and KILL QUERY for statements still running when the client cancels a call
+# or it times out on the DB pool, so its connection goes back to the pool
+db_queries = QueryGuard(
+    kill_db_query,
+    default_timeout=float(os.getenv("DB_STATEMENT_TIMEOUT", "120")) or None,
+    # Per-tool overrides in seconds, e.g. "query_center_support_reports=30" (0 = no timeout)
+    tool_timeouts={
+        name.strip(): float(seconds) or None
+        for name, seconds in (item.split("=", 1) for item in os.getenv("DB_STATEMENT_TIMEOUTS", "").split(",") if "=" in item)
+    }
+)
+
+# Query tools called with shard=... split long date ranges into shards fetched
+# concurrently, each on its own pooled connection; they may span DB_SHARD_MAX_DAYS.
+# Shards still running once a call has its rows are aborted (KILL QUERY)
+DB_SHARD_MAX_DAYS = int(os.getenv("DB_SHARD_MAX_DAYS", "1830"))
+db_shards = ShardRunner(
+    max_workers=DB_SHARD_WORKERS,
+    per_call=int(os.getenv("DB_SHARD_PARALLELISM", "4")),
+    abort=db_queries.abort
+)
+
+# Default and maximum number of rows fetched per request in chunked sheet reads
+SHEET_CHUNK_ROWS = int(os.getenv("SHEET_CHUNK_ROWS", "1000"))
+SHEET_MAX_CHUNK_ROWS = 10000
+# Rows rendered by the sheet:// resource before it stops and points to read_sheet paging
+SHEET_RESOURCE_MAX_ROWS = int(os.getenv("SHEET_RESOURCE_MAX_ROWS", "10000"))
+
+# Tables import_sheet_to_table may write to (model or table names, comma-separated)
+IMPORT_ALLOWED_TABLES = {name.strip() for name in os.getenv("IMPORT_ALLOWED_TABLES", "").split(",") if name.strip()}
+# Rejected rows listed individually in an import summary
+IMPORT_MAX_REJECT_SAMPLES = 50
+
+# Watermarks for incremental pulls (form responses, mirror tables, ...)
+watermarks = WatermarkStore(
+    os.getenv("WATERMARK_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "watermarks.json")
+)
+
+# Optional local SQLite mirror of the MySQL tables, kept current by
+# refresh_mirror; query tools called with source="mirror" read it instead of MySQL
+db_mirror = DatabaseMirror(
+    watermarks,
+    batch_size=int(os.getenv("MIRROR_BATCH_ROWS", "2000")),
+    lookback_days=int(os.getenv("MIRROR_LOOKBACK_DAYS", "14"))
+)
+
+# Every Google API request goes through this scheduler: per-API token buckets
+# sized to the per-user quotas, plus retries with backoff on 429/5xx responses
+google_api = GoogleApiScheduler(
+    limits={
+        "sheets": (per_worker(float(os.getenv("GOOGLE_SHEETS_RPM", "60"))), per_worker(int(os.getenv("GOOGLE_SHEETS_BURST", "10")))),
+        "drive": (per_worker(float(os.getenv("GOOGLE_DRIVE_RPM", "600"))), per_worker(int(os.getenv("GOOGLE_DRIVE_BURST", "20")))),
+        "forms": (per_worker(float(os.getenv("GOOGLE_FORMS_RPM", "300"))), per_worker(int(os.getenv("GOOGLE_FORMS_BURST", "10"))))
+    },
+    max_retries=int(os.getenv("GOOGLE_API_MAX_RETRIES", "5"))
+)
+
+# Most spreadsheets one describe_spreadsheets call may look up. Each costs a
+# Sheets quota token, so by default the cap is what this worker's bucket can
+# hand out within three quarters of GOOGLE_CALL_TIMEOUT
+DESCRIBE_MAX_SPREADSHEETS = int(os.getenv("DESCRIBE_MAX_SPREADSHEETS") or max(1, int(
+    google_api.buckets["sheets"].capacity + google_api.buckets["sheets"].rate * (google_pool.timeout or 120) * 0.75
+)))
+
+# Sheet values cache, revalidated against the Drive file revision on every read
+sheet_cache = SheetValueCache(max_bytes=int(per_worker(float(os.getenv("SHEET_CACHE_MAX_MB", "64"))) * 1024 * 1024))
+
+# Optional local spreadsheet metadata index, refreshed through the Drive changes API
+drive_index = DriveMetadataIndex(
+    path=os.getenv("DRIVE_INDEX_PATH") or None,
+    min_refresh_seconds=float(os.getenv("DRIVE_INDEX_REFRESH_SECONDS", "30"))
+)
+
+# Tables search_records covers: (model, date column, searched text columns)
+LESSON_PLAN_SEARCH_COLUMNS = [
+    "Study_Topic", "Focus_Week", "Teacher_Name", "Vocabulary", "Books",
+    "IntentionalTeachingCards", "Individualizations", "FamilyEngagement"
+]
+SEARCH_TABLES = {
+    "lesson_plans_preschool": ("LessonPlansPreschool", "DOR", LESSON_PLAN_SEARCH_COLUMNS),
+    "lesson_plans_it": ("LessonPlansIT", "DOR", LESSON_PLAN_SEARCH_COLUMNS),
+    "center_support_reports": ("CenterSupportReport", "Form_Date", ["Support_Log", "Strategies", "Strategies_Other", "Debrief", "Category", "User_ID"])
+}
+# In-process full-text indexes used for tables without a MySQL FULLTEXT index
+search_indexes = {
+    table: TextIndex(
+        min_refresh_seconds=float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "60")),
+        rebuild_seconds=float(os.getenv("SEARCH_INDEX_REBUILD_SECONDS", "86400")) or None
+    )
+    for table in SEARCH_TABLES
+}
+# Columns of each table's FULLTEXT index (None if it has none), looked up once per process
+fulltext_columns: Dict[str, Optional[List[str]]] = {}
+
+def date_range_filter(column, lower: datetime, upper: datetime, upper_inclusive: bool = True) -> tuple:
+    """Filter conditions selecting `column` values within one date range or shard."""
+    return (column >= lower, column <= upper if upper_inclusive else column < upper)
+
+
+def filter_ids(query, column, value: Optional[str] = None, values: Optional[List[str]] = None):
+    """Filter a query to rows whose `column` matches a single id and/or a list of ids.
+    
+    A single id becomes `column = id`; several become one `column IN (...)`
+    pushed down to the database. Without ids the query is returned unchanged.
+    """
+    ids = merge_ids(value, values)
+    if not ids:
+        return query
+    return query.filter(column == ids[0] if len(ids) == 1 else column.in_(ids))
+
+
+def merge_ids(value: Optional[str] = None, values: Optional[List[str]] = None) -> List[str]:
+    """Combine a single id and a list of ids, without blanks or duplicates."""
+    return list(dict.fromkeys(([value] if value else []) + [v for v in values or [] if v]))
+
+
+# SELECTs of the hot query tools, built once per combination of filters in use
+prebuilt_statements: Dict[tuple, Any] = {}
+
+
+def date_range_select(name: str, model, date_column: str, id_columns: List[str], upper_inclusive: bool, *criteria):
+    """Prebuilt SELECT of `model` rows in a date range, newest first, for date_range_params.
+    
+    Every value is a bind parameter - the range bounds, one expanding IN per
+    id column and the limit - so one statement object serves every call with
+    the same filters. Reusing it skips rebuilding the expression and its
+    cache key, and the engine's compiled-statement cache always hits.
+    
+    Args:
+        name: Name the statement is cached under with its filters (the tool name)
+        model: ORM model to select
+        date_column: Column the range applies to (newest first)
+        id_columns: Columns filtered by an id list, bound under their own names
+        upper_inclusive: Whether the upper bound is inclusive (see split_date_range)
+        criteria: Extra conditions, the same on every call under `name`
+    """
+    key = (name, tuple(id_columns), upper_inclusive)
+    statement = prebuilt_statements.get(key)
+    if statement is None:
+        from sqlalchemy import bindparam, select
+        column = getattr(model, date_column)
+        statement = select(model).where(
+            *criteria,
+            *date_range_filter(column, bindparam("lower"), bindparam("upper"), upper_inclusive),
+            *[getattr(model, column_name).in_(bindparam(column_name, expanding=True)) for column_name in id_columns]
+        ).order_by(column.desc()).limit(bindparam("limit"))
+        statement = prebuilt_statements.setdefault(key, statement)
+    return statement
+
+
+def date_range_params(lower: datetime, upper: datetime, limit: int, id_filters: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Bind parameter values for a date_range_select statement."""
+    return {"lower": lower, "upper": upper, "limit": limit, **id_filters}
+
+
+def validate_source(source: str) -> Optional[str]:
+    """Return an error message if `source` is unknown, or is the mirror before its first refresh."""
+    if source not in ("primary", "mirror"):
+        return "Invalid source. Must be 'primary' or 'mirror'."
+    if source == "mirror" and not db_mirror.is_ready():
+        return "The local mirror has not been built yet. Run refresh_mirror first."
+    return None
+
+
+def group_records_by_site(records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group serialized records by their site_id, keeping their order within each site.
+    
+    Records without a site are grouped under "" (as in the summary tables).
+    """
+    grouped = {}
+    for record in records:
+        grouped.setdefault(record["site_id"] or "", []).append(record)
+    return grouped
+
+
+def fetch_date_range(fetch, start_dt: datetime, end_dt: datetime, limit: int, shard: Optional[str] = None):
+    """Run a date-range fetch as one query, or per date shard concurrently.
+    
+    Args:
+        fetch: Blocking function (lower, upper, upper_inclusive) -> records,
+            newest first and at most `limit` of them; opens its own DB session
+        start_dt: Start of the range (inclusive)
+        end_dt: End of the range (inclusive)
+        limit: Maximum number of records to return
+        shard: Shard size ("week", "month", "quarter", "year" or "<N>d"), or None
+    
+    Returns:
+        Tuple of (records newest first, number of shards queried)
+    """
+    if not shard:
+        return fetch(start_dt, end_dt, True), 1
+    shards = split_date_range(start_dt, end_dt, shard)
+    return db_shards.run(fetch, shards, limit), len(shards)
+
+
 def convert_drdp_value_to_level(value: Optional[float]) -> Optional[str]:
     """Convert numeric DRDP value to text description.
     
@@ -65,31 +333,105 @@ def convert_drdp_value_to_level(value: Optional[float]) -> Optional[str]:
         return base_description
 
 
+# DRDP measurement columns, converted to level descriptions in query results
+DRDP_COLUMNS = [
+    'ATL_REG_1', 'ATL_REG_2', 'ATL_REG_3', 'ATL_REG_4', 'ATL_REG_5', 'ATL_REG_6', 'ATL_REG_7',
+    'SED_1', 'SED_2', 'SED_3', 'SED_4', 'SED_5',
+    'LLD_1', 'LLD_2', 'LLD_3', 'LLD_4', 'LLD_5', 'LLD_6', 'LLD_7', 'LLD_8', 'LLD_9', 'LLD_10',
+    'ELD_1', 'ELD_2', 'ELD_3', 'ELD_4',
+    'COG_1', 'COG_2', 'COG_3', 'COG_4', 'COG_5', 'COG_6', 'COG_7', 'COG_8', 'COG_9', 'COG_10', 'COG_11',
+    'PD_HLTH_1', 'PD_HLTH_2', 'PD_HLTH_3', 'PD_HLTH_4', 'PD_HLTH_5', 'PD_HLTH_6', 'PD_HLTH_7', 'PD_HLTH_8', 'PD_HLTH_9', 'PD_HLTH_10'
+]
+
+
+def serialize_attendance_log(record) -> Dict[str, Any]:
+    """Convert a DailyAttendanceLog row to the dictionary returned by the tools."""
+    return {
+        "form_id": record.Form_ID,
+        "site_id": record.Site_ID,
+        "room_id": record.Room_ID,
+        "form_date": record.Form_Date.strftime("%Y-%m-%d") if record.Form_Date else None,
+        "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
+        "log_type1": record.Log_Type1,
+        "log_type2": record.Log_Type2,
+        "log_description": record.Log_Description,
+        "timein": record.Timein,
+        "timeout": record.Timeout,
+        "breakfast": record.Breakfast,
+        "lunch": record.Lunch,
+        "pm_snack": record.PM_Snack,
+        "meal_confirm_datetime": record.Meal_Confirm_Datetime.strftime("%Y-%m-%d %H:%M:%S") if record.Meal_Confirm_Datetime else None
+    }
+
+
+def serialize_drdp_record(record) -> Dict[str, Any]:
+    """Convert a DRDPRecord row to the dictionary returned by the tools, with converted levels."""
+    return {
+        "form_id": record.Form_ID,
+        "enroll_year": record.Enroll_Year,
+        "child_id": record.Child_ID,
+        "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
+        "site_id": record.Site_ID,
+        "room_id": record.Room_ID,
+        "submit_datetime": record.Submit_Datetime.strftime("%Y-%m-%d %H:%M:%S") if record.Submit_Datetime else None,
+        # DRDP measurements with converted levels
+        "measurements": {
+            col.lower(): {
+                "numeric_value": getattr(record, col),
+                "level_description": convert_drdp_value_to_level(getattr(record, col))
+            }
+            for col in DRDP_COLUMNS
+        }
+    }
+
+
 @mcp.tool()
-def get_sites_with_classrooms(site_name: Optional[str] = None) -> List[Dict[str, Any]]:
+@db_admission.admit(Priority.HIGH)
+@db_queries.guard(statement_timeout=30)
+@offload(db_pool)
+def get_sites_with_classrooms(
+    site_name: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    source: str = "primary"
+) -> List[Dict[str, Any]]:
     """Get all sites with their classrooms in a hierarchical structure.
     
     Args:
         site_name: Optional filter by site name (partial match)
+        site_ids: Optional list of Site_IDs to return
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
         List of sites, each containing their classroom information
+    
+    Raises:
+        ValueError: If source is invalid, or is "mirror" before the mirror was built
     """
-    with get_db_session() as db:
+    from database import get_db_session
+    from models import AgencySiteRooms, AgencySites
+    
+    if validate_source(source):
+        raise ValueError(validate_source(source))
+    
+    with get_db_session(source) as db:
         
         sites_query = db.query(AgencySites)
         if site_name:
             sites_query = sites_query.filter(AgencySites.Site_Name.like(f"%{site_name}%"))
+        sites_query = filter_ids(sites_query, AgencySites.Site_ID, None, site_ids)
         
         sites = sites_query.all()
         
+        # Classrooms of all returned sites in one query
+        rooms_query = db.query(AgencySiteRooms)
+        if site_name or site_ids:
+            rooms_query = filter_ids(rooms_query, AgencySiteRooms.Site_ID, None, [site.Site_ID for site in sites])
+        classrooms_by_site = {}
+        for room in rooms_query.all() if sites else []:
+            classrooms_by_site.setdefault(room.Site_ID, []).append(room)
+        
         result = []
         for site in sites:
-            # Query classrooms for this site
-            classrooms = db.query(AgencySiteRooms).filter(
-                AgencySiteRooms.Site_ID == site.Site_ID
-            ).all()
-            
             result.append({
                 "site_id": site.Site_ID,
                 "site_name": site.Site_Name,
@@ -100,20 +442,27 @@ def get_sites_with_classrooms(site_name: Optional[str] = None) -> List[Dict[str,
                         "room_id": room.Room_ID,
                         "room_name": room.Room_Name,
                     }
-                    for room in classrooms
+                    for room in classrooms_by_site.get(site.Site_ID, [])
                 ]
             })
         
         return result
 
-
 @mcp.tool()
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard()
+@offload(db_pool)
 def query_attendance_logs(
     site_id: Optional[str] = None,
     room_id: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: int = 500
+    limit: int = 500,
+    shard: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    room_ids: Optional[List[str]] = None,
+    group_by_site: bool = False,
+    source: str = "primary"
 ) -> Dict[str, Any]:
     """Query daily attendance logs for sites or classrooms within a date range.
     
@@ -123,17 +472,32 @@ def query_attendance_logs(
         start_date: Start date in YYYY-MM-DD format (defaults to 7 days ago)
         end_date: End date in YYYY-MM-DD format (defaults to today)
         limit: Maximum number of records to return (default: 500)
+        shard: Optional shard size ("week", "month", "quarter", "year" or e.g. "14d");
+            the range is split into shards queried concurrently, for long ranges
+        site_ids: Optional list of Site_IDs (combined with site_id), matched in one IN filter
+        room_ids: Optional list of Room_IDs (combined with room_id), matched in one IN filter
+        group_by_site: Return records as a dict keyed by site_id ("" for no site) instead of a flat list
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
         Dictionary containing the query parameters used and list of attendance log records
     
     Note:
-        - Date range cannot exceed 3 months from today
+        - Date range cannot exceed 3 months from today (or DB_SHARD_MAX_DAYS, about 5 years, with shard)
         - If no dates specified, defaults to last 7 days
     """
-    # Set default date range (last 7 days)
+    from database import get_db_session
+    from models import DailyAttendanceLog
+    
+    if shard and validate_shard_unit(shard):
+        return {"error": validate_shard_unit(shard), "records": []}
+    if validate_source(source):
+        return {"error": validate_source(source), "records": []}
+    
+    # Set default date range (last 7 days); sharded queries may reach further back
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    three_months_ago = today - timedelta(days=90)
+    max_days = DB_SHARD_MAX_DAYS if shard else 90
+    earliest_dt = today - timedelta(days=max_days)
     
     if start_date:
         try:
@@ -158,9 +522,9 @@ def query_attendance_logs(
         end_dt = today
     
     # Validate date range doesn't exceed 3 months from today
-    if start_dt < three_months_ago:
+    if start_dt < earliest_dt:
         return {
-            "error": f"Start date cannot be more than 3 months ago. Earliest allowed date: {three_months_ago.strftime('%Y-%m-%d')}",
+            "error": f"Start date cannot be more than {max_days} days ago. Earliest allowed date: {earliest_dt.strftime('%Y-%m-%d')}",
             "records": []
         }
     
@@ -176,64 +540,54 @@ def query_attendance_logs(
             "records": []
         }
     
-    with get_db_session() as db:
-        query = db.query(DailyAttendanceLog)
-        
-        # Apply filters
-        if site_id:
-            query = query.filter(DailyAttendanceLog.Site_ID == site_id)
-        
-        if room_id:
-            query = query.filter(DailyAttendanceLog.Room_ID == room_id)
-        
-        # Apply date range filter on Form_Date
-        query = query.filter(
-            DailyAttendanceLog.Form_Date >= start_dt,
-            DailyAttendanceLog.Form_Date <= end_dt
-        )
-        
-        # Order by date descending (most recent first)
-        query = query.order_by(DailyAttendanceLog.Form_Date.desc())
-        query = query.limit(limit)
-        results = query.all()
-        
-        return {
-            "query_info": {
-                "site_id": site_id,
-                "room_id": room_id,
-                "start_date": start_dt.strftime("%Y-%m-%d"),
-                "end_date": end_dt.strftime("%Y-%m-%d"),
-                "total_records": len(results)
-            },
-            "records": [
-                {
-                    "form_id": record.Form_ID,
-                    "site_id": record.Site_ID,
-                    "room_id": record.Room_ID,
-                    "form_date": record.Form_Date.strftime("%Y-%m-%d") if record.Form_Date else None,
-                    "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
-                    "log_type1": record.Log_Type1,
-                    "log_type2": record.Log_Type2,
-                    "log_description": record.Log_Description,
-                    "timein": record.Timein,
-                    "timeout": record.Timeout,
-                    "breakfast": record.Breakfast,
-                    "lunch": record.Lunch,
-                    "pm_snack": record.PM_Snack,
-                    "meal_confirm_datetime": record.Meal_Confirm_Datetime.strftime("%Y-%m-%d %H:%M:%S") if record.Meal_Confirm_Datetime else None
-                }
-                for record in results
-            ]
-        }
+    # Site/room filters as IN lists bound into a prebuilt statement
+    id_filters = {
+        column: ids
+        for column, ids in (("Site_ID", merge_ids(site_id, site_ids)), ("Room_ID", merge_ids(room_id, room_ids)))
+        if ids
+    }
+    
+    def fetch_records(lower: datetime, upper: datetime, upper_inclusive: bool) -> List[Dict[str, Any]]:
+        # Form_Date within the range, most recent first
+        statement = date_range_select("query_attendance_logs", DailyAttendanceLog, "Form_Date", list(id_filters), upper_inclusive)
+        with get_db_session(source) as db:
+            results = db.execute(statement, date_range_params(lower, upper, limit, id_filters)).scalars().all()
+            
+            return [serialize_attendance_log(record) for record in results]
+    
+    records, shard_count = fetch_date_range(fetch_records, start_dt, end_dt, limit, shard)
+    
+    return {
+        "query_info": {
+            "site_id": site_id,
+            "room_id": room_id,
+            "start_date": start_dt.strftime("%Y-%m-%d"),
+            "end_date": end_dt.strftime("%Y-%m-%d"),
+            "site_ids": site_ids,
+            "room_ids": room_ids,
+            "shard": shard,
+            "shards": shard_count,
+            "source": source,
+            "total_records": len(records)
+        },
+        "records": group_records_by_site(records) if group_by_site else records
+    }
 
 @mcp.tool()
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard(statement_timeout=60)
+@offload(db_pool)
 def query_center_support_reports(
     site_id: Optional[str] = None,
     user_id: Optional[str] = None,
     staff_name: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: int = 500
+    limit: int = 500,
+    shard: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    group_by_site: bool = False,
+    source: str = "primary"
 ) -> Dict[str, Any]:
     """Query center support reports within a date range.
     
@@ -244,19 +598,31 @@ def query_center_support_reports(
         start_date: Start date in YYYY-MM-DD format (defaults to 7 days ago)
         end_date: End date in YYYY-MM-DD format (defaults to today)
         limit: Maximum number of records to return (default: 500)
+        shard: Optional shard size ("week", "month", "quarter", "year" or e.g. "14d");
+            the range is split into shards queried concurrently, for multi-year ranges
+        site_ids: Optional list of Site_IDs (combined with site_id), matched in one IN filter
+        group_by_site: Return records as a dict keyed by site_id ("" for no site) instead of a flat list
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
         Dictionary containing the query parameters used and list of support report records
     
     Note:
-        - Date range cannot exceed 1 year
+        - Date range cannot exceed 1 year, or DB_SHARD_MAX_DAYS (about 5 years) with shard
         - If no dates specified, defaults to last 7 days (1 week)
         - User_ID format is typically firstname.lastname@domain.org (adjust based on your organization)
         - staff_name will search for partial matches in User_ID (e.g., "john" will match "john.doe@domain.org")
     """
+    from database import get_db_session
+    from models import CenterSupportReport
+    
+    if shard and validate_shard_unit(shard):
+        return {"error": validate_shard_unit(shard), "records": []}
+    if validate_source(source):
+        return {"error": validate_source(source), "records": []}
+    
     # Set default date range (last 7 days / 1 week)
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    one_year_ago = today - timedelta(days=365)
     
     if start_date:
         try:
@@ -294,54 +660,42 @@ def query_center_support_reports(
             "records": []
         }
     
-    # Validate date range doesn't exceed 1 year
+    # Validate date range doesn't exceed 1 year (or the sharded maximum)
     date_difference = (end_dt - start_dt).days
-    if date_difference > 365:
+    max_days = DB_SHARD_MAX_DAYS if shard else 365
+    if date_difference > max_days:
         return {
-            "error": f"Date range cannot exceed 1 year (365 days). Current range: {date_difference} days. Please reduce the date range.",
+            "error": f"Date range cannot exceed {max_days} days. Current range: {date_difference} days. Please reduce the date range{'' if shard else ' or pass shard'}.",
             "records": []
         }
     
-    with get_db_session() as db:
-        query = db.query(CenterSupportReport)
-        
-        # Apply filters
-        if site_id:
-            query = query.filter(CenterSupportReport.Site_ID == site_id)
-        
-        if user_id:
-            query = query.filter(CenterSupportReport.User_ID == user_id)
-        
-        if staff_name:
-            # Search for staff name within User_ID
-            query = query.filter(CenterSupportReport.User_ID.like(f"%{staff_name}%"))
-        
-        # Apply date range filter on Form_Date
-        query = query.filter(
-            CenterSupportReport.Form_Date >= start_dt,
-            CenterSupportReport.Form_Date <= end_dt
-        )
-        
-        # Order by date descending (most recent first)
-        query = query.order_by(CenterSupportReport.Form_Date.desc())
-        
-        # Apply limit
-        query = query.limit(limit)
-        
-        # Execute query and convert to dictionaries
-        results = query.all()
-        
-        return {
-            "query_info": {
-                "site_id": site_id,
-                "user_id": user_id,
-                "staff_name": staff_name,
-                "start_date": start_dt.strftime("%Y-%m-%d"),
-                "end_date": end_dt.strftime("%Y-%m-%d"),
-                "duration_days": date_difference,
-                "total_records": len(results)
-            },
-            "records": [
+    def fetch_records(lower: datetime, upper: datetime, upper_inclusive: bool) -> List[Dict[str, Any]]:
+        with get_db_session(source) as db:
+            query = db.query(CenterSupportReport)
+            
+            # Apply filters
+            query = filter_ids(query, CenterSupportReport.Site_ID, site_id, site_ids)
+            
+            if user_id:
+                query = query.filter(CenterSupportReport.User_ID == user_id)
+            
+            if staff_name:
+                # Search for staff name within User_ID
+                query = query.filter(CenterSupportReport.User_ID.like(f"%{staff_name}%"))
+            
+            # Apply date range filter on Form_Date
+            query = query.filter(*date_range_filter(CenterSupportReport.Form_Date, lower, upper, upper_inclusive))
+            
+            # Order by date descending (most recent first)
+            query = query.order_by(CenterSupportReport.Form_Date.desc())
+            
+            # Apply limit
+            query = query.limit(limit)
+            
+            # Execute query and convert to dictionaries
+            results = query.all()
+            
+            return [
                 {
                     "form_id": record.Form_ID,
                     "user_id": record.User_ID,
@@ -358,53 +712,76 @@ def query_center_support_reports(
                 }
                 for record in results
             ]
-        }
+    
+    records, shard_count = fetch_date_range(fetch_records, start_dt, end_dt, limit, shard)
+    
+    return {
+        "query_info": {
+            "site_id": site_id,
+            "user_id": user_id,
+            "staff_name": staff_name,
+            "start_date": start_dt.strftime("%Y-%m-%d"),
+            "end_date": end_dt.strftime("%Y-%m-%d"),
+            "duration_days": date_difference,
+            "site_ids": site_ids,
+            "shard": shard,
+            "shards": shard_count,
+            "source": source,
+            "total_records": len(records)
+        },
+        "records": group_records_by_site(records) if group_by_site else records
+    }
 
-def get_drdp_measures_for_lesson_plan(db, form_id: str) -> List[Dict[str, Any]]:
-    """Helper function to retrieve DRDP measures for a lesson plan.
+
+def get_drdp_measures_for_lesson_plans(db, form_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Retrieve DRDP measures for many lesson plans with two IN queries.
     
     Args:
         db: Database session
-        form_id: Form_ID of the lesson plan
+        form_ids: Form_IDs of the lesson plans
     
     Returns:
-        List of DRDP measures with their details
+        Dictionary mapping Form_ID to its list of DRDP measures (plans without measures are omitted)
     """
-    # Query LessonPlansDetail for records with P_No starting with "P5_"
-    lesson_plan_details = db.query(LessonPlansDetail).filter(
-        LessonPlansDetail.Form_ID == form_id,
-        LessonPlansDetail.P_No.like("P5_%")
+    from models import DRDPItems, LessonPlansDetail
+    
+    if not form_ids:
+        return {}
+    
+    # LessonPlansDetail records with P_No starting with "P5_" hold comma-separated DRDP item UUIDs
+    lesson_plan_details = filter_ids(
+        db.query(LessonPlansDetail).filter(LessonPlansDetail.P_No.like("P5_%")),
+        LessonPlansDetail.Form_ID, None, form_ids
     ).all()
     
-    drdp_measures = []
+    uuid_items_by_detail = [
+        (detail, [item.strip() for item in (detail.P_Content or "").split(',') if item.strip()])
+        for detail in lesson_plan_details
+    ]
+    all_uuid_items = {uuid_item for _, uuid_items in uuid_items_by_detail for uuid_item in uuid_items}
+    drdp_items = {
+        item.UUID_Item: item
+        for item in (filter_ids(db.query(DRDPItems), DRDPItems.UUID_Item, None, list(all_uuid_items)).all() if all_uuid_items else [])
+    }
     
-    for detail in lesson_plan_details:
-        p_no = detail.P_No
-        p_content = detail.P_Content
-        
-        if p_content:
-            uuid_items = [item.strip() for item in p_content.split(',') if item.strip()]
-        else:
-            uuid_items = []
-        
-        # Query DRDPItems for each UUID_Item
+    measures_by_form = {}
+    for detail, uuid_items in uuid_items_by_detail:
         for uuid_item in uuid_items:
-            if uuid_item: 
-                drdp_item = db.query(DRDPItems).filter(
-                    DRDPItems.UUID_Item == uuid_item
-                ).first()
-                
-                if drdp_item:
-                    drdp_measures.append({
-                        "p_no": p_no,
-                        "uuid_item": uuid_item,
-                        "item_name": drdp_item.Item_Name,
-                        "item_category": drdp_item.Item_Catagory 
-                    })
+            drdp_item = drdp_items.get(uuid_item)
+            if drdp_item:
+                measures_by_form.setdefault(detail.Form_ID, []).append({
+                    "p_no": detail.P_No,
+                    "uuid_item": uuid_item,
+                    "item_name": drdp_item.Item_Name,
+                    "item_category": drdp_item.Item_Catagory 
+                })
     
-    return drdp_measures
+    return measures_by_form
 
 @mcp.tool()
+@db_admission.admit(Priority.LOW, max_concurrent=per_worker(4))
+@db_queries.guard()
+@offload(db_pool)
 def query_lesson_plans(
     lesson_type: str,
     site_id: Optional[str] = None,
@@ -412,7 +789,12 @@ def query_lesson_plans(
     teacher_name: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: int = 500
+    limit: int = 500,
+    shard: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    room_ids: Optional[List[str]] = None,
+    group_by_site: bool = False,
+    source: str = "primary"
 ) -> Dict[str, Any]:
     """Query lesson plans within a date range, including DRDP measures.
     
@@ -424,16 +806,30 @@ def query_lesson_plans(
         start_date: Start date in YYYY-MM-DD format (defaults to 7 days ago)
         end_date: End date in YYYY-MM-DD format (defaults to today)
         limit: Maximum number of records to return (default: 500)
+        shard: Optional shard size ("week", "month", "quarter", "year" or e.g. "14d");
+            the range is split into shards queried concurrently, for multi-year ranges
+        site_ids: Optional list of Site_IDs (combined with site_id), matched in one IN filter
+        room_ids: Optional list of Room_IDs (combined with room_id), matched in one IN filter
+        group_by_site: Return records as a dict keyed by site_id ("" for no site) instead of a flat list
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
         Dictionary containing the query parameters used and list of lesson plan records with DRDP measures
     
     Note:
-        - Date range cannot exceed 1 year (365 days)
+        - Date range cannot exceed 1 year (365 days), or DB_SHARD_MAX_DAYS (about 5 years) with shard
         - If no dates specified, defaults to last 7 days (1 week)
         - lesson_type must be either "preschool" or "it"
         - Each lesson plan record includes DRDP measures from P5_* fields (P5_1, P5_2, P5_3, P5_4, P5_5)
     """
+    from database import get_db_session
+    from models import LessonPlansIT, LessonPlansPreschool
+    
+    if shard and validate_shard_unit(shard):
+        return {"error": validate_shard_unit(shard), "records": []}
+    if validate_source(source):
+        return {"error": validate_source(source), "records": []}
+    
     # Validate lesson type
     if lesson_type.lower() not in ["preschool", "it"]:
         return {
@@ -446,7 +842,6 @@ def query_lesson_plans(
     
     # Set default date range (last 7 days / 1 week)
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    one_year_ago = today - timedelta(days=365)
     
     if start_date:
         try:
@@ -484,115 +879,131 @@ def query_lesson_plans(
             "records": []
         }
     
-    # Validate date range doesn't exceed 1 year
+    # Validate date range doesn't exceed 1 year (or the sharded maximum)
     date_difference = (end_dt - start_dt).days
-    if date_difference > 365:
+    max_days = DB_SHARD_MAX_DAYS if shard else 365
+    if date_difference > max_days:
         return {
-            "error": f"Date range cannot exceed 1 year (365 days). Current range: {date_difference} days. Please reduce the date range.",
+            "error": f"Date range cannot exceed {max_days} days. Current range: {date_difference} days. Please reduce the date range{'' if shard else ' or pass shard'}.",
             "records": []
         }
     
-    with get_db_session() as db:
-        query = db.query(model)
-        
-        # Apply filters
-        if site_id:
-            query = query.filter(model.Site_ID == site_id)
-        
-        if room_id:
-            query = query.filter(model.Room_ID == room_id)
-        
-        if teacher_name:
-            # Search for teacher name (partial match)
-            query = query.filter(model.Teacher_Name.like(f"%{teacher_name}%"))
-        
-        # Apply date range filter on Form_Date (using DOR for date of record)
-        query = query.filter(
-            model.DOR >= start_dt,
-            model.DOR <= end_dt
-        )
-        
-        # Order by date descending (most recent first)
-        query = query.order_by(model.DOR.desc())
-        
-        # Apply limit
-        query = query.limit(limit)
-        
-        # Execute query and convert to dictionaries
-        results = query.all()
-        
-        # Build response based on lesson type
-        records = []
-        for record in results:
-            # Get DRDP measures for this lesson plan
-            drdp_measures = get_drdp_measures_for_lesson_plan(db, record.Form_ID)
+    def fetch_records(lower: datetime, upper: datetime, upper_inclusive: bool) -> List[Dict[str, Any]]:
+        with get_db_session(source) as db:
+            query = db.query(model)
             
-            base_record = {
-                "form_id": record.Form_ID,
-                "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
-                "site_id": record.Site_ID,
-                "room_id": record.Room_ID,
-                "week_count": record.WeekCount,
-                "teacher_name": record.Teacher_Name,
-                "study_topic": record.Study_Topic,
-                "focus_week": record.Focus_Week,
-                "intentional_teaching_cards": record.IntentionalTeachingCards,
-                "mighty_minutes": record.MightyMinutes,
-                "vocabulary": record.Vocabulary,
-                "books": record.Books,
-                "family_engagement": record.FamilyEngagement,
-                "individualizations": record.Individualizations,
-                "blocks": record.Blocks,
-                "water_sensory": record.WaterSensory,
-                "art": record.Art,
-                "music_movement": record.MusicMovement,
-                "dramatic_play": record.DramaticPlay,
-                "manipulatives": record.Manipulatives,
-                "outdoor_classroom": record.OutdoorClassroom,
-                "teachers": record.Teachers,
-                "enroll_year": record.Enroll_Year,
-                "drdp_measures": drdp_measures
-            }
+            # Apply filters
+            query = filter_ids(query, model.Site_ID, site_id, site_ids)
+            query = filter_ids(query, model.Room_ID, room_id, room_ids)
             
-            # Add preschool-specific fields
-            if lesson_type.lower() == "preschool":
-                base_record.update({
-                    "science": record.Science,
-                    "l_math": record.L_Math,
-                    "writing": record.Writing,
-                    "library": record.Library,
-                    "other": record.Other,
-                })
-            else:  # IT (infant/toddler)
-                base_record.update({
-                    "infant_modification": record.Infant_Modification,
-                    "science_math": record.ScienceMath,
-                })
+            if teacher_name:
+                # Search for teacher name (partial match)
+                query = query.filter(model.Teacher_Name.like(f"%{teacher_name}%"))
             
-            records.append(base_record)
-        
-        return {
-            "query_info": {
-                "lesson_type": lesson_type,
-                "site_id": site_id,
-                "room_id": room_id,
-                "teacher_name": teacher_name,
-                "start_date": start_dt.strftime("%Y-%m-%d"),
-                "end_date": end_dt.strftime("%Y-%m-%d"),
-                "duration_days": date_difference,
-                "total_records": len(results)
-            },
-            "records": records
-        }
+            # Apply date range filter on Form_Date (using DOR for date of record)
+            query = query.filter(*date_range_filter(model.DOR, lower, upper, upper_inclusive))
+            
+            # Order by date descending (most recent first)
+            query = query.order_by(model.DOR.desc())
+            
+            # Apply limit
+            query = query.limit(limit)
+            
+            # Execute query and convert to dictionaries
+            results = query.all()
+            
+            # DRDP measures of all returned lesson plans, fetched together
+            measures_by_form = get_drdp_measures_for_lesson_plans(db, [record.Form_ID for record in results])
+            
+            # Build response based on lesson type
+            records = []
+            for record in results:
+                drdp_measures = measures_by_form.get(record.Form_ID, [])
+                
+                base_record = {
+                    "form_id": record.Form_ID,
+                    "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
+                    "site_id": record.Site_ID,
+                    "room_id": record.Room_ID,
+                    "week_count": record.WeekCount,
+                    "teacher_name": record.Teacher_Name,
+                    "study_topic": record.Study_Topic,
+                    "focus_week": record.Focus_Week,
+                    "intentional_teaching_cards": record.IntentionalTeachingCards,
+                    "mighty_minutes": record.MightyMinutes,
+                    "vocabulary": record.Vocabulary,
+                    "books": record.Books,
+                    "family_engagement": record.FamilyEngagement,
+                    "individualizations": record.Individualizations,
+                    "blocks": record.Blocks,
+                    "water_sensory": record.WaterSensory,
+                    "art": record.Art,
+                    "music_movement": record.MusicMovement,
+                    "dramatic_play": record.DramaticPlay,
+                    "manipulatives": record.Manipulatives,
+                    "outdoor_classroom": record.OutdoorClassroom,
+                    "teachers": record.Teachers,
+                    "enroll_year": record.Enroll_Year,
+                    "drdp_measures": drdp_measures
+                }
+                
+                # Add preschool-specific fields
+                if lesson_type.lower() == "preschool":
+                    base_record.update({
+                        "science": record.Science,
+                        "l_math": record.L_Math,
+                        "writing": record.Writing,
+                        "library": record.Library,
+                        "other": record.Other,
+                    })
+                else:  # IT (infant/toddler)
+                    base_record.update({
+                        "infant_modification": record.Infant_Modification,
+                        "science_math": record.ScienceMath,
+                    })
+                
+                records.append(base_record)
+            
+            return records
+    
+    records, shard_count = fetch_date_range(fetch_records, start_dt, end_dt, limit, shard)
+    
+    return {
+        "query_info": {
+            "lesson_type": lesson_type,
+            "site_id": site_id,
+            "room_id": room_id,
+            "teacher_name": teacher_name,
+            "start_date": start_dt.strftime("%Y-%m-%d"),
+            "end_date": end_dt.strftime("%Y-%m-%d"),
+            "duration_days": date_difference,
+            "site_ids": site_ids,
+            "room_ids": room_ids,
+            "shard": shard,
+            "shards": shard_count,
+            "source": source,
+            "total_records": len(records)
+        },
+        "records": group_records_by_site(records) if group_by_site else records
+    }
 
 @mcp.tool()
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard()
+@offload(db_pool)
 def query_drdp_records(
     site_id: Optional[str] = None,
     room_id: Optional[str] = None,
     child_id: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: int = 500
+    limit: int = 500,
+    shard: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    room_ids: Optional[List[str]] = None,
+    child_ids: Optional[List[str]] = None,
+    group_by_site: bool = False,
+    source: str = "primary"
 ) -> Dict[str, Any]:
     """Query DRDP assessment records with converted level descriptions.
     
@@ -603,19 +1014,33 @@ def query_drdp_records(
         start_date: Start date in YYYY-MM-DD format (defaults to 7 days ago)
         end_date: End date in YYYY-MM-DD format (defaults to today)
         limit: Maximum number of records to return (default: 500)
+        shard: Optional shard size ("week", "month", "quarter", "year" or e.g. "14d");
+            the range is split into shards queried concurrently, for multi-year ranges
+        site_ids: Optional list of Site_IDs (combined with site_id), matched in one IN filter
+        room_ids: Optional list of Room_IDs (combined with room_id), matched in one IN filter
+        child_ids: Optional list of Child_IDs (combined with child_id), matched in one IN filter
+        group_by_site: Return records as a dict keyed by site_id ("" for no site) instead of a flat list
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
         Dictionary containing the query parameters used and list of DRDP records with converted levels
     
     Note:
-        - Date range cannot exceed 1 year (365 days)
+        - Date range cannot exceed 1 year (365 days), or DB_SHARD_MAX_DAYS (about 5 years) with shard
         - If no dates specified, defaults to last 7 days (1 week)
         - Only includes records from enrollment year "20-21" and later
         - DRDP measurement values are converted to descriptive levels (e.g., "Exploring Later + Emerging")
     """
+    from database import get_db_session
+    from models import DRDPRecord
+    
+    if shard and validate_shard_unit(shard):
+        return {"error": validate_shard_unit(shard), "records": []}
+    if validate_source(source):
+        return {"error": validate_source(source), "records": []}
+    
     # Set default date range (last 7 days / 1 week)
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    one_year_ago = today - timedelta(days=365)
     
     if start_date:
         try:
@@ -653,166 +1078,1256 @@ def query_drdp_records(
             "records": []
         }
     
-    # Validate date range doesn't exceed 1 year
+    # Validate date range doesn't exceed 1 year (or the sharded maximum)
     date_difference = (end_dt - start_dt).days
-    if date_difference > 365:
+    max_days = DB_SHARD_MAX_DAYS if shard else 365
+    if date_difference > max_days:
         return {
-            "error": f"Date range cannot exceed 1 year (365 days). Current range: {date_difference} days. Please reduce the date range.",
+            "error": f"Date range cannot exceed {max_days} days. Current range: {date_difference} days. Please reduce the date range{'' if shard else ' or pass shard'}.",
             "records": []
         }
     
-    with get_db_session() as db:
-        query = db.query(DRDPRecord)
-        
-        # Filter out records with Enroll_Year earlier than "20-21"
-        query = query.filter(DRDPRecord.Enroll_Year >= "20-21")
-        
-        # Apply filters
-        if site_id:
-            query = query.filter(DRDPRecord.Site_ID == site_id)
-        
-        if room_id:
-            query = query.filter(DRDPRecord.Room_ID == room_id)
-        
-        if child_id:
-            query = query.filter(DRDPRecord.Child_ID == child_id)
-        
-        # Apply date range filter on Submit_Datetime
-        query = query.filter(
-            DRDPRecord.Submit_Datetime >= start_dt,
-            DRDPRecord.Submit_Datetime <= end_dt
+    # Site/room/child filters as IN lists bound into a prebuilt statement
+    id_filters = {
+        column: ids
+        for column, ids in (
+            ("Site_ID", merge_ids(site_id, site_ids)),
+            ("Room_ID", merge_ids(room_id, room_ids)),
+            ("Child_ID", merge_ids(child_id, child_ids))
         )
-        
-        # Order by date descending (most recent first)
-        query = query.order_by(DRDPRecord.Submit_Datetime.desc())
-        
-        # Apply limit
-        query = query.limit(limit)
-        
-        # Execute query and convert to dictionaries
-        results = query.all()
-        
-        # List of DRDP measurement columns to convert
-        drdp_columns = [
-            'ATL_REG_1', 'ATL_REG_2', 'ATL_REG_3', 'ATL_REG_4', 'ATL_REG_5', 'ATL_REG_6', 'ATL_REG_7',
-            'SED_1', 'SED_2', 'SED_3', 'SED_4', 'SED_5',
-            'LLD_1', 'LLD_2', 'LLD_3', 'LLD_4', 'LLD_5', 'LLD_6', 'LLD_7', 'LLD_8', 'LLD_9', 'LLD_10',
-            'ELD_1', 'ELD_2', 'ELD_3', 'ELD_4',
-            'COG_1', 'COG_2', 'COG_3', 'COG_4', 'COG_5', 'COG_6', 'COG_7', 'COG_8', 'COG_9', 'COG_10', 'COG_11',
-            'PD_HLTH_1', 'PD_HLTH_2', 'PD_HLTH_3', 'PD_HLTH_4', 'PD_HLTH_5', 'PD_HLTH_6', 'PD_HLTH_7', 'PD_HLTH_8', 'PD_HLTH_9', 'PD_HLTH_10'
-        ]
-        
-        return {
-            "query_info": {
-                "site_id": site_id,
-                "room_id": room_id,
-                "child_id": child_id,
-                "start_date": start_dt.strftime("%Y-%m-%d"),
-                "end_date": end_dt.strftime("%Y-%m-%d"),
-                "duration_days": date_difference,
-                "total_records": len(results)
-            },
-            "records": [
-                {
-                    "form_id": record.Form_ID,
-                    "enroll_year": record.Enroll_Year,
-                    "child_id": record.Child_ID,
-                    "dor": record.DOR.strftime("%Y-%m-%d %H:%M:%S") if record.DOR else None,
-                    "site_id": record.Site_ID,
-                    "room_id": record.Room_ID,
-                    "submit_datetime": record.Submit_Datetime.strftime("%Y-%m-%d %H:%M:%S") if record.Submit_Datetime else None,
-                    # DRDP measurements with converted levels
-                    "measurements": {
-                        col.lower(): {
-                            "numeric_value": getattr(record, col),
-                            "level_description": convert_drdp_value_to_level(getattr(record, col))
-                        }
-                        for col in drdp_columns
-                    }
-                }
-                for record in results
-            ]
-        }
+        if ids
+    }
+    
+    def fetch_records(lower: datetime, upper: datetime, upper_inclusive: bool) -> List[Dict[str, Any]]:
+        # Submit_Datetime within the range, most recent first, leaving out
+        # records with Enroll_Year earlier than "20-21"
+        statement = date_range_select(
+            "query_drdp_records", DRDPRecord, "Submit_Datetime", list(id_filters), upper_inclusive,
+            DRDPRecord.Enroll_Year >= "20-21"
+        )
+        with get_db_session(source) as db:
+            results = db.execute(statement, date_range_params(lower, upper, limit, id_filters)).scalars().all()
+            
+            # Convert to dictionaries
+            return [serialize_drdp_record(record) for record in results]
+    
+    records, shard_count = fetch_date_range(fetch_records, start_dt, end_dt, limit, shard)
+    
+    return {
+        "query_info": {
+            "site_id": site_id,
+            "room_id": room_id,
+            "child_id": child_id,
+            "start_date": start_dt.strftime("%Y-%m-%d"),
+            "end_date": end_dt.strftime("%Y-%m-%d"),
+            "duration_days": date_difference,
+            "site_ids": site_ids,
+            "room_ids": room_ids,
+            "child_ids": child_ids,
+            "shard": shard,
+            "shards": shard_count,
+            "source": source,
+            "total_records": len(records)
+        },
+        "records": group_records_by_site(records) if group_by_site else records
+    }
+
+
+# Most children child_drdp_progress accepts in one call
+CHILD_PROGRESS_MAX_CHILDREN = 200
 
 
 @mcp.tool()
-def list_spreadsheets(max_results: int = 20) -> str:
-    """
-    List user's Google Spreadsheets
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard()
+@offload(db_pool)
+def child_drdp_progress(
+    child_ids: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_measures: bool = True,
+    source: str = "primary"
+) -> Dict[str, Any]:
+    """Track children's DRDP growth across rating periods as a compact progress matrix.
     
     Args:
-        max_results: Maximum number of spreadsheets to return (default: 20)
+        child_ids: Child_IDs to report on (up to 200)
+        start_date: Optional earliest Submit_Datetime in YYYY-MM-DD format (default: all history)
+        end_date: Optional latest Submit_Datetime in YYYY-MM-DD format (default: today)
+        include_measures: Include the per-measure matrices (47 columns), not only the 6 domains
+        source: "primary" (MySQL) or "mirror" (the local read-only copy kept by refresh_mirror)
     
     Returns:
-        JSON string with spreadsheet names, IDs, and URLs
-    """
-    service = get_drive_service()
-    results = service.files().list(
-        q="mimeType='application/vnd.google-apps.spreadsheet'",
-        pageSize=max_results,
-        fields="files(id, name, webViewLink)"
-    ).execute()
-    
-    files = results.get('files', [])
-    spreadsheets = [{
-        'name': f['name'],
-        'id': f['id'],
-        'url': f['webViewLink']
-    } for f in files]
+        Dictionary with the measure and domain column orders, and per child its
+        rating periods (e.g. "2024-25 Fall") and matrices with one row per period:
+        domain_scores / measure_ratings, domain_change / measure_change (change
+        since the child's previous rated period), plus the first-to-last
+        domain_total_change / measure_total_change
     
-    return json.dumps(spreadsheets, indent=2)
+    Note:
+        - All assessments are fetched in one query; rating periods are Fall (Aug-Nov),
+          Winter (Dec-Feb) and Spring (Mar-Jul) by Submit_Datetime, and a later
+          assessment in the same period replaces an earlier one
+        - Ratings are numeric DRDP values; "unable to rate" (11) and "conditional"
+          (99) are left out, and domain scores average the rated measures
+        - Only includes records from enrollment year "20-21" and later
+    """
+    from database import get_db_session
+    from drdp_progress import progress_matrix
+    from models import DRDPRecord
+    
+    child_ids = list(dict.fromkeys(child_id for child_id in child_ids if child_id))
+    if not child_ids:
+        return {"error": "child_ids must list at least one Child_ID.", "children": []}
+    if len(child_ids) > CHILD_PROGRESS_MAX_CHILDREN:
+        return {"error": f"child_ids can list at most {CHILD_PROGRESS_MAX_CHILDREN} children.", "children": []}
+    if validate_source(source):
+        return {"error": validate_source(source), "children": []}
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD format.", "children": []}
+    
+    with get_db_session(source) as db:
+        query = db.query(
+            DRDPRecord.Child_ID,
+            DRDPRecord.Submit_Datetime,
+            *[getattr(DRDPRecord, column) for column in DRDP_COLUMNS]
+        ).filter(DRDPRecord.Enroll_Year >= "20-21", DRDPRecord.Submit_Datetime.isnot(None))
+        query = filter_ids(query, DRDPRecord.Child_ID, None, child_ids)
+        if start_dt:
+            query = query.filter(DRDPRecord.Submit_Datetime >= start_dt)
+        if end_dt:
+            query = query.filter(DRDPRecord.Submit_Datetime < end_dt)
+        rows = query.order_by(DRDPRecord.Submit_Datetime).all()
+    
+    progress = progress_matrix(
+        ((row[0], row[1], list(row[2:])) for row in rows),
+        DRDP_COLUMNS,
+        include_measures=include_measures
+    )
+    found = {child["child_id"] for child in progress["children"]}
+    return {
+        "query_info": {
+            "child_ids": child_ids,
+            "start_date": start_date,
+            "end_date": end_date,
+            "source": source,
+            "assessments": len(rows),
+            "children_not_found": [child_id for child_id in child_ids if child_id not in found]
+        },
+        **progress
+    }
 
 
-@mcp.tool()
-def read_sheet(spreadsheet_id: str, range_name: str = "Sheet1") -> str:
-    """
-    Read data from a Google Sheet
-    
-    Args:
-        spreadsheet_id: The ID of the spreadsheet (from the URL)
-        range_name: The A1 notation of the range to read (default: Sheet1)
+# Tools batch_query can run, and the most sub-queries it accepts in one call
+BATCH_QUERY_TOOLS = {
+    tool.__name__: tool
+    for tool in (
+        get_sites_with_classrooms, query_attendance_logs, query_center_support_reports, query_lesson_plans,
+        query_drdp_records, child_drdp_progress
+    )
+}
+BATCH_QUERY_MAX_ITEMS = int(os.getenv("BATCH_QUERY_MAX_ITEMS", "20"))
+
+
+def validate_batch_arguments(tool: str, arguments: Dict[str, Any]):
+    """Validate and coerce a sub-query's arguments the way a direct MCP call of the tool would.
     
     Returns:
-        JSON string with the sheet data
+        Tuple of (arguments to call the tool with, None), or (None, error message)
     """
-    service = get_sheets_service()
-    result = service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id,
-        range=range_name
-    ).execute()
-    
-    values = result.get('values', [])
-    return json.dumps(values, indent=2)
+    from pydantic import ValidationError
+    
+    fn_metadata = mcp._tool_manager.get_tool(tool).fn_metadata
+    unknown = [name for name in arguments if name not in fn_metadata.arg_model.model_fields]
+    if unknown:
+        return None, f"Unknown arguments for {tool}: {', '.join(unknown)}."
+    try:
+        parsed = fn_metadata.arg_model.model_validate(fn_metadata.pre_parse_json(arguments))
+    except ValidationError as e:
+        return None, "Invalid arguments: " + "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+    return parsed.model_dump_one_level(), None
 
 
-@mcp.tool()
-def write_sheet(spreadsheet_id: str, range_name: str, values: list) -> str:
+def batch_item_result(call: Dict[str, Any], started: float, result: Any = None, error: Optional[str] = None) -> Dict[str, Any]:
+    """Result entry of one batch_query sub-query, with its timing and status."""
+    if error is None and isinstance(result, dict) and result.get("error"):
+        error = result["error"]
+    item = {
+        "id": call["id"],
+        "tool": call["tool"],
+        "status": "error" if error else "ok",
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    if error:
+        item["error"] = error
+    if result is not None:
+        item["result"] = result
+    return item
+
+
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard()
+@offload(db_pool)
+def run_batch_sequential(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run batch_query sub-queries one after another on one shared DB session.
+    
+    Each sub-query gets its own tool's statement timeout; the batch as a whole
+    holds one admission slot, so per-tool concurrency caps do not apply.
     """
-    Write data to a Google Sheet
+    from database import shared_db_session
+    
+    batch_scope = current_query_scope()
+    items = []
+    with shared_db_session() as db:
+        for call in calls:
+            started = time.perf_counter()
+            if call.get("error"):
+                items.append(batch_item_result(call, started, error=call["error"]))
+                continue
+            scope = QueryScope(call["tool"], db_queries.tool_timeouts.get(call["tool"]), parent=batch_scope)
+            try:
+                result = run_in_scope(scope, inspect.unwrap(BATCH_QUERY_TOOLS[call["tool"]]), **call["arguments"])
+            except Exception as e:
+                # Leave the shared session usable for the remaining sub-queries
+                db.rollback()
+                items.append(batch_item_result(call, started, error=f"{type(e).__name__}: {e}"))
+            else:
+                items.append(batch_item_result(call, started, result))
+    return items
+
+
+@mcp.tool()
+async def batch_query(queries: List[Dict[str, Any]], mode: str = "concurrent") -> Dict[str, Any]:
+    """Run several database query tools in one call and return all their results.
     
     Args:
-        spreadsheet_id: The ID of the spreadsheet
-        range_name: The A1 notation of where to write
-        values: 2D list of values to write
+        queries: Sub-queries, each {"tool": name, "arguments": {...}, "id": optional label}.
+            Supported tools: get_sites_with_classrooms, query_attendance_logs,
+            query_center_support_reports, query_lesson_plans, query_drdp_records,
+            child_drdp_progress
+        mode: "concurrent" (default) runs sub-queries in parallel, each on its own
+            connection; "sequential" runs them in order on one shared DB session,
+            with each tool's statement timeout but not its concurrency cap
     
     Returns:
-        Confirmation message
-    """
-    service = get_sheets_service()
-    body = {'values': values}
-    
-    result = service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range=range_name,
-        valueInputOption='RAW',
-        body=body
-    ).execute()
+        Dictionary with the mode, total elapsed time and one result per sub-query
+        (in request order) holding its status, elapsed_ms and result or error
     
-    return f"Updated {result.get('updatedCells')} cells"
-
-
-@mcp.tool()
-def append_sheet(spreadsheet_id: str, range_name: str, values: list) -> str:
+    Note:
+        - At most BATCH_QUERY_MAX_ITEMS (default 20) sub-queries per call
+        - Arguments are validated and coerced as for a direct call of the tool; a
+          sub-query with unknown or invalid arguments reports an error and is not run
+        - A failing sub-query does not affect the others
+    """
+    if mode not in ("concurrent", "sequential"):
+        return {"error": "Invalid mode. Must be either 'concurrent' or 'sequential'.", "results": []}
+    if not queries:
+        return {"error": "queries must contain at least one sub-query.", "results": []}
+    if len(queries) > BATCH_QUERY_MAX_ITEMS:
+        return {"error": f"Too many sub-queries ({len(queries)}); the maximum is {BATCH_QUERY_MAX_ITEMS}.", "results": []}
+    
+    calls = []
+    for index, query in enumerate(queries):
+        tool = query.get("tool") if isinstance(query, dict) else None
+        if tool not in BATCH_QUERY_TOOLS:
+            return {
+                "error": f"Sub-query {index}: unknown tool '{tool}'. Supported tools: {', '.join(BATCH_QUERY_TOOLS)}.",
+                "results": []
+            }
+        arguments = query.get("arguments") or {}
+        if not isinstance(arguments, dict):
+            return {"error": f"Sub-query {index}: arguments must be an object.", "results": []}
+        arguments, error = validate_batch_arguments(tool, arguments)
+        calls.append({"id": query.get("id", index), "tool": tool, "arguments": arguments, "error": error})
+    
+    started = time.perf_counter()
+    if mode == "sequential":
+        results = await run_batch_sequential(calls)
+    else:
+        async def run_call(call: Dict[str, Any]) -> Dict[str, Any]:
+            call_started = time.perf_counter()
+            if call["error"]:
+                return batch_item_result(call, call_started, error=call["error"])
+            try:
+                result = await BATCH_QUERY_TOOLS[call["tool"]](**call["arguments"])
+            except Exception as e:
+                return batch_item_result(call, call_started, error=f"{type(e).__name__}: {e}")
+            return batch_item_result(call, call_started, result)
+        
+        results = await asyncio.gather(*(run_call(call) for call in calls))
+    
+    return {
+        "mode": mode,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results": list(results)
+    }
+
+
+def get_fulltext_columns(db, model, columns: List[str]) -> Optional[List[str]]:
+    """Columns of the table's MySQL FULLTEXT index covering most of `columns`, or None."""
+    from sqlalchemy import text
+    
+    table = model.__tablename__
+    if table not in fulltext_columns:
+        found = None
+        if db.get_bind().dialect.name == "mysql":
+            rows = db.execute(text(
+                "SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) "
+                "FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_TYPE = 'FULLTEXT' "
+                "GROUP BY INDEX_NAME"
+            ), {"table": table}).all()
+            candidates = [index_columns.split(",") for _, index_columns in rows]
+            candidates = [index for index in candidates if set(index) & set(columns)]
+            if candidates:
+                found = max(candidates, key=lambda index: len(set(index) & set(columns)))
+        fulltext_columns[table] = found
+    return fulltext_columns[table]
+
+
+def search_meta(record, date_column: str) -> Dict[str, Any]:
+    """Date, site and room of a searched record, used to filter and describe hits."""
+    return {"date": getattr(record, date_column), "site_id": record.Site_ID, "room_id": getattr(record, "Room_ID", None)}
+
+
+def search_hit(table: str, form_id: str, score: float, meta: Dict[str, Any], field: str, snippet: str) -> Dict[str, Any]:
+    """Serialize one search_records hit."""
+    return {
+        "table": table,
+        "form_id": form_id,
+        "score": round(score, 4),
+        "date": meta["date"].strftime("%Y-%m-%d") if meta["date"] else None,
+        "site_id": meta["site_id"],
+        "room_id": meta["room_id"],
+        "field": field,
+        "snippet": snippet
+    }
+
+
+def refresh_search_index(table: str, model, date_column: str, columns: List[str]) -> None:
+    """Bring a table's in-process search index up to date (new and deleted records)."""
+    from database import get_db_session
+    
+    def list_keys() -> List[str]:
+        with get_db_session() as db:
+            return [form_id for (form_id,) in db.query(model.Form_ID)]
+    
+    def load_documents(keys: List[str]):
+        with get_db_session() as db:
+            for start in range(0, len(keys), 500):
+                for record in filter_ids(db.query(model), model.Form_ID, None, keys[start:start + 500]):
+                    yield record.Form_ID, {column: getattr(record, column) for column in columns}, search_meta(record, date_column)
+    
+    search_indexes[table].refresh(list_keys, load_documents)
+
+
+@mcp.tool()
+@db_admission.admit(Priority.NORMAL)
+@db_queries.guard()
+@offload(db_pool)
+def search_records(
+    query: str,
+    tables: Optional[List[str]] = None,
+    site_ids: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """Full-text search over lesson plans and center support reports, best matches first.
+    
+    Args:
+        query: Words to search for (e.g. "butterfly life cycle", "transition strategies")
+        tables: Optional subset of "lesson_plans_preschool", "lesson_plans_it" and
+            "center_support_reports" (default: all three)
+        site_ids: Optional list of Site_IDs to restrict hits to
+        start_date: Optional earliest record date in YYYY-MM-DD format
+        end_date: Optional latest record date in YYYY-MM-DD format
+        limit: Maximum number of hits to return (default: 20, max: 200)
+    
+    Returns:
+        Dictionary with the search backend used per table and ranked hits, each
+        with table, form_id, score, date, site_id, the best matching field and a snippet
+    
+    Note:
+        - Lesson plans are searched in Study_Topic, Focus_Week, Teacher_Name, Vocabulary,
+          Books and related text; support reports in Support_Log, Strategies, Debrief,
+          Category and User_ID
+        - Tables with a MySQL FULLTEXT index are searched with MATCH ... AGAINST; others
+          through an in-process index built on first use and refreshed incrementally
+        - Scores rank hits within a table; across tables they are only roughly comparable
+    """
+    import models
+    from database import get_db_session
+    from sqlalchemy import literal_column
+    from sqlalchemy.dialects.mysql import match
+    
+    tables = tables or list(SEARCH_TABLES)
+    unknown = [table for table in tables if table not in SEARCH_TABLES]
+    if unknown:
+        return {"error": f"Unknown tables: {', '.join(unknown)}. Use {', '.join(SEARCH_TABLES)}.", "hits": []}
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return {"error": "query must contain at least one searchable word.", "hits": []}
+    if not 1 <= limit <= 200:
+        return {"error": "limit must be between 1 and 200.", "hits": []}
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    except ValueError:
+        return {"error": "Invalid start_date or end_date format. Use YYYY-MM-DD format.", "hits": []}
+    
+    started = time.perf_counter()
+    site_filter = set(site_ids or [])
+    backends = {}
+    hits = []
+    for table in tables:
+        model_name, date_column, columns = SEARCH_TABLES[table]
+        model = getattr(models, model_name)
+        with get_db_session() as db:
+            fulltext = get_fulltext_columns(db, model, columns)
+            if fulltext:
+                score = match(*(literal_column(f"`{column}`") for column in fulltext), against=query).in_natural_language_mode()
+                date_col = getattr(model, date_column)
+                db_query = filter_ids(db.query(model, score.label("score")).filter(score > 0), model.Site_ID, None, site_ids)
+                if start_dt:
+                    db_query = db_query.filter(date_col >= start_dt)
+                if end_dt:
+                    db_query = db_query.filter(date_col < end_dt)
+                for record, record_score in db_query.order_by(score.desc()).limit(limit).all():
+                    fields = {column: getattr(record, column) for column in columns if getattr(record, column)}
+                    if fields:
+                        field = best_field(fields, terms)
+                        hits.append(search_hit(
+                            table, record.Form_ID, float(record_score), search_meta(record, date_column),
+                            field, make_snippet(fields[field], terms)
+                        ))
+                backends[table] = "fulltext"
+                continue
+        
+        refresh_search_index(table, model, date_column, columns)
+        
+        def matches(meta: Dict[str, Any]) -> bool:
+            if site_filter and meta["site_id"] not in site_filter:
+                return False
+            if (start_dt or end_dt) and meta["date"] is None:
+                return False
+            return (not start_dt or meta["date"] >= start_dt) and (not end_dt or meta["date"] < end_dt)
+        
+        for hit in search_indexes[table].search(query, limit, matches):
+            hits.append(search_hit(table, hit["key"], hit["score"], hit["meta"], hit["field"], hit["snippet"]))
+        backends[table] = "index"
+    
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return {
+        "query": query,
+        "backends": backends,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "total_hits": len(hits[:limit]),
+        "hits": hits[:limit]
+    }
+
+
+# Feeds changes_since can follow: (model, timestamp columns marking an insert or update, serializer)
+CHANGE_FEEDS = {
+    "attendance_logs": ("DailyAttendanceLog", ["DOR", "Meal_Confirm_Datetime"], serialize_attendance_log),
+    "drdp_records": ("DRDPRecord", ["Submit_Datetime"], serialize_drdp_record)
+}
+
+
+@mcp.tool()
+@db_admission.admit(Priority.HIGH)
+@db_queries.guard()
+@offload(db_pool)
+def changes_since(
+    feed: str,
+    token: Optional[str] = None,
+    since: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    limit: int = 500
+) -> Dict[str, Any]:
+    """Get only the records inserted or updated since the previous call (a change feed).
+    
+    Args:
+        feed: "attendance_logs" (tracks DOR and Meal_Confirm_Datetime) or
+            "drdp_records" (tracks Submit_Datetime)
+        token: next_token from the previous call; omit to start a new feed
+        since: Where a new feed starts, YYYY-MM-DD or YYYY-MM-DD HH:MM:SS
+            (defaults to now, i.e. only future changes)
+        site_ids: Optional list of Site_IDs to follow (fixed for the life of the token)
+        limit: Maximum number of rows fetched per tracked column (default: 500, max: 5000)
+    
+    Returns:
+        Dictionary with the changed records (oldest change first), has_more and
+        next_token to pass to the next call
+    
+    Note:
+        - Each tracked column is read with a keyset query on (column, Form_ID), so
+          a poll costs about as much as the number of new rows
+        - A record changed again later is returned again; upsert by form_id
+        - When has_more is true, call again right away with next_token
+    """
+    import models
+    from database import get_db_session
+    from sqlalchemy import and_, or_
+    
+    if feed not in CHANGE_FEEDS:
+        return {"error": f"Invalid feed. Must be one of: {', '.join(CHANGE_FEEDS)}.", "records": []}
+    if not 1 <= limit <= 5000:
+        return {"error": "limit must be between 1 and 5000.", "records": []}
+    model_name, columns, serialize = CHANGE_FEEDS[feed]
+    model = getattr(models, model_name)
+    
+    if token:
+        try:
+            state = decode_page_token(token)
+            if state.get("feed") != feed:
+                return {"error": f"This token belongs to the '{state.get('feed')}' feed, not '{feed}'.", "records": []}
+            cursors = {column: (datetime.fromisoformat(state["cursors"][column][0]), state["cursors"][column][1]) for column in columns}
+        except (ValueError, KeyError, TypeError, IndexError):
+            return {"error": "Invalid token. Pass the next_token from a previous response unchanged.", "records": []}
+        site_ids = state.get("site_ids")
+    else:
+        start_dt = datetime.now()
+        if since:
+            try:
+                start_dt = datetime.strptime(since, "%Y-%m-%d %H:%M:%S" if " " in since else "%Y-%m-%d")
+            except ValueError:
+                return {"error": "Invalid since format. Use YYYY-MM-DD or YYYY-MM-DD HH:MM:SS.", "records": []}
+        # An empty Form_ID sorts before every id, so rows at exactly start_dt are included
+        cursors = {column: (start_dt, "") for column in columns}
+    
+    changed = {}
+    has_more = False
+    with get_db_session() as db:
+        for column_name in columns:
+            column = getattr(model, column_name)
+            after, after_id = cursors[column_name]
+            query = db.query(model).filter(or_(column > after, and_(column == after, model.Form_ID > after_id)))
+            query = filter_ids(query, model.Site_ID, None, site_ids)
+            rows = query.order_by(column, model.Form_ID).limit(limit).all()
+            if rows:
+                cursors[column_name] = (getattr(rows[-1], column_name), rows[-1].Form_ID)
+            has_more = has_more or len(rows) == limit
+            for row in rows:
+                changed[row.Form_ID] = row
+        
+        # Oldest change first, by the latest of the tracked timestamps
+        rows = sorted(changed.values(), key=lambda row: max(getattr(row, name) or datetime.min for name in columns))
+        records = [serialize(row) for row in rows]
+    
+    next_token = encode_page_token({
+        "feed": feed,
+        "site_ids": site_ids,
+        "cursors": {column: [moment.isoformat(sep=" "), form_id] for column, (moment, form_id) in cursors.items()}
+    })
+    return {
+        "feed": feed,
+        "total_records": len(records),
+        "has_more": has_more,
+        "next_token": next_token,
+        "records": records
+    }
+
+
+@mcp.tool()
+@db_admission.admit(Priority.LOW, max_concurrent=1)
+@db_queries.guard()
+@offload(db_pool)
+def refresh_mirror(tables: Optional[List[str]] = None, full: bool = False) -> Dict[str, Any]:
+    """Update the local SQLite mirror that query tools read with source="mirror".
+    
+    Args:
+        tables: Optional list of model names to refresh (default: all of
+            AgencySites, AgencySiteRooms, DRDPItems, DailyAttendanceLog, DRDPRecord,
+            LessonPlansPreschool, LessonPlansIT, LessonPlansDetail, CenterSupportReport)
+        full: If True, recopy the tables instead of fetching only changes
+    
+    Returns:
+        Dictionary with per-table refresh mode, rows copied and deleted, and seconds taken
+    
+    Note:
+        - The first refresh of a table copies it in full; later refreshes fetch
+          rows whose DOR/submit/meal timestamps moved past the stored watermark
+          (attendance, DRDP, lesson plans); site, room and DRDP item tables are
+          small and recopied each time
+        - Lesson plan details and support reports have no change timestamp: later
+          refreshes fetch rows whose key is new, plus support reports with a
+          Form_Date and details of lesson plans with a DOR in the last
+          MIRROR_LOOKBACK_DAYS days (default 14). Edits to older rows of these
+          tables are only mirrored by a full refresh
+        - Rows deleted from attendance, DRDP or lesson plan tables stay in the
+          mirror until a full refresh
+        - For a first build of large tables, refresh them one at a time so each
+          call stays within DB_CALL_TIMEOUT
+    """
+    unknown = [table for table in tables or [] if table not in MIRROR_TABLES]
+    if unknown:
+        return {"error": f"Unknown tables: {', '.join(unknown)}. Must be among: {', '.join(MIRROR_TABLES)}."}
+    
+    started = time.perf_counter()
+    results = db_mirror.refresh(tables, full=full)
+    return {
+        "tables": results,
+        "ready": db_mirror.is_ready(),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+# Weekly/monthly summaries in the local store, kept current by refresh_summaries
+db_summaries = SummaryTables(
+    watermarks,
+    DRDP_COLUMNS,
+    support_lookback_days=int(os.getenv("SUMMARY_SUPPORT_LOOKBACK_DAYS", "14"))
+)
+
+
+@mcp.tool()
+@db_admission.admit(Priority.LOW, max_concurrent=1)
+@db_queries.guard()
+@offload(db_pool)
+def refresh_summaries(metrics: Optional[List[str]] = None, full: bool = False, source: str = "primary") -> Dict[str, Any]:
+    """Update the weekly and monthly summary tables read by query_summaries.
+    
+    Args:
+        metrics: Optional list of summaries to refresh: "attendance", "support_reports",
+            "drdp" (default: all)
+        full: If True, rebuild every week and month instead of only those touched
+        source: "primary" (MySQL) or "mirror" to aggregate from the local mirror
+    
+    Returns:
+        Dictionary with per-summary mode, number of weeks and months rewritten, and seconds taken
+    
+    Note:
+        - Only weeks and months containing rows inserted or updated since the last
+          refresh are recomputed (attendance by DOR/Meal_Confirm_Datetime, DRDP by
+          Submit_Datetime/DOR); support reports recompute the weeks within
+          SUMMARY_SUPPORT_LOOKBACK_DAYS of the latest report
+        - Deleted rows, or rows moved to another date, are reflected after a full refresh
+    """
+    unknown = [metric for metric in metrics or [] if metric not in SUMMARY_SOURCES]
+    if unknown:
+        return {"error": f"Unknown metrics: {', '.join(unknown)}. Must be among: {', '.join(SUMMARY_SOURCES)}."}
+    if validate_source(source):
+        return {"error": validate_source(source)}
+    
+    started = time.perf_counter()
+    results = db_summaries.refresh(metrics, full=full, source=source)
+    return {
+        "metrics": results,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+@mcp.tool()
+@offload(db_pool)
+def query_summaries(
+    metric: str,
+    period: str = "week",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    site_ids: Optional[List[str]] = None,
+    room_ids: Optional[List[str]] = None,
+    by_room: bool = False
+) -> Dict[str, Any]:
+    """Get weekly or monthly dashboard figures per site (or room) from the summary tables.
+    
+    Args:
+        metric: "attendance" (log counts and meal totals), "support_reports"
+            (report counts and support hours) or "drdp" (average rating per domain)
+        period: "week" (starting Monday) or "month"
+        start_date: Start date in YYYY-MM-DD format (defaults to 12 weeks ago);
+            the week or month containing it is included
+        end_date: End date in YYYY-MM-DD format (defaults to today)
+        site_ids: Optional list of Site_IDs
+        room_ids: Optional list of Room_IDs (attendance and drdp only)
+        by_room: Return one record per room instead of per site (attendance and drdp only)
+    
+    Returns:
+        Dictionary containing the query parameters used, when the summary was last
+        refreshed, and one record per period and site (or room), newest first
+    
+    Note:
+        - Reads only the local summary tables, so the cost depends on the number of
+          sites and periods returned, not on how many raw rows they cover
+        - Figures are as of the last refresh_summaries call (see refreshed_at)
+        - DRDP averages leave out "unable to rate" (11) and "conditional" (99) values
+    """
+    import models
+    from database import get_local_db_session
+    
+    if metric not in SUMMARY_SOURCES:
+        return {"error": f"Invalid metric. Must be one of: {', '.join(SUMMARY_SOURCES)}.", "records": []}
+    if period not in SUMMARY_PERIODS:
+        return {"error": f"Invalid period. Must be one of: {', '.join(SUMMARY_PERIODS)}.", "records": []}
+    if metric == "support_reports" and (room_ids or by_room):
+        return {"error": "support_reports are summarized per site; room_ids and by_room are not supported.", "records": []}
+    state = db_summaries.state(metric)
+    if state is None:
+        return {"error": f"The {metric} summary has not been built yet. Run refresh_summaries first.", "records": []}
+    
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else today - timedelta(weeks=12)
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d") if end_date else today
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD format.", "records": []}
+    if start_dt > end_dt:
+        return {"error": "Start date cannot be after end date.", "records": []}
+    
+    summary = getattr(models, SUMMARY_SOURCES[metric][3])
+    totals = {}
+    with get_local_db_session() as db:
+        query = db.query(summary).filter(
+            summary.Period == period,
+            summary.Period_Start >= period_start(start_dt, period),
+            summary.Period_Start <= end_dt
+        )
+        query = filter_ids(query, summary.Site_ID, None, site_ids)
+        if metric != "support_reports":
+            query = filter_ids(query, summary.Room_ID, None, room_ids)
+        
+        # Roll rooms (and, for DRDP, domains) up into one record per period and site or room
+        for row in query:
+            key = (row.Period_Start, row.Site_ID, row.Room_ID if by_room else None)
+            if metric == "attendance":
+                total = totals.setdefault(key, {"log_count": 0, "breakfast": 0, "lunch": 0, "pm_snack": 0})
+                total["log_count"] += row.Log_Count or 0
+                total["breakfast"] += row.Breakfast or 0
+                total["lunch"] += row.Lunch or 0
+                total["pm_snack"] += row.PM_Snack or 0
+            elif metric == "support_reports":
+                total = totals.setdefault(key, {"report_count": 0, "timed_reports": 0, "support_hours": 0.0})
+                total["report_count"] += row.Report_Count or 0
+                total["timed_reports"] += row.Timed_Reports or 0
+                total["support_hours"] += row.Support_Hours or 0.0
+            else:
+                domain = totals.setdefault(key, {}).setdefault(row.Domain, [0, 0.0, 0])
+                domain[0] += row.Record_Count or 0
+                domain[1] += row.Rating_Sum or 0.0
+                domain[2] += row.Rating_Count or 0
+    
+    records = []
+    for (start, site_id, room_id), total in sorted(totals.items(), key=lambda item: (-item[0][0].toordinal(), item[0][1], item[0][2] or "")):
+        record = {"period_start": start.strftime("%Y-%m-%d"), "site_id": site_id}
+        if by_room:
+            record["room_id"] = room_id
+        if metric == "attendance":
+            record.update(total, meals_total=total["breakfast"] + total["lunch"] + total["pm_snack"])
+        elif metric == "support_reports":
+            record.update(total, support_hours=round(total["support_hours"], 2))
+        else:
+            record["record_count"] = max(count for count, _, _ in total.values())
+            record["domain_averages"] = {
+                domain: round(rating_sum / rating_count, 2) if rating_count else None
+                for domain, (_, rating_sum, rating_count) in total.items()
+            }
+        records.append(record)
+    
+    return {
+        "query_info": {
+            "metric": metric,
+            "period": period,
+            "start_date": start_dt.strftime("%Y-%m-%d"),
+            "end_date": end_dt.strftime("%Y-%m-%d"),
+            "site_ids": site_ids,
+            "room_ids": room_ids,
+            "by_room": by_room,
+            "refreshed_at": state["refreshed_at"],
+            "total_records": len(records)
+        },
+        "records": records
+    }
+
+
+def encode_page_token(state: Dict[str, Any]) -> str:
+    """Encode continuation state as an opaque, URL-safe page token."""
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode()
+
+
+def decode_page_token(token: str) -> Dict[str, Any]:
+    """Decode a page token produced by encode_page_token.
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except ValueError:
+        raise ValueError("Invalid page_token. Pass the next_page_token from a previous response unchanged.")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid page_token. Pass the next_page_token from a previous response unchanged.")
+    return state
+
+
+def get_file_revision(spreadsheet_id: str) -> Optional[str]:
+    """Get a file's current revision from Drive metadata (a cheap request).
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet
+    
+    Returns:
+        The Drive file version (or modifiedTime if version is unavailable),
+        or None if it cannot be determined, in which case reads bypass the cache
+    """
+    from google_service import get_drive_service
+    
+    try:
+        metadata = google_api.execute('drive', get_drive_service().files().get(
+            fileId=spreadsheet_id,
+            fields="version,modifiedTime"
+        ))
+    except HttpError:
+        return None
+    return metadata.get('version') or metadata.get('modifiedTime')
+
+
+def fetch_sheet_values(
+    service,
+    spreadsheet_id: str,
+    range_name: str,
+    revision: Optional[str] = None,
+    value_render_option: str = "FORMATTED_VALUE"
+) -> List[List[Any]]:
+    """Read a range's values, serving them from sheet_cache when the file is unchanged.
+    
+    Args:
+        service: Google Sheets API service
+        spreadsheet_id: The ID of the spreadsheet
+        range_name: The A1 notation of the range to read
+        revision: File revision from get_file_revision; None skips the cache
+        value_render_option: FORMATTED_VALUE (as displayed) or UNFORMATTED_VALUE (typed)
+    
+    Returns:
+        2D list of cell values
+    """
+    cache_key = range_name if value_render_option == "FORMATTED_VALUE" else f"{range_name}|{value_render_option}"
+    if revision is not None:
+        values = sheet_cache.get(spreadsheet_id, cache_key, revision)
+        if values is not None:
+            return values
+    
+    result = google_api.execute('sheets', service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=range_name,
+        valueRenderOption=value_render_option
+    ))
+    values = result.get('values', [])
+    
+    if revision is not None:
+        sheet_cache.put(spreadsheet_id, cache_key, revision, values)
+    return values
+
+
+def get_sheet_grid(service, spreadsheet_id: str, sheet_title: Optional[str] = None, revision: Optional[str] = None) -> Dict[str, Any]:
+    """Look up a sheet tab's title and grid dimensions from spreadsheet metadata.
+    
+    Args:
+        service: Google Sheets API service
+        spreadsheet_id: The ID of the spreadsheet
+        sheet_title: Tab title to look up (defaults to the first tab)
+        revision: File revision from get_file_revision; None skips the cache
+    
+    Returns:
+        Dictionary with the tab title, sheet_id, row_count and column_count
+    
+    Raises:
+        ValueError: If the tab does not exist
+    """
+    # Tab sizes are cached alongside values as [title, rows, columns, sheet ID] rows
+    tabs = sheet_cache.get(spreadsheet_id, "#tabs", revision) if revision is not None else None
+    if tabs is None:
+        metadata = google_api.execute('sheets', service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))"
+        ))
+        tabs = []
+        for sheet in metadata.get('sheets', []):
+            properties = sheet.get('properties', {})
+            grid = properties.get('gridProperties', {})
+            tabs.append([properties.get('title'), grid.get('rowCount', 0), grid.get('columnCount', 0), properties.get('sheetId')])
+        if revision is not None:
+            sheet_cache.put(spreadsheet_id, "#tabs", revision, tabs)
+    
+    for title, row_count, column_count, sheet_id in tabs:
+        if sheet_title is None or title == sheet_title:
+            return {
+                "title": title,
+                "sheet_id": sheet_id,
+                "row_count": row_count,
+                "column_count": column_count
+            }
+    
+    raise ValueError(f"Sheet '{sheet_title}' not found in spreadsheet {spreadsheet_id}")
+
+
+def resolve_sheet_window(service, spreadsheet_id: str, range_name: str, revision: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve an A1 range into the row/column bounds used for chunked reads.
+    
+    Open-ended ranges (e.g. "Sheet1" or "Sheet1!A2:D") are bounded by the
+    tab's grid size so they can be split into row windows.
+    
+    Returns:
+        Read state: spreadsheet ID, sheet title, column bounds, next row to read,
+        last row of the range and the tab's column count
+    """
+    parsed = parse_range(range_name)
+    grid = get_sheet_grid(service, spreadsheet_id, parsed.sheet, revision)
+    
+    start_col, end_col = parsed.start_col, parsed.end_col
+    if start_col or end_col:
+        start_col = start_col or 1
+        end_col = end_col or grid['column_count']
+    
+    return {
+        "id": spreadsheet_id,
+        "sheet": grid['title'],
+        "start_col": start_col,
+        "end_col": end_col,
+        "next_row": parsed.start_row or 1,
+        "end_row": min(parsed.end_row or grid['row_count'], grid['row_count']),
+        "grid_columns": grid['column_count']
+    }
+
+
+def read_sheet_window(service, state: Dict[str, Any], chunk_rows: int, revision: Optional[str] = None):
+    """Fetch the next row window described by a read state.
+    
+    Returns:
+        Tuple of (A1 range read, row values, read state for the following
+        window or None when the range is exhausted)
+    """
+    first_row = state['next_row']
+    last_row = min(first_row + chunk_rows - 1, state['end_row'])
+    if first_row > last_row:
+        return None, [], None
+    
+    window = format_range(state['sheet'], state['start_col'], first_row, state['end_col'], last_row)
+    values = fetch_sheet_values(service, state['id'], window, revision)
+    
+    next_state = dict(state, next_row=last_row + 1) if last_row < state['end_row'] else None
+    return window, values, next_state
+
+
+def iter_sheet_chunks(service, spreadsheet_id: str, range_name: str, chunk_rows: int = SHEET_CHUNK_ROWS, use_cache: bool = True):
+    """Yield (A1 range, row values) pairs covering a sheet range window by window.
+    
+    Only one window of rows is held in memory at a time. The file revision is
+    checked once up front and shared by every window; one-off bulk reads pass
+    use_cache=False so they neither pay for the check nor flush the cache.
+    """
+    revision = get_file_revision(spreadsheet_id) if use_cache else None
+    state = resolve_sheet_window(service, spreadsheet_id, range_name, revision)
+    while state:
+        window, values, state = read_sheet_window(service, state, chunk_rows, revision)
+        if window:
+            yield window, values
+
+
+@mcp.tool()
+@offload(google_pool)
+def list_spreadsheets(
+    max_results: int = 20,
+    name_contains: Optional[str] = None,
+    modified_after: Optional[str] = None,
+    modified_before: Optional[str] = None,
+    page_token: Optional[str] = None,
+    use_index: bool = False
+) -> str:
+    """
+    List user's Google Spreadsheets
+    
+    Args:
+        max_results: Maximum number of spreadsheets to return per page (default: 20, max: 1000)
+        name_contains: Optional filter by spreadsheet name (partial match, case-insensitive)
+        modified_after: Optional filter for sheets modified on or after this date (YYYY-MM-DD)
+        modified_before: Optional filter for sheets modified before this date (YYYY-MM-DD)
+        page_token: Continuation token from a previous call to get the next page
+        use_index: If True, search the local metadata index instead of listing Drive
+    
+    Returns:
+        JSON string with spreadsheet names, IDs, URLs and modified times, plus
+        next_page_token (null on the last page)
+    
+    Note:
+        - Results are ordered by most recently modified first
+        - The local index is built on first use and then kept current through
+          the Drive changes feed, so repeated searches are answered locally
+    """
+    from google_service import get_drive_service
+    
+    max_results = max(1, min(max_results, 1000))
+    
+    date_bounds = {}
+    for field, value in (("modified_after", modified_after), ("modified_before", modified_before)):
+        if value:
+            try:
+                date_bounds[field] = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%dT%H:%M:%S")
+            except ValueError:
+                return json.dumps({"error": f"Invalid {field} format. Use YYYY-MM-DD format."})
+    
+    service = get_drive_service()
+    
+    if use_index:
+        try:
+            offset = decode_page_token(page_token).get('offset', 0) if page_token else 0
+        except ValueError as e:
+            return json.dumps({"error": str(e)})
+        
+        drive_index.refresh(service, execute=lambda request: google_api.execute('drive', request))
+        files, total = drive_index.search(
+            name_contains=name_contains,
+            modified_after=date_bounds.get("modified_after"),
+            modified_before=date_bounds.get("modified_before"),
+            offset=offset,
+            limit=max_results
+        )
+        next_offset = offset + len(files)
+        next_page_token = encode_page_token({"offset": next_offset}) if next_offset < total else None
+    else:
+        query = [f"mimeType='{SPREADSHEET_MIME_TYPE}'", "trashed=false"]
+        if name_contains:
+            escaped = name_contains.replace('\\', '\\\\').replace("'", "\\'")
+            query.append(f"name contains '{escaped}'")
+        if "modified_after" in date_bounds:
+            query.append(f"modifiedTime >= '{date_bounds['modified_after']}'")
+        if "modified_before" in date_bounds:
+            query.append(f"modifiedTime < '{date_bounds['modified_before']}'")
+        
+        results = google_api.execute('drive', service.files().list(
+            q=" and ".join(query),
+            pageSize=max_results,
+            pageToken=page_token,
+            orderBy="modifiedTime desc",
+            fields="nextPageToken, files(id, name, webViewLink, modifiedTime)"
+        ))
+        files = results.get('files', [])
+        next_page_token = results.get('nextPageToken')
+    
+    spreadsheets = [{
+        'name': f['name'],
+        'id': f['id'],
+        'url': f['webViewLink'],
+        'modified_time': f.get('modifiedTime')
+    } for f in files]
+    
+    return json.dumps({
+        'spreadsheets': spreadsheets,
+        'next_page_token': next_page_token
+    }, indent=2)
+
+
+@mcp.tool()
+@offload(google_pool)
+def describe_spreadsheets(spreadsheet_ids: List[str], include_owners: bool = False) -> str:
+    """
+    Get tab names and grid dimensions for many spreadsheets at once
+    
+    Args:
+        spreadsheet_ids: Spreadsheet IDs to describe (e.g. from list_spreadsheets)
+        include_owners: If True, also fetch each file's owners and modified time from Drive
+    
+    Returns:
+        JSON string with one entry per spreadsheet (title, locale, time zone and
+        tabs with their row/column counts) and an errors list for IDs that
+        could not be read
+    
+    Note:
+        - Lookups are sent as multipart batch requests of up to 100 files, so
+          describing N spreadsheets takes about N/100 round trips
+        - Sub-requests that hit rate limits or server errors are retried
+        - At most DESCRIBE_MAX_SPREADSHEETS IDs per call (default: what the Sheets
+          quota allows within GOOGLE_CALL_TIMEOUT, 100 at the default settings);
+          each ID uses a quota token, so larger calls would time out
+    """
+    from google_service import get_drive_service, get_sheets_service
+    
+    # Batch request IDs must be unique; keep the caller's order
+    spreadsheet_ids = list(dict.fromkeys(spreadsheet_ids))
+    if not spreadsheet_ids:
+        return json.dumps({"error": "spreadsheet_ids must contain at least one ID"})
+    if len(spreadsheet_ids) > DESCRIBE_MAX_SPREADSHEETS:
+        return json.dumps({
+            "error": f"Too many spreadsheet IDs ({len(spreadsheet_ids)}); the maximum is {DESCRIBE_MAX_SPREADSHEETS}. Split them across calls."
+        })
+    
+    service = get_sheets_service()
+    metadata, failures = google_api.execute_batch('sheets', service.new_batch_http_request, {
+        spreadsheet_id: service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="spreadsheetId,properties(title,locale,timeZone),sheets.properties(sheetId,title,index,gridProperties(rowCount,columnCount,frozenRowCount))"
+        )
+        for spreadsheet_id in spreadsheet_ids
+    })
+    
+    files = {}
+    if include_owners:
+        drive_service = get_drive_service()
+        files, _ = google_api.execute_batch('drive', drive_service.new_batch_http_request, {
+            spreadsheet_id: drive_service.files().get(
+                fileId=spreadsheet_id,
+                fields="owners(displayName,emailAddress),modifiedTime,webViewLink"
+            )
+            for spreadsheet_id in metadata
+        })
+    
+    spreadsheets = []
+    for spreadsheet_id in spreadsheet_ids:
+        if spreadsheet_id not in metadata:
+            continue
+        properties = metadata[spreadsheet_id].get('properties', {})
+        entry = {
+            'id': spreadsheet_id,
+            'title': properties.get('title'),
+            'locale': properties.get('locale'),
+            'time_zone': properties.get('timeZone'),
+            'sheets': [{
+                'sheet_id': sheet['properties'].get('sheetId'),
+                'title': sheet['properties'].get('title'),
+                'index': sheet['properties'].get('index'),
+                'row_count': sheet['properties'].get('gridProperties', {}).get('rowCount', 0),
+                'column_count': sheet['properties'].get('gridProperties', {}).get('columnCount', 0),
+                'frozen_rows': sheet['properties'].get('gridProperties', {}).get('frozenRowCount', 0)
+            } for sheet in metadata[spreadsheet_id].get('sheets', [])]
+        }
+        if spreadsheet_id in files:
+            entry['owners'] = [
+                {'name': owner.get('displayName'), 'email': owner.get('emailAddress')}
+                for owner in files[spreadsheet_id].get('owners', [])
+            ]
+            entry['modified_time'] = files[spreadsheet_id].get('modifiedTime')
+            entry['url'] = files[spreadsheet_id].get('webViewLink')
+        spreadsheets.append(entry)
+    
+    errors = []
+    for spreadsheet_id, error in failures.items():
+        status = error.resp.status if isinstance(error, HttpError) and error.resp is not None else None
+        errors.append({'id': spreadsheet_id, 'status': status, 'error': str(error)})
+    
+    return json.dumps({
+        'spreadsheets': spreadsheets,
+        'errors': errors
+    }, indent=2)
+
+
+@mcp.tool()
+@offload(google_pool)
+def read_sheet(
+    spreadsheet_id: str,
+    range_name: str = "Sheet1",
+    chunk_rows: Optional[int] = None,
+    page_token: Optional[str] = None,
+    preview: bool = False,
+    sample_rows: int = 10
+) -> str:
+    """
+    Read data from a Google Sheet
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet (from the URL)
+        range_name: The A1 notation of the range to read (default: Sheet1)
+        chunk_rows: Optional number of rows per page; enables chunked reading
+        page_token: Continuation token from a previous chunked read
+        preview: If True, return only grid size, header row and a sample of rows
+        sample_rows: Number of rows after the header to include in preview mode (default: 10)
+    
+    Returns:
+        JSON string with the sheet data. In chunked mode, a page with the
+        range read, its values and next_page_token (null on the last page)
+    
+    Note:
+        - Use preview=True first to profile large sheets cheaply
+        - Chunk size is capped at 10000 rows per page
+        - Repeated reads of an unchanged spreadsheet are served from cache
+    """
+    from google_service import get_sheets_service
+    
+    service = get_sheets_service()
+    revision = get_file_revision(spreadsheet_id)
+    
+    if preview:
+        try:
+            state = resolve_sheet_window(service, spreadsheet_id, range_name, revision)
+        except ValueError as e:
+            return json.dumps({"error": str(e)})
+        window, values, _ = read_sheet_window(service, state, max(sample_rows, 0) + 1, revision)
+        return json.dumps({
+            "sheet": state['sheet'],
+            "grid_rows": max(state['end_row'] - state['next_row'] + 1, 0),
+            "grid_columns": state['grid_columns'],
+            "sampled_range": window,
+            "header": values[0] if values else [],
+            "sample_rows": values[1:]
+        }, indent=2)
+    
+    if chunk_rows or page_token:
+        try:
+            if page_token:
+                state = decode_page_token(page_token)
+                if state.get('id') != spreadsheet_id:
+                    raise ValueError("page_token does not belong to this spreadsheet.")
+                if not all(key in state for key in ('sheet', 'start_col', 'end_col')) or not all(
+                    isinstance(state.get(key), int) for key in ('next_row', 'end_row')
+                ):
+                    raise ValueError("Invalid page_token. Pass the next_page_token from a previous response unchanged.")
+            else:
+                state = resolve_sheet_window(service, spreadsheet_id, range_name, revision)
+        except ValueError as e:
+            return json.dumps({"error": str(e)})
+        
+        chunk_rows = max(1, min(chunk_rows or state.get('chunk_rows') or SHEET_CHUNK_ROWS, SHEET_MAX_CHUNK_ROWS))
+        window, values, next_state = read_sheet_window(service, state, chunk_rows, revision)
+        
+        # Compact separators: pages exist to keep responses small
+        return json.dumps({
+            "range": window,
+            "start_row": state['next_row'],
+            "end_row": state['end_row'],
+            "values": values,
+            "next_page_token": encode_page_token(dict(next_state, chunk_rows=chunk_rows)) if next_state else None
+        }, separators=(',', ':'))
+    
+    values = fetch_sheet_values(service, spreadsheet_id, range_name, revision)
+    return json.dumps(values, indent=2)
+
+
+@mcp.tool()
+@offload(google_pool)
+def write_sheet(spreadsheet_id: str, range_name: str, values: list) -> str:
+    """
+    Write data to a Google Sheet
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet
+        range_name: The A1 notation of where to write
+        values: 2D list of values to write
+    
+    Returns:
+        Confirmation message
+    """
+    from google_service import get_sheets_service
+    
+    service = get_sheets_service()
+    body = {'values': values}
+    
+    result = google_api.execute('sheets', service.spreadsheets().values().update(
+        spreadsheetId=spreadsheet_id,
+        range=range_name,
+        valueInputOption='RAW',
+        body=body
+    ))
+    sheet_cache.invalidate(spreadsheet_id)
+    
+    return f"Updated {result.get('updatedCells')} cells"
+
+
+@mcp.tool()
+@offload(google_pool)
+def append_sheet(spreadsheet_id: str, range_name: str, values: list) -> str:
     """
     Append data to a Google Sheet
     
@@ -824,20 +2339,24 @@ def append_sheet(spreadsheet_id: str, range_name: str, values: list) -> str:
     Returns:
         Confirmation message
     """
+    from google_service import get_sheets_service
+    
     service = get_sheets_service()
     body = {'values': values}
     
-    result = service.spreadsheets().values().append(
+    result = google_api.execute('sheets', service.spreadsheets().values().append(
         spreadsheetId=spreadsheet_id,
         range=range_name,
         valueInputOption='RAW',
         body=body
-    ).execute()
+    ), idempotent=False)
+    sheet_cache.invalidate(spreadsheet_id)
     
     return f"Appended {result.get('updates').get('updatedCells')} cells"
 
 
 @mcp.tool()
+@offload(google_pool)
 def create_spreadsheet(title: str) -> str:
     """
     Create a new Google Spreadsheet
@@ -848,6 +2367,8 @@ def create_spreadsheet(title: str) -> str:
     Returns:
         JSON with spreadsheet ID and URL
     """
+    from google_service import get_sheets_service
+    
     service = get_sheets_service()
     spreadsheet = {
         'properties': {
@@ -855,7 +2376,7 @@ def create_spreadsheet(title: str) -> str:
         }
     }
     
-    result = service.spreadsheets().create(body=spreadsheet).execute()
+    result = google_api.execute('sheets', service.spreadsheets().create(body=spreadsheet), idempotent=False)
     
     return json.dumps({
         'spreadsheet_id': result.get('spreadsheetId'),
@@ -864,6 +2385,7 @@ def create_spreadsheet(title: str) -> str:
 
 
 @mcp.tool()
+@offload(google_pool)
 def create_form(title: str, description: str = "") -> str:
     """
     Create a new Google Form
@@ -875,6 +2397,8 @@ def create_form(title: str, description: str = "") -> str:
     Returns:
         JSON with form ID and URL
     """
+    from google_service import get_forms_service
+    
     service = get_forms_service()
     form = {
         'info': {
@@ -886,7 +2410,7 @@ def create_form(title: str, description: str = "") -> str:
     if description:
         form['info']['description'] = description
     
-    result = service.forms().create(body=form).execute()
+    result = google_api.execute('forms', service.forms().create(body=form), idempotent=False)
     
     return json.dumps({
         'form_id': result.get('formId'),
@@ -894,7 +2418,559 @@ def create_form(title: str, description: str = "") -> str:
     }, indent=2)
 
 
+@mcp.tool()
+@offload(google_pool)
+def sync_sheet(
+    spreadsheet_id: str,
+    range_name: str = "Sheet1",
+    values: Optional[list] = None,
+    records: Optional[List[Dict[str, Any]]] = None,
+    clear_extra: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Make a sheet match a dataset by writing only the cells that changed.
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet
+        range_name: Tab or top-left anchor cell of the data, e.g. "Sheet1" or "Sheet1!B2" (default: Sheet1)
+        values: Target data as a 2D list of values
+        records: Alternatively, the "records" list from a query tool result;
+            written as a header row of field names followed by one row per record
+        clear_extra: Blank out existing cells outside the target data (default: True)
+        dry_run: If True, report what would be written without writing
+    
+    Returns:
+        Dictionary with the number of cells written, ranges touched and rows
+        appended, compared with the cell count of a full rewrite
+    
+    Note:
+        - Current values are read once (or served from cache) and compared cell by cell
+        - Changed cells are written with a single batchUpdate request
+        - The tab grows automatically if the target data doesn't fit
+    """
+    from google_service import get_sheets_service
+    
+    if (values is None) == (records is None):
+        return {"error": "Provide exactly one of values or records."}
+    target = records_to_rows(records) if records is not None else values
+    if not all(isinstance(row, list) for row in target):
+        return {"error": "values must be a 2D list (a list of rows)."}
+    
+    service = get_sheets_service()
+    revision = get_file_revision(spreadsheet_id)
+    
+    try:
+        anchor = parse_range(range_name)
+        grid = get_sheet_grid(service, spreadsheet_id, anchor.sheet, revision)
+    except ValueError as e:
+        return {"error": str(e)}
+    first_col, first_row = anchor.start_col or 1, anchor.start_row or 1
+    
+    # Read everything from the anchor to the end of the grid; trailing blanks are trimmed by the API
+    current = []
+    if first_row <= grid['row_count'] and first_col <= grid['column_count']:
+        current = fetch_sheet_values(
+            service,
+            spreadsheet_id,
+            format_range(grid['title'], first_col, first_row, grid['column_count'], grid['row_count']),
+            revision,
+            value_render_option="UNFORMATTED_VALUE"
+        )
+    
+    blocks = diff_blocks(current, target, clear_extra)
+    cells_written = sum(len(row) for block in blocks for row in block[4])
+    target_width = max((len(row) for row in target), default=0)
+    rows_appended = max(len(target) - len(current), 0)
+    
+    summary = {
+        "query_info": {
+            "spreadsheet_id": spreadsheet_id,
+            "sheet": grid['title'],
+            "anchor": f"{index_to_column(first_col)}{first_row}",
+            "dry_run": dry_run
+        },
+        "cells_written": cells_written,
+        "full_rewrite_cells": len(target) * target_width,
+        "ranges_written": len(blocks),
+        "rows_appended": rows_appended,
+        "unchanged": not blocks
+    }
+    if dry_run or not blocks:
+        return summary
+    
+    # Grow the tab first if the data would extend past its grid
+    needed_rows = max(first_row + block[2] for block in blocks)
+    needed_cols = max(first_col + block[3] for block in blocks)
+    grow = []
+    if needed_rows > grid['row_count']:
+        grow.append({"appendDimension": {"sheetId": grid['sheet_id'], "dimension": "ROWS", "length": needed_rows - grid['row_count']}})
+    if needed_cols > grid['column_count']:
+        grow.append({"appendDimension": {"sheetId": grid['sheet_id'], "dimension": "COLUMNS", "length": needed_cols - grid['column_count']}})
+    if grow:
+        google_api.execute('sheets', service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={"requests": grow}
+        ), idempotent=False)
+    
+    google_api.execute('sheets', service.spreadsheets().values().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={
+            "valueInputOption": "RAW",
+            "data": [
+                {
+                    "range": format_range(grid['title'], first_col + col_start, first_row + row_start, first_col + col_end, first_row + row_end),
+                    "values": block_values
+                }
+                for row_start, col_start, row_end, col_end, block_values in blocks
+            ]
+        }
+    ))
+    sheet_cache.invalidate(spreadsheet_id)
+    
+    return summary
+
+
+@mcp.tool()
+@offload(google_pool)
+def profile_sheet(
+    spreadsheet_id: str,
+    range_name: str = "Sheet1",
+    has_header: bool = True,
+    top_k: int = 5
+) -> Dict[str, Any]:
+    """Profile a Google Sheet server-side: column types and summary statistics.
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet
+        range_name: The A1 notation of the range to profile (default: Sheet1)
+        has_header: Whether the first row holds column names (default: True)
+        top_k: Number of most frequent values to report per column (default: 5)
+    
+    Returns:
+        Dictionary with row/column counts and, per column, the inferred type
+        (numeric, date, categorical or text), missing-value count and
+        type-specific statistics: min/max/mean/median/std/percentiles and
+        IQR outliers for numbers, date span for dates, top-k frequencies for
+        categorical and text columns
+    
+    Note:
+        - Use this instead of reading raw values when summarizing a sheet
+        - Fully blank rows are counted separately and excluded from statistics
+    """
+    from google_service import get_sheets_service
+    from sheet_profile import profile_column
+    
+    try:
+        start_col = parse_range(range_name).start_col or 1
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    service = get_sheets_service()
+    header, columns, row_count, blank_rows = None, [], 0, 0
+    
+    for _, values in iter_sheet_chunks(service, spreadsheet_id, range_name, SHEET_MAX_CHUNK_ROWS):
+        for row in values:
+            if has_header and header is None:
+                header = row
+                continue
+            if not any(str(cell).strip() for cell in row):
+                blank_rows += 1
+                continue
+            # Columns first seen on a later row are back-filled as missing
+            while len(columns) < len(row):
+                columns.append([''] * row_count)
+            for j, column in enumerate(columns):
+                column.append(row[j] if j < len(row) else '')
+            row_count += 1
+    
+    header = header or []
+    while len(columns) < len(header):
+        columns.append([''] * row_count)
+    
+    profiles = []
+    for j, column in enumerate(columns):
+        name = str(header[j]).strip() if j < len(header) and str(header[j]).strip() else f"Column {index_to_column(start_col + j)}"
+        profiles.append(profile_column(name, column, top_k))
+    
+    return {
+        "query_info": {
+            "spreadsheet_id": spreadsheet_id,
+            "range_name": range_name,
+            "has_header": has_header
+        },
+        "row_count": row_count,
+        "blank_rows": blank_rows,
+        "column_count": len(columns),
+        "columns": profiles
+    }
+
+
+def get_import_model(table: str):
+    """Find the ORM model for a model or table name enabled for imports.
+    
+    Returns:
+        The model class, or None if it does not exist or is not in IMPORT_ALLOWED_TABLES
+    """
+    import models
+    
+    for name in models.__all__:
+        model = getattr(models, name)
+        if table in (name, model.__tablename__) and (name in IMPORT_ALLOWED_TABLES or model.__tablename__ in IMPORT_ALLOWED_TABLES):
+            return model
+    return None
+
+
+def flush_import_batch(db, model, batch: List, on_duplicate: str):
+    """Insert a batch of (sheet row number, record) pairs in one transaction.
+    
+    If the batch insert fails, rows are retried one at a time so only the
+    offending rows are rejected.
+    
+    Returns:
+        Tuple of (rows loaded, list of (sheet row number, reason) rejects)
+    """
+    from database import bulk_insert
+    from sqlalchemy.exc import SQLAlchemyError
+    
+    try:
+        bulk_insert(db, model, [record for _, record in batch], on_duplicate)
+        db.commit()
+        return len(batch), []
+    except SQLAlchemyError:
+        db.rollback()
+    
+    loaded, rejects = 0, []
+    for row_number, record in batch:
+        try:
+            bulk_insert(db, model, [record], on_duplicate)
+            db.commit()
+            loaded += 1
+        except SQLAlchemyError as e:
+            db.rollback()
+            rejects.append((row_number, str(getattr(e, 'orig', None) or e)[:200]))
+    return loaded, rejects
+
+
+@mcp.tool()
+@db_admission.admit(Priority.LOW, max_concurrent=per_worker(2))
+@db_queries.guard()
+@offload(google_pool)
+def import_sheet_to_table(
+    spreadsheet_id: str,
+    table: str,
+    range_name: str = "Sheet1",
+    column_map: Optional[Dict[str, str]] = None,
+    on_duplicate: str = "error",
+    batch_size: int = 1000,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Bulk-load rows from a Google Sheet into a database table.
+    
+    Args:
+        spreadsheet_id: The ID of the spreadsheet
+        table: Target model or table name (e.g. "DailyAttendanceLog"); must be enabled in IMPORT_ALLOWED_TABLES
+        range_name: The A1 notation of the range to import; its first row is the header (default: Sheet1)
+        column_map: Optional mapping of sheet header -> column name, for headers that don't match column names
+        on_duplicate: What to do with rows whose primary key exists - "error" (reject), "skip" or "update"
+        batch_size: Rows inserted per transaction (default: 1000, max: 10000)
+        dry_run: If True, validate and convert rows without writing anything
+    
+    Returns:
+        Dictionary with the header-to-column mapping and counts of rows read,
+        loaded and rejected, with sample reasons for rejected rows
+    
+    Note:
+        - Headers are matched to columns ignoring case, spaces and punctuation
+        - Values are converted to each column's type; rows that don't fit are rejected
+        - Primary key columns must be mapped
+    """
+    from google_service import get_sheets_service
+    from database import get_db_session
+    from sheet_import import make_row_converter, map_headers
+    
+    if on_duplicate not in ("error", "skip", "update"):
+        return {"error": "Invalid on_duplicate. Must be 'error', 'skip' or 'update'."}
+    
+    model = get_import_model(table)
+    if model is None:
+        allowed = ", ".join(sorted(IMPORT_ALLOWED_TABLES)) or "none"
+        return {"error": f"Table '{table}' is not enabled for imports. Allowed tables: {allowed}."}
+    
+    batch_size = max(1, min(batch_size, 10000))
+    started = time.perf_counter()
+    service = get_sheets_service()
+    
+    headers, mapping, unmapped, convert = [], None, [], None
+    rows_read, rows_loaded, rejects, rejected_count = 0, 0, [], 0
+    batch = []
+    
+    with get_db_session() as db:
+        for window, values in iter_sheet_chunks(service, spreadsheet_id, range_name, SHEET_MAX_CHUNK_ROWS, use_cache=False):
+            first_row = parse_range(window).start_row
+            for offset, row in enumerate(values):
+                if mapping is None:
+                    headers = row
+                    try:
+                        mapping, unmapped = map_headers(headers, model, column_map)
+                    except ValueError as e:
+                        return {"error": str(e)}
+                    missing_keys = [c.name for c in model.__table__.primary_key.columns if c.name not in mapping.values()]
+                    if missing_keys:
+                        return {"error": f"Primary key column(s) {', '.join(missing_keys)} are not mapped from the sheet headers."}
+                    convert = make_row_converter(model, mapping)
+                    continue
+                
+                if not any(str(cell).strip() for cell in row):
+                    continue
+                rows_read += 1
+                try:
+                    batch.append((first_row + offset, convert(row)))
+                except ValueError as e:
+                    rejects.append((first_row + offset, str(e)))
+                
+                if len(batch) >= batch_size:
+                    loaded, batch_rejects = (len(batch), []) if dry_run else flush_import_batch(db, model, batch, on_duplicate)
+                    rows_loaded += loaded
+                    rejects.extend(batch_rejects)
+                    batch = []
+                
+                # Keep only a sample of reasons in memory
+                if len(rejects) > IMPORT_MAX_REJECT_SAMPLES:
+                    rejected_count += len(rejects) - IMPORT_MAX_REJECT_SAMPLES
+                    del rejects[IMPORT_MAX_REJECT_SAMPLES:]
+        
+        if batch:
+            loaded, batch_rejects = (len(batch), []) if dry_run else flush_import_batch(db, model, batch, on_duplicate)
+            rows_loaded += loaded
+            rejects.extend(batch_rejects)
+    
+    rejected_count += len(rejects)
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "query_info": {
+            "spreadsheet_id": spreadsheet_id,
+            "range_name": range_name,
+            "table": model.__tablename__,
+            "on_duplicate": on_duplicate,
+            "batch_size": batch_size,
+            "dry_run": dry_run
+        },
+        "column_mapping": {str(headers[index]): column for index, column in (mapping or {}).items()},
+        "unmapped_headers": unmapped,
+        "rows_read": rows_read,
+        "rows_loaded": rows_loaded,
+        "rows_rejected": rejected_count,
+        "rejected_samples": [
+            {"row": row_number, "reason": reason}
+            for row_number, reason in sorted(rejects)[:IMPORT_MAX_REJECT_SAMPLES]
+        ],
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def parse_google_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 3339 timestamp from a Google API into a naive UTC datetime."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def flatten_form_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a Forms API response into a row keyed by question ID.
+    
+    Text answers with several values (e.g. checkboxes) are joined with "; ";
+    file upload answers are listed by file name.
+    """
+    row = {
+        "response_id": response.get('responseId'),
+        "create_time": response.get('createTime'),
+        "last_submitted_time": response.get('lastSubmittedTime'),
+        "respondent_email": response.get('respondentEmail')
+    }
+    for question_id, answer in response.get('answers', {}).items():
+        if 'textAnswers' in answer:
+            parts = [a.get('value', '') for a in answer['textAnswers'].get('answers', [])]
+        elif 'fileUploadAnswers' in answer:
+            parts = [a.get('fileName', '') for a in answer['fileUploadAnswers'].get('answers', [])]
+        else:
+            parts = []
+        row[question_id] = "; ".join(parts)
+    return row
+
+
+def get_form_questions(service, form_id: str) -> Dict[str, str]:
+    """Map each question ID of a form to its title."""
+    form = google_api.execute('forms', service.forms().get(
+        formId=form_id,
+        fields="items(title,questionItem(question(questionId)),questionGroupItem(questions(questionId,rowQuestion(title))))"
+    ))
+    questions = {}
+    for item in form.get('items', []):
+        if 'questionItem' in item:
+            questions[item['questionItem']['question']['questionId']] = item.get('title', '')
+        for question in item.get('questionGroupItem', {}).get('questions', []):
+            row_title = question.get('rowQuestion', {}).get('title', '')
+            questions[question['questionId']] = f"{item.get('title', '')} [{row_title}]"
+    return questions
+
+
+@mcp.tool()
+@offload(google_pool)
+def pull_form_responses(
+    form_id: str,
+    destination: Optional[str] = None,
+    full_refresh: bool = False,
+    max_rows: int = 100
+) -> Dict[str, Any]:
+    """Pull new Google Form responses since the last pull.
+    
+    Args:
+        form_id: The ID of the form
+        destination: Optional table to store answers in - "local" (SQLite store) or "mysql";
+            answers go to form_response_answers, one row per response and question.
+            "mysql" requires form_response_answers in IMPORT_ALLOWED_TABLES and an
+            existing table; it is never created on MySQL
+        full_refresh: If True, ignore the stored watermark and pull every response
+        max_rows: Maximum number of flattened response rows to return (default: 100)
+    
+    Returns:
+        Dictionary with question titles, the number of new responses, the new
+        watermark, and flattened response rows keyed by question ID
+    
+    Note:
+        - The first pull loads every response; later pulls fetch only responses
+          submitted (or edited) after the stored lastSubmittedTime watermark
+        - Each destination (and pulls without one) keeps its own watermark, so a
+          preview pull never makes a later stored pull skip responses
+        - With a destination, the watermark only advances after responses are
+          stored successfully; rows lists at most max_rows of them
+        - Without a destination, the oldest max_rows new responses are returned and
+          the watermark advances only past those; when truncated is true, call
+          again to get the next ones
+    """
+    from google_service import get_forms_service
+    from database import bulk_insert, get_db_session, get_engine, get_local_db_session, get_local_engine
+    from models import FormResponseAnswer
+    from sqlalchemy import inspect as inspect_schema
+    
+    if destination not in (None, "local", "mysql"):
+        return {"error": "Invalid destination. Must be 'local' or 'mysql'."}
+    
+    key = f"forms:{destination or 'preview'}:{form_id}"
+    state = None if full_refresh else watermarks.get(key)
+    watermark = state['last_submitted_time'] if state else None
+    seen_at_watermark = set(state.get('response_ids', [])) if state else set()
+    
+    if destination == "mysql":
+        if get_import_model(FormResponseAnswer.__tablename__) is None:
+            return {
+                "error": f"Storing answers in MySQL is disabled. Add {FormResponseAnswer.__tablename__} to IMPORT_ALLOWED_TABLES to enable it.",
+                "records": []
+            }
+        if not inspect_schema(get_engine()).has_table(FormResponseAnswer.__tablename__):
+            return {
+                "error": f"Table {FormResponseAnswer.__tablename__} does not exist in MySQL. Create it before pulling responses into it.",
+                "records": []
+            }
+        session = get_db_session
+    elif destination == "local":
+        session = get_local_db_session
+        FormResponseAnswer.__table__.create(bind=get_local_engine(), checkfirst=True)
+    
+    service = get_forms_service()
+    questions = get_form_questions(service, form_id)
+    
+    rows, new_responses, answers_stored = [], 0, 0
+    latest, latest_ids = watermark, set(seen_at_watermark)
+    # Without a destination: every new response as (submitted time, response id, row), to return the oldest
+    previews = []
+    page_token = None
+    
+    while True:
+        # ">=" so responses sharing the watermark's timestamp are not skipped; already seen ones are dropped below
+        response_page = google_api.execute('forms', service.forms().responses().list(
+            formId=form_id,
+            filter=f"timestamp >= {watermark}" if watermark else None,
+            pageSize=5000,
+            pageToken=page_token
+        ))
+        
+        answer_rows = []
+        for response in response_page.get('responses', []):
+            submitted = response.get('lastSubmittedTime')
+            if submitted == watermark and response.get('responseId') in seen_at_watermark:
+                continue
+            new_responses += 1
+            
+            row = flatten_form_response(response)
+            # Compare parsed times: fractional seconds make the strings sort inconsistently
+            submitted_dt = parse_google_timestamp(submitted)
+            if not destination:
+                previews.append((submitted_dt, response.get('responseId'), submitted, row))
+                continue
+            if len(rows) < max_rows:
+                rows.append(row)
+            
+            if latest is None or submitted_dt > parse_google_timestamp(latest):
+                latest, latest_ids = submitted, {response.get('responseId')}
+            elif submitted_dt == parse_google_timestamp(latest):
+                latest_ids.add(response.get('responseId'))
+            
+            for question_id in response.get('answers', {}):
+                answer_rows.append({
+                    "Response_ID": row['response_id'],
+                    "Question_ID": question_id,
+                    "Form_ID": form_id,
+                    "Create_Time": parse_google_timestamp(row['create_time']),
+                    "Last_Submitted_Time": submitted_dt,
+                    "Respondent_Email": row['respondent_email'],
+                    "Answer": row[question_id]
+                })
+        
+        if destination and answer_rows:
+            with session() as db:
+                bulk_insert(db, FormResponseAnswer, answer_rows, on_duplicate="update")
+                db.commit()
+            answers_stored += len(answer_rows)
+        
+        page_token = response_page.get('nextPageToken')
+        if not page_token:
+            break
+    
+    if not destination and previews:
+        # Advance only past the responses returned, so the rest come back on the next pull
+        previews.sort(key=lambda preview: (preview[0], preview[1]))
+        returned = previews[:max_rows]
+        rows = [row for _, _, _, row in returned]
+        last_dt, _, last_submitted, _ = returned[-1]
+        latest_ids = {response_id for submitted_dt, response_id, _, _ in returned if submitted_dt == last_dt}
+        if watermark and last_dt == parse_google_timestamp(watermark):
+            latest_ids |= seen_at_watermark
+        latest = last_submitted
+    
+    if latest is not None:
+        watermarks.set(key, {"last_submitted_time": latest, "response_ids": sorted(latest_ids)})
+    
+    return {
+        "query_info": {
+            "form_id": form_id,
+            "destination": destination,
+            "full_refresh": full_refresh,
+            "previous_watermark": watermark
+        },
+        "questions": questions,
+        "new_responses": new_responses,
+        "answers_stored": answers_stored,
+        "watermark": latest,
+        "rows": rows,
+        "truncated": new_responses > len(rows)
+    }
+
+
 @mcp.resource("sheet://{spreadsheet_id}/{range_name}")
+@offload(google_pool)
 def get_sheet_resource(spreadsheet_id: str, range_name: str = "Sheet1") -> str:
     """
     Resource for accessing Google Sheet data
@@ -904,24 +2980,118 @@ def get_sheet_resource(spreadsheet_id: str, range_name: str = "Sheet1") -> str:
         range_name: The range to read
     
     Returns:
-        Sheet data as text
+        Sheet data as text, truncated after SHEET_RESOURCE_MAX_ROWS rows
     """
-    service = get_sheets_service()
-    result = service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id,
-        range=range_name
-    ).execute()
+    from google_service import get_sheets_service
     
-    values = result.get('values', [])
+    service = get_sheets_service()
     
-    # Format as readable text
+    # Read window by window so very large ranges never arrive as one response
     output = []
-    for row in values:
-        output.append(' | '.join(str(cell) for cell in row))
+    for _, values in iter_sheet_chunks(service, spreadsheet_id, range_name):
+        for row in values:
+            if len(output) >= SHEET_RESOURCE_MAX_ROWS:
+                output.append(f"... truncated after {SHEET_RESOURCE_MAX_ROWS} rows; use read_sheet with chunk_rows to page through the rest")
+                return '\n'.join(output)
+            # Format as readable text
+            output.append(' | '.join(str(cell) for cell in row))
     
     return '\n'.join(output)
 
 
+# Clients subscribed to sheet:// resources are notified when the range's content
+# changes; one Drive revision check per spreadsheet per interval serves them all
+sheet_subscriptions = SheetSubscriptionManager(
+    get_revision=get_file_revision,
+    read_content=get_sheet_resource.__wrapped__,
+    interval=float(os.getenv("SHEET_POLL_SECONDS", "30")),
+    run_blocking=google_pool.run
+)
+
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_sheet_resource(uri) -> None:
+    """Handle resources/subscribe for sheet://{spreadsheet_id}/{range_name}."""
+    await sheet_subscriptions.subscribe(str(uri), mcp._mcp_server.request_context.session)
+
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_sheet_resource(uri) -> None:
+    """Handle resources/unsubscribe for a sheet:// resource."""
+    await sheet_subscriptions.unsubscribe(str(uri), mcp._mcp_server.request_context.session)
+
+
+def _get_capabilities_with_subscribe(get_capabilities):
+    # The low-level server always advertises subscribe=False; report the
+    # handlers registered above so clients know they can subscribe
+    def wrapper(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+    return wrapper
+
+
+mcp._mcp_server.get_capabilities = _get_capabilities_with_subscribe(mcp._mcp_server.get_capabilities)
+
+
+@mcp.tool()
+def get_server_metrics() -> Dict[str, Any]:
+    """Get runtime metrics for the server's Google API scheduler and caches.
+    
+    Returns:
+        Dictionary with per-API request, retry, throttle and queue depth
+        counters, sheet cache usage, sheet subscription polling, thread
+        pool usage, DB tool admission (queue wait times, rejections),
+        DB statement timeouts and cancellations, compiled SQL statement
+        cache hits, date-sharded queries, the search_records indexes and
+        the refresh times of the local mirror and summary tables
+    """
+    from database import statement_cache_stats
+    
+    return {
+        "runtime": {"pid": os.getpid(), "workers": worker_count()},
+        "google_api": google_api.stats(),
+        "sheet_cache": sheet_cache.stats(),
+        "sheet_subscriptions": sheet_subscriptions.stats(),
+        "executors": {pool.name: pool.stats() for pool in (google_pool, db_pool)},
+        "db_admission": db_admission.stats(),
+        "db_queries": db_queries.stats(),
+        "db_shards": db_shards.stats(),
+        "statement_cache": {"prebuilt_statements": len(prebuilt_statements), **statement_cache_stats()},
+        "search": {
+            "fulltext_columns": fulltext_columns,
+            "indexes": {table: index.stats() for table, index in search_indexes.items()}
+        },
+        "mirror": db_mirror.status(),
+        "summaries": db_summaries.status()
+    }
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness probe for HTTP deployments: the worker process is serving requests."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """Readiness probe: MySQL answers and Google credentials are in place."""
+    from database import check_connection
+    from google_service import credentials_available
+    
+    checks = {}
+    try:
+        await db_pool.run(check_connection, timeout=float(os.getenv("READY_CHECK_TIMEOUT", "5")))
+        checks["database"] = "ok"
+    except Exception as e:
+        checks["database"] = f"error: {str(e).splitlines()[0] if str(e) else type(e).__name__}"
+    checks["google_credentials"] = "ok" if credentials_available() else "missing token; run the OAuth flow once over stdio"
+    
+    ready = all(value == "ok" for value in checks.values())
+    return JSONResponse({"status": "ready" if ready else "not_ready", "checks": checks}, status_code=200 if ready else 503)
+
+
 @mcp.prompt()
 def analyze_sheet_data():
     """Analyze data from a Google Sheet with comprehensive insights"""
@@ -929,7 +3099,10 @@ def analyze_sheet_data():
 
 1. **Data Retrieval & Overview**
    - Ask me for the spreadsheet name and range (or help me list my spreadsheets if needed), unless the user has already retrieved a spreadsheet
-   - Read the sheet data using the read_sheet tool
+   - Profile the sheet with the profile_sheet tool; it computes row counts, column types,
+     missing values, statistics and frequencies server-side
+   - Read raw rows with read_sheet only where needed (e.g. preview=True for a sample,
+     or chunk_rows to page through text responses)
    - Provide a high-level summary:
      * Total number of rows and columns
      * Column headers/names
@@ -943,11 +3116,11 @@ def analyze_sheet_data():
    - Identify any obvious patterns in data organization
 
 3. **Quantitative Analysis** (where applicable)
-   - Calculate relevant statistics:
+   - Use the statistics from profile_sheet rather than computing them by hand:
      * For numeric columns: averages, ranges (min/max), totals
      * For categorical data: frequency distributions, most common values
      * For rating scales: score distributions and averages
-   - Identify any outliers or unusual values
+   - Identify any outliers or unusual values (profile_sheet reports IQR outliers)
 
 4. **Qualitative Insights** (where applicable)
    - Summarize themes in text responses
@@ -1054,5 +3227,45 @@ def form_to_sheet():
 Please provide all URLs and IDs clearly formatted for easy access."""
 
 
+def create_app():
+    """Build the streamable-HTTP ASGI app; uvicorn calls this in each worker process."""
+    mcp.settings.stateless_http = os.getenv("MCP_STATELESS_HTTP", "true").lower() == "true"
+    return mcp.streamable_http_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataHub MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default=os.getenv("MCP_TRANSPORT", "stdio"),
+                        help="stdio for a single desktop client, streamable-http to serve many clients")
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=worker_count(),
+                        help="worker processes for streamable-http; pools, caches and quotas are split between them")
+    parser.add_argument("--stateful", action="store_true",
+                        help="keep per-client sessions (needed for resource subscriptions; single worker only)")
+    args = parser.parse_args()
+    
+    if args.transport == "stdio":
+        mcp.run(transport='stdio')
+        return
+    
+    if args.stateful and args.workers > 1:
+        parser.error("--stateful needs --workers 1: sessions live in the process that created them")
+    
+    # Worker processes import this module afresh and size themselves from these
+    os.environ[WORKERS_ENV] = str(args.workers)
+    os.environ["MCP_STATELESS_HTTP"] = "false" if args.stateful else "true"
+    
+    import uvicorn
+    uvicorn.run(
+        "datahubmcp:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        app_dir=os.path.dirname(os.path.abspath(__file__))
+    )
+
+
 if __name__ == "__main__":
-    mcp.run(transport='stdio')
\ No newline at end of file
+    main()
\ No newline at end of file
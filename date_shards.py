@@ -0,0 +1,157 @@
+import contextvars
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from query_control import QueryScope, current_query_scope, run_in_scope
+
+# (lower bound, upper bound, whether the upper bound is inclusive)
+Shard = Tuple[datetime, datetime, bool]
+
+SHARD_UNITS = ("week", "month", "quarter", "year")
+
+
+def _next_boundary(moment: datetime, unit: str) -> datetime:
+    """Start of the calendar week/month/quarter/year (or N-day block) after `moment`."""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "week":
+        return day + timedelta(days=7 - day.weekday())
+    if unit.endswith("d"):
+        return day + timedelta(days=int(unit[:-1]))
+    months = {"month": 1, "quarter": 3, "year": 12}[unit]
+    first = day.replace(day=1)
+    if unit == "quarter":
+        first = first.replace(month=(first.month - 1) // 3 * 3 + 1)
+    elif unit == "year":
+        first = first.replace(month=1)
+    month_index = first.month - 1 + months
+    return first.replace(year=first.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def validate_shard_unit(unit: str) -> Optional[str]:
+    """Return an error message if `unit` is not a supported shard size."""
+    if unit in SHARD_UNITS or re.fullmatch(r"[1-9]\d*d", unit):
+        return None
+    return f"Invalid shard '{unit}'. Use one of {', '.join(SHARD_UNITS)} or a number of days such as '14d'."
+
+
+def split_date_range(start: datetime, end: datetime, unit: str) -> List[Shard]:
+    """Split [start, end] into calendar-aligned shards, newest first.
+
+    Shards are half-open [lower, upper) except the newest, which keeps the
+    inclusive end of the original range, so together they cover exactly the
+    same rows as one `start <= value <= end` query.
+
+    Args:
+        start: Inclusive start of the range
+        end: Inclusive end of the range
+        unit: "week", "month", "quarter", "year" or a day count such as "14d"
+
+    Returns:
+        List of (lower, upper, upper_inclusive) tuples in descending date order
+    """
+    shards = []
+    lower = start
+    while True:
+        boundary = _next_boundary(lower, unit)
+        if boundary > end:
+            shards.append((lower, end, True))
+            break
+        shards.append((lower, boundary, False))
+        lower = boundary
+    shards.reverse()
+    return shards
+
+
+class ShardRunner:
+    """Runs the shards of a long date-range query concurrently.
+
+    Each shard is fetched on its own thread (and so its own pooled DB
+    connection); results are merged newest shard first, preserving the
+    descending date order of a single query. Once the limit is reached,
+    shards that have not started are cancelled and shards still running are
+    aborted, so none of them keeps a connection after the call returns.
+    """
+
+    def __init__(self, max_workers: int, per_call: int, abort: Optional[Callable[[QueryScope], None]] = None):
+        """
+        Args:
+            max_workers: Shard threads shared by all calls (bounds extra DB connections)
+            per_call: Shards one call may run at once
+            abort: Cancels a running shard's query scope and kills its statements
+                (e.g. QueryGuard.abort); without it running shards are left to finish
+        """
+        self.max_workers = max_workers
+        self.per_call = min(per_call, max_workers)
+        self.abort = abort
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-shard")
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "shards_run": 0, "shards_skipped": 0, "shards_aborted": 0}
+
+    def run(self, fetch: Callable[[datetime, datetime, bool], List[Any]], shards: List[Shard], limit: int) -> List[Any]:
+        """Fetch every shard and merge the results in shard order, up to limit.
+
+        Context variables of the caller are visible inside `fetch`. Each shard
+        runs in a child of the caller's query scope, so it can be aborted on
+        its own and is still stopped when the whole call is cancelled.
+
+        Args:
+            fetch: Blocking function returning up to `limit` rows of one shard,
+                in descending date order
+            shards: Shards as returned by split_date_range (newest first)
+            limit: Maximum number of rows to return
+
+        Returns:
+            Rows of all shards, newest first, truncated to limit
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+
+        # A sliding window of per_call shards in flight, consumed in order
+        pending = list(shards)
+        futures = []
+        results: List[Any] = []
+        parent = current_query_scope()
+
+        def submit_next():
+            if pending:
+                scope = parent.child() if parent is not None else None
+                context = contextvars.copy_context()
+                futures.append((self._executor.submit(context.run, run_in_scope, scope, fetch, *pending.pop(0)), scope))
+
+        for _ in range(min(self.per_call, len(pending))):
+            submit_next()
+        try:
+            while futures:
+                rows = futures.pop(0)[0].result()
+                with self._lock:
+                    self._stats["shards_run"] += 1
+                results.extend(rows)
+                if len(results) >= limit:
+                    break
+                submit_next()
+        finally:
+            skipped, aborted = len(pending), 0
+            for future, scope in futures:
+                if future.cancel():
+                    skipped += 1
+                elif scope is not None and self.abort is not None and not future.done():
+                    # Stop its statement so the shard's session returns its connection now
+                    self.abort(scope)
+                    aborted += 1
+            with self._lock:
+                self._stats["shards_skipped"] += skipped
+                self._stats["shards_aborted"] += aborted
+        return results[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call and shard counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(max_workers=self.max_workers, per_call=self.per_call)
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,141 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from summaries import DRDP_UNRATED_VALUES, drdp_domain
+
+# DRDP rating periods by assessment month: Fall (Aug-Nov), Winter (Dec-Feb), Spring (Mar-Jul)
+RATING_TERMS = ("Fall", "Winter", "Spring")
+TERM_BY_MONTH = {8: 0, 9: 0, 10: 0, 11: 0, 12: 1, 1: 1, 2: 1, 3: 2, 4: 2, 5: 2, 6: 2, 7: 2}
+
+# (school year start, index into RATING_TERMS)
+RatingPeriod = Tuple[int, int]
+
+
+def rating_period(moment: datetime) -> RatingPeriod:
+    """Rating period an assessment submitted at `moment` belongs to."""
+    return (moment.year if moment.month >= 8 else moment.year - 1, TERM_BY_MONTH[moment.month])
+
+
+def period_label(period: RatingPeriod) -> str:
+    """Readable rating period name, e.g. "2024-25 Fall"."""
+    year, term = period
+    return f"{year}-{(year + 1) % 100:02d} {RATING_TERMS[term]}"
+
+
+def build_ratings(
+    assessments: Iterable[Tuple[str, datetime, List[Optional[float]]]],
+    measures: List[str]
+) -> Tuple[List[str], List[RatingPeriod], np.ndarray]:
+    """Arrange assessments into a child x rating period x measure array.
+
+    Args:
+        assessments: (child id, submit time, ratings in `measures` order), in
+            ascending submit time; a later assessment in the same period replaces
+            an earlier one
+        measures: Measure column names
+
+    Returns:
+        Tuple of (child ids, rating periods in order, float array with NaN
+        where a measure was not rated, including unable-to-rate and conditional values)
+    """
+    latest = {(child_id, rating_period(moment)): values for child_id, moment, values in assessments}
+    children = list(dict.fromkeys(child_id for child_id, _ in latest))
+    periods = sorted({period for _, period in latest})
+    child_index = {child_id: index for index, child_id in enumerate(children)}
+    period_index = {period: index for index, period in enumerate(periods)}
+
+    ratings = np.full((len(children), len(periods), len(measures)), np.nan)
+    if latest:
+        rows = np.array([child_index[child_id] for child_id, _ in latest])
+        columns = np.array([period_index[period] for _, period in latest])
+        # None becomes NaN
+        ratings[rows, columns] = np.array(list(latest.values()), dtype=np.float64)
+    ratings[np.isin(ratings, DRDP_UNRATED_VALUES)] = np.nan
+    return children, periods, ratings
+
+
+def domain_scores(ratings: np.ndarray, measures: List[str]) -> Tuple[List[str], np.ndarray]:
+    """Average rating per domain: a child x period x domain array (NaN where no measure was rated)."""
+    domains = list(dict.fromkeys(drdp_domain(measure) for measure in measures))
+    membership = np.zeros((len(measures), len(domains)))
+    membership[np.arange(len(measures)), [domains.index(drdp_domain(measure)) for measure in measures]] = 1
+    rated = ~np.isnan(ratings)
+    totals = np.where(rated, ratings, 0) @ membership
+    counts = rated.astype(np.float64) @ membership
+    scores = np.divide(totals, counts, out=np.full(totals.shape, np.nan), where=counts > 0)
+    return domains, scores
+
+
+def changes_since_previous(values: np.ndarray) -> np.ndarray:
+    """Change of each value since the same child's previous rated period (axis 1).
+
+    Periods a child was not rated in are skipped, so a Fall -> Spring change is
+    reported when Winter is missing. NaN where there is no earlier rating.
+    """
+    rated = ~np.isnan(values)
+    positions = np.where(rated, np.arange(values.shape[1])[None, :, None], -1)
+    latest = np.maximum.accumulate(positions, axis=1)
+    previous = np.concatenate([np.full_like(latest[:, :1], -1), latest[:, :-1]], axis=1)
+    earlier = np.take_along_axis(values, np.maximum(previous, 0), axis=1)
+    return np.where(rated & (previous >= 0), values - earlier, np.nan)
+
+
+def total_change(values: np.ndarray) -> np.ndarray:
+    """Change from each child's first to last rated period: a child x measure/domain array."""
+    rated = ~np.isnan(values)
+    periods = values.shape[1]
+    first = np.argmax(rated, axis=1)
+    last = periods - 1 - np.argmax(rated[:, ::-1], axis=1)
+    change = (np.take_along_axis(values, last[:, None], axis=1) - np.take_along_axis(values, first[:, None], axis=1))[:, 0]
+    return np.where(rated.sum(axis=1) >= 2, change, np.nan)
+
+
+def _to_list(values: np.ndarray) -> List:
+    """Nested lists of values rounded to 2 decimals, with None for NaN."""
+    return np.where(np.isnan(values), None, np.round(values, 2)).tolist()
+
+
+def progress_matrix(
+    assessments: Iterable[Tuple[str, datetime, List[Optional[float]]]],
+    measures: List[str],
+    include_measures: bool = True
+) -> Dict[str, Any]:
+    """Per-child ratings and changes between rating periods, per measure and domain.
+
+    Args:
+        assessments: As for build_ratings
+        measures: Measure column names
+        include_measures: Include the per-measure matrices, not only domain ones
+
+    Returns:
+        Dictionary with the measure and domain column orders and one entry per
+        child with its rated periods and matrices whose rows follow those periods
+    """
+    children, periods, ratings = build_ratings(assessments, measures)
+    domains, scores = domain_scores(ratings, measures)
+    measure_changes = changes_since_previous(ratings)
+    domain_changes = changes_since_previous(scores)
+    measure_totals = total_change(ratings) if len(periods) else np.empty((len(children), len(measures)))
+    domain_totals = total_change(scores) if len(periods) else np.empty((len(children), len(domains)))
+
+    results = []
+    for index, child_id in enumerate(children):
+        # Only the periods this child was rated in
+        rated = ~np.isnan(ratings[index]).all(axis=1)
+        child = {
+            "child_id": child_id,
+            "periods": [period_label(period) for period, keep in zip(periods, rated) if keep],
+            "domain_scores": _to_list(scores[index][rated]),
+            "domain_change": _to_list(domain_changes[index][rated]),
+            "domain_total_change": _to_list(domain_totals[index])
+        }
+        if include_measures:
+            child.update(
+                measure_ratings=_to_list(ratings[index][rated]),
+                measure_change=_to_list(measure_changes[index][rated]),
+                measure_total_change=_to_list(measure_totals[index])
+            )
+        results.append(child)
+    return {"measures": measures if include_measures else None, "domains": domains, "children": results}
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from watermark_store import file_lock, file_version
+
+SPREADSHEET_MIME_TYPE = 'application/vnd.google-apps.spreadsheet'
+FILE_FIELDS = "id,name,webViewLink,modifiedTime,mimeType,trashed"
+
+
+def _execute(request):
+    return request.execute()
+
+
+class DriveMetadataIndex:
+    """Local index of the user's spreadsheet metadata.
+
+    The first refresh lists every spreadsheet once; later refreshes only apply
+    the Drive changes feed since the stored start page token, so searches are
+    answered locally without listing Drive again. The index can be persisted
+    to a JSON file so it survives server restarts; worker processes sharing
+    the file pick up each other's refreshes instead of overwriting them.
+    """
+
+    def __init__(self, path: Optional[str] = None, min_refresh_seconds: float = 30):
+        self.path = path
+        self.min_refresh_seconds = min_refresh_seconds
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._start_page_token: Optional[str] = None
+        self._refreshed_at = 0.0
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def refresh(self, service, execute: Callable = _execute, force: bool = False) -> bool:
+        """Bring the index up to date with Drive.
+
+        Args:
+            service: Google Drive API service (v3)
+            execute: Callable used to execute API requests
+            force: Refresh even if the last refresh was within min_refresh_seconds
+
+        Returns:
+            True if Drive was contacted, False if the index was fresh enough
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.min_refresh_seconds:
+                return False
+            if not self.path:
+                self._update(service, execute)
+                return True
+            with file_lock(self.path):
+                # Continue from another worker's newer save rather than overwriting it
+                if file_version(self.path) not in (None, self._version):
+                    self._load()
+                self._update(service, execute)
+                self._save()
+            return True
+
+    def _update(self, service, execute: Callable) -> None:
+        if self._start_page_token is None:
+            self._build(service, execute)
+        else:
+            self._apply_changes(service, execute)
+        self._refreshed_at = time.monotonic()
+
+    def search(
+        self,
+        name_contains: Optional[str] = None,
+        modified_after: Optional[str] = None,
+        modified_before: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Search indexed spreadsheets, most recently modified first.
+
+        Args:
+            name_contains: Case-insensitive substring of the file name
+            modified_after: RFC 3339 lower bound (inclusive) on modifiedTime
+            modified_before: RFC 3339 upper bound (exclusive) on modifiedTime
+            offset: Number of matches to skip
+            limit: Maximum number of matches to return
+
+        Returns:
+            Tuple of (matching file entries, total number of matches)
+        """
+        needle = name_contains.lower() if name_contains else None
+        with self._lock:
+            matches = [
+                f for f in self._files.values()
+                if (needle is None or needle in f['name'].lower())
+                and (modified_after is None or f['modifiedTime'] >= modified_after)
+                and (modified_before is None or f['modifiedTime'] < modified_before)
+            ]
+        matches.sort(key=lambda f: f['modifiedTime'], reverse=True)
+        return matches[offset:offset + limit], len(matches)
+
+    def _build(self, service, execute: Callable) -> None:
+        # Take the start token before listing so edits made meanwhile are replayed later
+        start_page_token = execute(service.changes().getStartPageToken())['startPageToken']
+        files = {}
+        page_token = None
+        while True:
+            response = execute(service.files().list(
+                q=f"mimeType='{SPREADSHEET_MIME_TYPE}' and trashed=false",
+                pageSize=1000,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})"
+            ))
+            for f in response.get('files', []):
+                files[f['id']] = self._entry(f)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        self._files = files
+        self._start_page_token = start_page_token
+
+    def _apply_changes(self, service, execute: Callable) -> None:
+        page_token = self._start_page_token
+        while page_token:
+            response = execute(service.changes().list(
+                pageToken=page_token,
+                pageSize=1000,
+                spaces='drive',
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))"
+            ))
+            for change in response.get('changes', []):
+                f = change.get('file')
+                if change.get('removed') or not f or f.get('trashed') or f.get('mimeType') != SPREADSHEET_MIME_TYPE:
+                    self._files.pop(change.get('fileId'), None)
+                else:
+                    self._files[f['id']] = self._entry(f)
+            if 'newStartPageToken' in response:
+                self._start_page_token = response['newStartPageToken']
+                break
+            page_token = response.get('nextPageToken')
+
+    @staticmethod
+    def _entry(f: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': f['id'],
+            'name': f.get('name', ''),
+            'webViewLink': f.get('webViewLink'),
+            'modifiedTime': f.get('modifiedTime', '')
+        }
+
+    def _load(self) -> None:
+        with open(self.path, 'r') as fh:
+            data = json.load(fh)
+            stat = os.fstat(fh.fileno())
+        self._version = (stat.st_ino, stat.st_mtime_ns)
+        self._files = {f['id']: f for f in data.get('files', [])}
+        self._start_page_token = data.get('start_page_token')
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump({
+                'start_page_token': self._start_page_token,
+                'files': list(self._files.values())
+            }, fh)
+        os.replace(tmp_path, self.path)
+        self._version = file_version(self.path)
@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BlockingPool:
+    """Named thread pool for blocking calls made from async handlers.
+
+    The worker count bounds how many calls of one kind (Google API, MySQL)
+    run at once; calls beyond that wait in the pool's queue, so a burst of
+    slow Sheets requests cannot hold up database work and vice versa.
+    """
+
+    def __init__(self, name: str, max_workers: int, timeout: Optional[float] = None):
+        """
+        Args:
+            name: Pool name, used for thread names and metrics
+            max_workers: Maximum number of concurrently running calls
+            timeout: Default seconds a caller waits for a result (None waits forever)
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "active": 0, "max_active": 0}
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking function on the pool and await its result.
+
+        Context variables of the caller are visible inside the function.
+
+        Raises:
+            TimeoutError: If the call does not finish within the timeout. The
+                worker thread cannot be interrupted and finishes in the background.
+        """
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(context.run, self._call, fn, *args, **kwargs))
+        with self._lock:
+            self._stats["submitted"] += 1
+        limit = timeout if timeout is not None else self.timeout
+        try:
+            return await asyncio.wait_for(future, limit)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise TimeoutError(f"{getattr(fn, '__name__', 'call')} did not finish within {limit} seconds")
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self._stats["active"] += 1
+            self._stats["max_active"] = max(self._stats["max_active"], self._stats["active"])
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        else:
+            with self._lock:
+                self._stats["completed"] += 1
+            return result
+        finally:
+            with self._lock:
+                self._stats["active"] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters, current and peak concurrency, and queue length."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            max_workers=self.max_workers,
+            timeout_seconds=self.timeout,
+            queued=self._executor._work_queue.qsize()
+        )
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def offload(pool: BlockingPool, timeout: Optional[float] = None):
+    """Decorator turning a blocking function into a coroutine run on a pool.
+
+    The wrapper keeps the function's name, docstring and signature, so it can
+    be registered as an MCP tool or resource like the original. The original
+    stays reachable as `__wrapped__` for callers that are already on a worker
+    thread.
+    """
+    def decorator(fn: Callable[..., Any]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await pool.run(fn, *args, timeout=timeout, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,743 @@
+"""In-process fake of the Google Sheets v4, Drive v3 and Forms v1 REST APIs.
+
+Implements the subset of endpoints the server's tools use, including
+multipart batch requests, so the Google code paths can be exercised and
+benchmarked without network access or credentials. Point the clients at it
+by setting GOOGLE_API_FAKE_URL (see google_service.py), either in-process:
+
+    fake = FakeGoogleWorkspace(latency=0.05, quotas={"sheets": 60})
+    fake.start()
+    os.environ["GOOGLE_API_FAKE_URL"] = fake.url
+    spreadsheet_id = fake.add_spreadsheet("Attendance", [["Name", "Days"], ["Ana", 12]])
+
+or as a standalone process:
+
+    python fake_google.py --port 8765 --latency 0.05 --seed-rows 5000
+"""
+import argparse
+import collections
+import email.parser
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from sheet_ranges import format_range, parse_range
+
+SPREADSHEET_MIME_TYPE = 'application/vnd.google-apps.spreadsheet'
+DEFAULT_ROW_COUNT = 1000
+DEFAULT_COLUMN_COUNT = 26
+
+
+class FakeApiError(Exception):
+    """An error response, rendered in the Google JSON error format."""
+
+    def __init__(self, status: int, message: str, reason: Optional[str] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def body(self) -> Dict[str, Any]:
+        statuses = {400: 'INVALID_ARGUMENT', 403: 'PERMISSION_DENIED', 404: 'NOT_FOUND', 429: 'RESOURCE_EXHAUSTED'}
+        error = {'code': self.status, 'message': self.message, 'status': statuses.get(self.status, 'UNAVAILABLE')}
+        if self.reason:
+            error['errors'] = [{'reason': self.reason, 'message': self.message}]
+        return {'error': error}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _user_entered(value: Any) -> Any:
+    """Convert a USER_ENTERED string the way Sheets would (numbers and booleans)."""
+    if not isinstance(value, str):
+        return value
+    if value.upper() in ('TRUE', 'FALSE'):
+        return value.upper() == 'TRUE'
+    try:
+        number = float(value.replace(',', ''))
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def _formatted(value: Any) -> Any:
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class _Sheet:
+    def __init__(self, sheet_id: int, title: str, index: int, row_count: int, column_count: int):
+        self.sheet_id = sheet_id
+        self.title = title
+        self.index = index
+        self.row_count = row_count
+        self.column_count = column_count
+        self.rows: List[List[Any]] = []
+
+    def properties(self) -> Dict[str, Any]:
+        return {
+            'sheetId': self.sheet_id,
+            'title': self.title,
+            'index': self.index,
+            'sheetType': 'GRID',
+            'gridProperties': {'rowCount': self.row_count, 'columnCount': self.column_count}
+        }
+
+
+class FakeGoogleWorkspace:
+    """Threaded HTTP server holding spreadsheets, Drive files and forms in memory.
+
+    Each HTTP request (a batch counts once) waits `latency` seconds plus up to
+    `jitter` seconds. Quotas are enforced per API and minute, counting each
+    sub-request of a batch, and answered with 429 RESOURCE_EXHAUSTED and a
+    Retry-After header. Errors queued with inject_error() are returned in
+    place of the next matching requests.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        quotas: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds added to every HTTP request
+            jitter: Maximum extra random seconds added to every HTTP request
+            quotas: Mapping of API name ("sheets", "drive", "forms") to requests per minute
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.quotas = dict(quotas or {})
+        self._lock = threading.RLock()
+        self._spreadsheets: Dict[str, Dict[str, Any]] = {}
+        self._forms: Dict[str, Dict[str, Any]] = {}
+        self._changes: List[str] = []
+        self._windows: Dict[str, Deque[float]] = collections.defaultdict(collections.deque)
+        self._injected: List[Dict[str, Any]] = []
+        self._stats: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> 'FakeGoogleWorkspace':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-google', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeGoogleWorkspace':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Seeding and control
+
+    def add_spreadsheet(
+        self,
+        title: str,
+        values: Optional[List[List[Any]]] = None,
+        sheet_title: str = 'Sheet1',
+        owner: str = 'owner@example.com'
+    ) -> str:
+        """Create a spreadsheet with one tab holding `values`; returns its ID."""
+        with self._lock:
+            spreadsheet_id = uuid.uuid4().hex
+            rows = [list(row) for row in values or []]
+            sheet = _Sheet(0, sheet_title, 0,
+                           max(DEFAULT_ROW_COUNT, len(rows)),
+                           max([DEFAULT_COLUMN_COUNT] + [len(row) for row in rows]))
+            sheet.rows = rows
+            self._spreadsheets[spreadsheet_id] = {
+                'id': spreadsheet_id,
+                'title': title,
+                'sheets': [sheet],
+                'version': 1,
+                'modifiedTime': _now(),
+                'owner': owner,
+                'trashed': False
+            }
+            self._changes.append(spreadsheet_id)
+            return spreadsheet_id
+
+    def add_form(self, title: str, questions: List[str]) -> str:
+        """Create a form with one text question per title; returns its ID."""
+        with self._lock:
+            form_id = uuid.uuid4().hex
+            self._forms[form_id] = {
+                'form': {
+                    'formId': form_id,
+                    'info': {'title': title, 'documentTitle': title},
+                    'items': [],
+                    'responderUri': f"https://docs.google.com/forms/d/e/{form_id}/viewform"
+                },
+                'responses': []
+            }
+            for question in questions:
+                self._add_question(self._forms[form_id]['form'], question)
+            return form_id
+
+    def add_form_response(
+        self,
+        form_id: str,
+        answers: Dict[str, Any],
+        submitted_at: Optional[datetime] = None,
+        respondent_email: Optional[str] = None
+    ) -> str:
+        """Record a response; `answers` is keyed by question title or ID."""
+        with self._lock:
+            form = self._forms[form_id]['form']
+            by_title = {item['title']: item['questionItem']['question']['questionId'] for item in form['items']}
+            timestamp = (submitted_at.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+                         if submitted_at else _now())
+            response = {
+                'responseId': uuid.uuid4().hex,
+                'createTime': timestamp,
+                'lastSubmittedTime': timestamp,
+                'answers': {}
+            }
+            if respondent_email:
+                response['respondentEmail'] = respondent_email
+            for key, value in answers.items():
+                question_id = by_title.get(key, key)
+                values = value if isinstance(value, list) else [value]
+                response['answers'][question_id] = {
+                    'questionId': question_id,
+                    'textAnswers': {'answers': [{'value': str(v)} for v in values]}
+                }
+            self._forms[form_id]['responses'].append(response)
+            return response['responseId']
+
+    def get_values(self, spreadsheet_id: str, sheet_title: Optional[str] = None) -> List[List[Any]]:
+        """Return a copy of a tab's stored values (for assertions)."""
+        with self._lock:
+            sheet = self._sheet(self._spreadsheet(spreadsheet_id), sheet_title)
+            return [list(row) for row in sheet.rows]
+
+    def inject_error(
+        self,
+        api: str = '*',
+        status: int = 503,
+        count: int = 1,
+        reason: Optional[str] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """Fail the next `count` requests to `api` ("*" for any) with `status`."""
+        with self._lock:
+            self._injected.append({'api': api, 'status': status, 'count': count, 'reason': reason, 'retry_after': retry_after})
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return per-API counts of requests, batches, injected errors and quota rejections."""
+        with self._lock:
+            return {api: dict(counter) for api, counter in self._stats.items()}
+
+    # Request handling
+
+    def _handler_class(self):
+        workspace = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                workspace._delay()
+                status, headers, payload = workspace.dispatch(
+                    self.command, self.path, body, self.headers.get('Content-Type', '')
+                )
+                self._respond(status, headers, payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        return Handler
+
+    def _delay(self) -> None:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def dispatch(self, method: str, path: str, body: bytes, content_type: str = '') -> Tuple[int, Dict[str, str], bytes]:
+        """Handle one HTTP request and return (status, headers, body)."""
+        parts = urlsplit(path)
+        if method == 'POST' and parts.path.rstrip('/') in ('/batch', '/batch/drive/v3'):
+            return self._batch(body, content_type)
+        try:
+            api = self._api_for(parts.path)
+            self._admit(api)
+            result = self._route(method, parts.path, parse_qs(parts.query), json.loads(body) if body else {})
+            status, headers, payload = 200, {}, result
+        except FakeApiError as e:
+            status, payload = e.status, e.body()
+            headers = {'Retry-After': str(int(e.retry_after + 0.999))} if e.retry_after is not None else {}
+        headers['Content-Type'] = 'application/json; charset=UTF-8'
+        return status, headers, json.dumps(payload).encode()
+
+    @staticmethod
+    def _api_for(path: str) -> str:
+        if path.startswith('/v4/spreadsheets'):
+            return 'sheets'
+        if path.startswith('/drive/v3/'):
+            return 'drive'
+        if path.startswith('/v1/forms'):
+            return 'forms'
+        raise FakeApiError(404, f"Unknown endpoint: {path}")
+
+    def _admit(self, api: str) -> None:
+        """Count a request against its API, applying injected errors and quotas."""
+        with self._lock:
+            stats = self._stats[api]
+            stats['requests'] += 1
+            for entry in self._injected:
+                if entry['api'] in ('*', api):
+                    entry['count'] -= 1
+                    if entry['count'] <= 0:
+                        self._injected.remove(entry)
+                    stats['injected_errors'] += 1
+                    raise FakeApiError(entry['status'], f"Injected error {entry['status']}", entry['reason'], entry['retry_after'])
+
+            limit = self.quotas.get(api)
+            if limit:
+                now = time.monotonic()
+                window = self._windows[api]
+                while window and window[0] <= now - 60:
+                    window.popleft()
+                if len(window) >= limit:
+                    stats['quota_rejections'] += 1
+                    raise FakeApiError(
+                        429,
+                        f"Quota exceeded for quota metric 'Read requests' of service '{api}'",
+                        'rateLimitExceeded',
+                        retry_after=max(0.0, window[0] + 60 - now)
+                    )
+                window.append(now)
+
+    def _batch(self, body: bytes, content_type: str) -> Tuple[int, Dict[str, str], bytes]:
+        message = email.parser.Parser().parsestr(f"Content-Type: {content_type}\r\n\r\n" + body.decode('utf-8'))
+        if not message.is_multipart():
+            return 400, {'Content-Type': 'application/json'}, json.dumps(FakeApiError(400, 'Batch body is not multipart').body()).encode()
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        out = []
+        for part in message.get_payload():
+            request_line, _, rest = part.get_payload().partition('\n')
+            method, target = request_line.split(' ')[:2]
+            inner = email.parser.Parser().parsestr(rest)
+            inner_body = inner.get_payload().encode() if inner.get_payload() else b''
+            status, headers, payload = self.dispatch(method, target, inner_body)
+            # Long Content-ID headers arrive folded; unfold so the client can match them up
+            content_id = re.sub(r'\r?\n', '', part.get('Content-ID', '<>'))
+            with self._lock:
+                self._stats[self._api_for_safe(target)]['batched'] += 1
+            header_lines = ''.join(f"{key}: {value}\r\n" for key, value in headers.items())
+            out.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id[1:]}\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                f"{header_lines}\r\n"
+                f"{payload.decode()}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return 200, {'Content-Type': f'multipart/mixed; boundary={boundary}'}, ''.join(out).encode()
+
+    def _api_for_safe(self, path: str) -> str:
+        try:
+            return self._api_for(urlsplit(path).path)
+        except FakeApiError:
+            return 'unknown'
+
+    def _route(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]) -> Dict[str, Any]:
+        param = lambda name, default=None: query.get(name, [default])[0]
+        # Segments stay percent-encoded so an encoded ':' in a range is not
+        # mistaken for a ":action" suffix; names are unquoted after splitting
+        segments = path.strip('/').split('/')
+
+        with self._lock:
+            if segments[:2] == ['v4', 'spreadsheets']:
+                return self._route_sheets(method, segments[2:], param, body)
+            if segments[:2] == ['drive', 'v3']:
+                return self._route_drive(method, segments[2:], param)
+            if segments[:2] == ['v1', 'forms']:
+                return self._route_forms(method, segments[2:], param, body)
+        raise FakeApiError(404, f"Unknown endpoint: {path}")
+
+    # Sheets v4
+
+    def _route_sheets(self, method, segments, param, body):
+        if not segments:
+            if method == 'POST':
+                return self._create_spreadsheet(body)
+            raise FakeApiError(404, 'Unknown Sheets method')
+
+        spreadsheet_id, _, action = segments[0].partition(':')
+        spreadsheet = self._spreadsheet(unquote(spreadsheet_id))
+        if len(segments) == 1:
+            if action == 'batchUpdate' and method == 'POST':
+                return self._spreadsheet_batch_update(spreadsheet, body)
+            if not action and method == 'GET':
+                return self._spreadsheet_resource(spreadsheet)
+        elif segments[1] == 'values:batchUpdate' and method == 'POST':
+            user_entered = body.get('valueInputOption') == 'USER_ENTERED'
+            responses = [self._write_values(spreadsheet, data['range'], data.get('values', []), user_entered)
+                         for data in body.get('data', [])]
+            self._touch(spreadsheet)
+            return {
+                'spreadsheetId': spreadsheet_id,
+                'totalUpdatedCells': sum(r['updatedCells'] for r in responses),
+                'totalUpdatedRows': sum(r['updatedRows'] for r in responses),
+                'responses': responses
+            }
+        elif segments[1] == 'values' and len(segments) == 3:
+            range_name, _, values_action = segments[2].partition(':')
+            range_name = unquote(range_name)
+            if values_action == 'append' and method == 'POST':
+                updates = self._append_values(spreadsheet, range_name, body.get('values', []), param('valueInputOption') == 'USER_ENTERED')
+                self._touch(spreadsheet)
+                return {'spreadsheetId': spreadsheet_id, 'updates': updates}
+            if not values_action and method == 'PUT':
+                result = self._write_values(spreadsheet, range_name, body.get('values', []), param('valueInputOption') == 'USER_ENTERED')
+                self._touch(spreadsheet)
+                return result
+            if not values_action and method == 'GET':
+                return self._read_values(spreadsheet, range_name, param('valueRenderOption', 'FORMATTED_VALUE'))
+        raise FakeApiError(404, 'Unknown Sheets method')
+
+    def _spreadsheet(self, spreadsheet_id: str) -> Dict[str, Any]:
+        spreadsheet = self._spreadsheets.get(spreadsheet_id)
+        if spreadsheet is None or spreadsheet['trashed']:
+            raise FakeApiError(404, f"Requested entity was not found: {spreadsheet_id}", 'notFound')
+        return spreadsheet
+
+    @staticmethod
+    def _sheet(spreadsheet: Dict[str, Any], title: Optional[str]) -> _Sheet:
+        for sheet in spreadsheet['sheets']:
+            if title is None or sheet.title == title:
+                return sheet
+        raise FakeApiError(400, f"Unable to parse range: {title}")
+
+    def _touch(self, spreadsheet: Dict[str, Any]) -> None:
+        spreadsheet['version'] += 1
+        spreadsheet['modifiedTime'] = _now()
+        self._changes.append(spreadsheet['id'])
+
+    def _create_spreadsheet(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        spreadsheet_id = self.add_spreadsheet(body.get('properties', {}).get('title', 'Untitled spreadsheet'))
+        return self._spreadsheet_resource(self._spreadsheets[spreadsheet_id])
+
+    def _spreadsheet_resource(self, spreadsheet: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'spreadsheetId': spreadsheet['id'],
+            'properties': {'title': spreadsheet['title'], 'locale': 'en_US', 'timeZone': 'America/Los_Angeles'},
+            'sheets': [{'properties': sheet.properties()} for sheet in spreadsheet['sheets']],
+            'spreadsheetUrl': f"https://docs.google.com/spreadsheets/d/{spreadsheet['id']}/edit"
+        }
+
+    def _spreadsheet_batch_update(self, spreadsheet: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+        replies = []
+        for request in body.get('requests', []):
+            if 'appendDimension' in request:
+                spec = request['appendDimension']
+                sheet = next((s for s in spreadsheet['sheets'] if s.sheet_id == spec.get('sheetId', 0)), None)
+                if sheet is None:
+                    raise FakeApiError(400, f"No grid with id: {spec.get('sheetId')}")
+                if spec.get('dimension') == 'COLUMNS':
+                    sheet.column_count += spec['length']
+                else:
+                    sheet.row_count += spec['length']
+                replies.append({})
+            elif 'addSheet' in request:
+                properties = request['addSheet'].get('properties', {})
+                grid = properties.get('gridProperties', {})
+                sheet = _Sheet(
+                    max(s.sheet_id for s in spreadsheet['sheets']) + 1,
+                    properties.get('title', f"Sheet{len(spreadsheet['sheets']) + 1}"),
+                    len(spreadsheet['sheets']),
+                    grid.get('rowCount', DEFAULT_ROW_COUNT),
+                    grid.get('columnCount', DEFAULT_COLUMN_COUNT)
+                )
+                spreadsheet['sheets'].append(sheet)
+                replies.append({'addSheet': {'properties': sheet.properties()}})
+            else:
+                raise FakeApiError(400, f"Unsupported request: {list(request)}")
+        self._touch(spreadsheet)
+        return {'spreadsheetId': spreadsheet['id'], 'replies': replies}
+
+    def _resolve(self, spreadsheet: Dict[str, Any], range_name: str) -> Tuple[_Sheet, int, int, int, int]:
+        """Resolve a range to its tab and 1-based inclusive bounds within the grid."""
+        try:
+            a1 = parse_range(range_name)
+        except ValueError as e:
+            raise FakeApiError(400, f"Unable to parse range: {range_name} ({e})")
+        sheet = self._sheet(spreadsheet, a1.sheet)
+        bounds = (a1.start_row or 1, a1.start_col or 1, a1.end_row or sheet.row_count, a1.end_col or sheet.column_count)
+        if bounds[2] > sheet.row_count or bounds[3] > sheet.column_count:
+            raise FakeApiError(
+                400,
+                f"Range ({range_name}) exceeds grid limits. Max rows: {sheet.row_count}, max columns: {sheet.column_count}"
+            )
+        return (sheet,) + bounds
+
+    def _read_values(self, spreadsheet: Dict[str, Any], range_name: str, render: str) -> Dict[str, Any]:
+        sheet, row0, col0, row1, col1 = self._resolve(spreadsheet, range_name)
+        values = []
+        for row in sheet.rows[row0 - 1:row1]:
+            cells = row[col0 - 1:col1]
+            while cells and cells[-1] in (None, ''):
+                cells.pop()
+            values.append([_formatted(c) if render == 'FORMATTED_VALUE' else c for c in cells])
+        while values and not values[-1]:
+            values.pop()
+        result = {'range': format_range(sheet.title, col0, row0, col1, row1), 'majorDimension': 'ROWS'}
+        if values:
+            result['values'] = values
+        return result
+
+    def _write_values(self, spreadsheet, range_name, values, user_entered, start: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        sheet, row0, col0, row1, col1 = self._resolve(spreadsheet, range_name)
+        if start:
+            row0, col0 = start
+        height = len(values)
+        width = max((len(row) for row in values), default=0)
+        if row0 + height - 1 > sheet.row_count or col0 + width - 1 > sheet.column_count:
+            raise FakeApiError(
+                400,
+                f"Range ({range_name}) exceeds grid limits. Max rows: {sheet.row_count}, max columns: {sheet.column_count}"
+            )
+        for i, row in enumerate(values):
+            target_index = row0 - 1 + i
+            while len(sheet.rows) <= target_index:
+                sheet.rows.append([])
+            target = sheet.rows[target_index]
+            while len(target) < col0 - 1 + len(row):
+                target.append('')
+            for j, value in enumerate(row):
+                target[col0 - 1 + j] = _user_entered(value) if user_entered else value
+        return {
+            'spreadsheetId': spreadsheet['id'],
+            'updatedRange': format_range(sheet.title, col0, row0, col0 + max(width, 1) - 1, row0 + max(height, 1) - 1),
+            'updatedRows': height,
+            'updatedColumns': width,
+            'updatedCells': sum(len(row) for row in values)
+        }
+
+    def _append_values(self, spreadsheet, range_name, values, user_entered) -> Dict[str, Any]:
+        sheet, row0, col0, _, _ = self._resolve(spreadsheet, range_name)
+        last = len(sheet.rows)
+        while last > 0 and not any(c not in (None, '') for c in sheet.rows[last - 1]):
+            last -= 1
+        start_row = max(row0, last + 1)
+        needed = start_row + len(values) - 1
+        if needed > sheet.row_count:
+            # Appends grow the grid, unlike plain updates
+            sheet.row_count = needed
+        return self._write_values(spreadsheet, range_name, values, user_entered, start=(start_row, col0))
+
+    # Drive v3
+
+    def _route_drive(self, method, segments, param):
+        if segments == ['files'] and method == 'GET':
+            return self._list_files(param('q', ''), int(param('pageSize', '100')), param('pageToken'))
+        if len(segments) == 2 and segments[0] == 'files' and method == 'GET':
+            return self._file_resource(self._spreadsheet(unquote(segments[1])))
+        if segments == ['changes', 'startPageToken']:
+            return {'kind': 'drive#startPageToken', 'startPageToken': str(len(self._changes) + 1)}
+        if segments == ['changes'] and method == 'GET':
+            return self._list_changes(int(param('pageToken', '1')), int(param('pageSize', '100')))
+        raise FakeApiError(404, 'Unknown Drive method')
+
+    @staticmethod
+    def _file_resource(spreadsheet: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': spreadsheet['id'],
+            'name': spreadsheet['title'],
+            'mimeType': SPREADSHEET_MIME_TYPE,
+            'trashed': spreadsheet['trashed'],
+            'version': str(spreadsheet['version']),
+            'modifiedTime': spreadsheet['modifiedTime'],
+            'webViewLink': f"https://docs.google.com/spreadsheets/d/{spreadsheet['id']}/edit",
+            'owners': [{'displayName': spreadsheet['owner'].split('@')[0], 'emailAddress': spreadsheet['owner']}]
+        }
+
+    _QUERY_CLAUSE = re.compile(
+        r"^(?:mimeType\s*=\s*'(?P<mime>[^']*)'"
+        r"|trashed\s*=\s*(?P<trashed>true|false)"
+        r"|name contains '(?P<name>(?:[^'\\]|\\.)*)'"
+        r"|modifiedTime\s*(?P<op>>=|<=|>|<)\s*'(?P<time>[^']*)')$"
+    )
+
+    def _list_files(self, q: str, page_size: int, page_token: Optional[str]) -> Dict[str, Any]:
+        files = [self._file_resource(s) for s in self._spreadsheets.values()]
+        for clause in filter(None, (c.strip() for c in q.split(' and '))):
+            match = self._QUERY_CLAUSE.match(clause)
+            if not match:
+                raise FakeApiError(400, f"Invalid Value: unsupported query clause {clause!r}", 'invalid')
+            if match['mime'] is not None:
+                files = [f for f in files if f['mimeType'] == match['mime']]
+            elif match['trashed'] is not None:
+                files = [f for f in files if f['trashed'] == (match['trashed'] == 'true')]
+            elif match['name'] is not None:
+                needle = re.sub(r'\\(.)', r'\1', match['name']).lower()
+                files = [f for f in files if needle in f['name'].lower()]
+            else:
+                op, bound = match['op'], match['time']
+                compare = {'>=': str.__ge__, '<=': str.__le__, '>': str.__gt__, '<': str.__lt__}[op]
+                files = [f for f in files if compare(f['modifiedTime'], bound)]
+        files.sort(key=lambda f: f['modifiedTime'], reverse=True)
+        offset = int(page_token or 0)
+        result = {'kind': 'drive#fileList', 'files': files[offset:offset + page_size]}
+        if offset + page_size < len(files):
+            result['nextPageToken'] = str(offset + page_size)
+        return result
+
+    def _list_changes(self, start: int, page_size: int) -> Dict[str, Any]:
+        pending = self._changes[start - 1:start - 1 + page_size]
+        changes = []
+        for file_id in pending:
+            spreadsheet = self._spreadsheets[file_id]
+            changes.append({
+                'kind': 'drive#change',
+                'fileId': file_id,
+                'removed': False,
+                'file': self._file_resource(spreadsheet)
+            })
+        result = {'kind': 'drive#changeList', 'changes': changes}
+        next_token = start + len(pending)
+        if next_token > len(self._changes):
+            result['newStartPageToken'] = str(next_token)
+        else:
+            result['nextPageToken'] = str(next_token)
+        return result
+
+    # Forms v1
+
+    def _route_forms(self, method, segments, param, body):
+        if not segments:
+            if method == 'POST':
+                info = body.get('info', {})
+                form_id = self.add_form(info.get('title', 'Untitled form'), [])
+                self._forms[form_id]['form']['info'].update(info)
+                return self._forms[form_id]['form']
+            raise FakeApiError(404, 'Unknown Forms method')
+
+        form_id, _, action = segments[0].partition(':')
+        form_id = unquote(form_id)
+        if form_id not in self._forms:
+            raise FakeApiError(404, f"Requested entity was not found: {form_id}", 'notFound')
+        entry = self._forms[form_id]
+        if len(segments) == 1 and not action and method == 'GET':
+            return entry['form']
+        if len(segments) == 1 and action == 'batchUpdate' and method == 'POST':
+            replies = []
+            for request in body.get('requests', []):
+                if 'createItem' in request:
+                    question_id = self._add_question(entry['form'], request['createItem']['item'].get('title', ''))
+                    replies.append({'createItem': {'itemId': question_id, 'questionId': [question_id]}})
+                elif 'updateFormInfo' in request:
+                    entry['form']['info'].update(request['updateFormInfo'].get('info', {}))
+                    replies.append({})
+                else:
+                    raise FakeApiError(400, f"Unsupported request: {list(request)}")
+            return {'replies': replies}
+        if segments[1:] == ['responses'] and method == 'GET':
+            return self._list_responses(entry, param('filter'), int(param('pageSize', '5000')), param('pageToken'))
+        raise FakeApiError(404, 'Unknown Forms method')
+
+    @staticmethod
+    def _add_question(form: Dict[str, Any], title: str) -> str:
+        question_id = uuid.uuid4().hex[:8]
+        form['items'].append({
+            'itemId': question_id,
+            'title': title,
+            'questionItem': {'question': {'questionId': question_id, 'textQuestion': {}}}
+        })
+        return question_id
+
+    @staticmethod
+    def _list_responses(entry, filter_expr: Optional[str], page_size: int, page_token: Optional[str]) -> Dict[str, Any]:
+        responses = sorted(entry['responses'], key=lambda r: _parse_time(r['lastSubmittedTime']))
+        if filter_expr:
+            match = re.match(r'^timestamp\s*(>=|>)\s*(\S+)$', filter_expr.strip())
+            if not match:
+                raise FakeApiError(400, f"Invalid filter: {filter_expr}")
+            bound = _parse_time(match.group(2))
+            strict = match.group(1) == '>'
+            responses = [r for r in responses
+                         if _parse_time(r['lastSubmittedTime']) > bound
+                         or (not strict and _parse_time(r['lastSubmittedTime']) == bound)]
+        offset = int(page_token or 0)
+        result = {'responses': responses[offset:offset + page_size]}
+        if offset + page_size < len(responses):
+            result['nextPageToken'] = str(offset + page_size)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run a fake Google Sheets/Drive/Forms backend.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum random extra seconds per request')
+    parser.add_argument('--quota', action='append', default=[], metavar='API=RPM',
+                        help='per-minute quota, e.g. sheets=60 (repeatable)')
+    parser.add_argument('--seed-rows', type=int, default=0, help='create a demo spreadsheet with this many rows')
+    args = parser.parse_args()
+
+    quotas = {api: int(rpm) for api, rpm in (q.split('=', 1) for q in args.quota)}
+    fake = FakeGoogleWorkspace(args.host, args.port, args.latency, args.jitter, quotas)
+    if args.seed_rows:
+        rows = [['ID', 'Name', 'Score', 'Date']] + [
+            [i, f'Name {i}', round(random.uniform(0, 100), 1), f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}']
+            for i in range(1, args.seed_rows + 1)
+        ]
+        print(f"Seeded spreadsheet {fake.add_spreadsheet('Demo', rows)}")
+    print(f"Fake Google Workspace listening on {fake.url}  (set GOOGLE_API_FAKE_URL={fake.url})")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
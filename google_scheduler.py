@@ -0,0 +1,285 @@
+import email.utils
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Some Google APIs report quota exhaustion as 403 with one of these reasons
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'RESOURCE_EXHAUSTED'}
+# Most sub-requests Google accepts in one multipart batch request
+BATCH_MAX_REQUESTS = 100
+
+
+class TokenBucket:
+    """Token bucket refilled at a per-minute rate, allowing short bursts.
+
+    Callers reserve tokens up front and are told how long to wait for them,
+    so concurrent callers are served in arrival order without polling.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, cost: float = 1) -> float:
+        """Take tokens and return the number of seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= cost
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for at least `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+def _error_reason(error: HttpError) -> Optional[str]:
+    """Extract the Google error reason (or status) from an HttpError body."""
+    try:
+        body = json.loads(error.content)
+    except (TypeError, ValueError):
+        return None
+    details = body.get('error', {}) if isinstance(body, dict) else {}
+    errors = details.get('errors') or [{}]
+    return errors[0].get('reason') or details.get('status')
+
+
+def _retry_after_seconds(error: HttpError) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = error.resp.get('retry-after') if error.resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class GoogleApiScheduler:
+    """Shared gate for Google API requests.
+
+    Every request waits for a token from its API's bucket, then runs; 429,
+    rate-limit 403 and 5xx responses are retried with jittered exponential
+    backoff, honouring Retry-After. A rate-limit response also pauses the
+    whole bucket so other queued callers back off together. Non-idempotent
+    requests are only retried on rate limits, since a 5xx may come after
+    the write was applied.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, int]],
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 64.0,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            limits: Mapping of API name to (requests per minute, burst size)
+            max_retries: Retries after the first attempt before giving up
+            base_delay: Backoff delay in seconds for the first retry
+            max_delay: Upper bound in seconds for any single backoff
+            sleep: Sleep function (injectable for tests and benchmarks)
+        """
+        self.buckets = {api: TokenBucket(rpm, burst) for api, (rpm, burst) in limits.items()}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._stats = {api: self._empty_stats() for api in limits}
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "throttled": 0,
+            "throttle_wait_seconds": 0.0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "last_retry_after": None
+        }
+
+    def execute(self, api: str, request, cost: int = 1, idempotent: bool = True) -> Any:
+        """Execute a googleapiclient request (or batch) under the API's quota.
+
+        Args:
+            api: API name, e.g. "sheets", "drive" or "forms"
+            request: Object with an execute() method
+            cost: Quota units the request consumes (e.g. sub-requests in a batch)
+            idempotent: False for requests that must not run twice (appends,
+                creates); they are retried only on 429 and rate-limit 403
+
+        Returns:
+            The request's response
+
+        Raises:
+            HttpError: If the request fails with a non-retryable error or
+                retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            self.throttle(api, cost)
+            self._record(api, requests=1)
+            try:
+                return request.execute()
+            except HttpError as e:
+                retryable = self.is_retryable(e) if idempotent else self.is_rate_limited(e)
+                if attempt == self.max_retries or not retryable:
+                    self._record(api, failures=1)
+                    raise
+                delay = self.retry_delay(api, e, attempt)
+                self._record(api, retries=1)
+                if api in self.buckets and self.is_rate_limited(e):
+                    # The next throttle() waits this out, along with every other caller
+                    self.buckets[api].pause(delay)
+                else:
+                    self.sleep(delay)
+
+    def execute_batch(
+        self,
+        api: str,
+        new_batch: Callable[..., Any],
+        requests: Dict[str, Any],
+        batch_size: int = BATCH_MAX_REQUESTS
+    ) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+        """Execute many requests as multipart batches under the API's quota.
+
+        Each batch is charged one token per sub-request. Sub-requests that fail
+        with a retryable error are collected and sent again in a later batch,
+        with the same backoff as single requests.
+
+        Args:
+            api: API name, e.g. "sheets" or "drive"
+            new_batch: Factory for a BatchHttpRequest, e.g. service.new_batch_http_request
+            requests: Mapping of unique request ID to googleapiclient request
+            batch_size: Sub-requests per batch (at most the API's batch limit)
+
+        Returns:
+            Tuple of (request ID -> response, request ID -> final error)
+
+        Raises:
+            HttpError: If a whole batch request fails after retries
+        """
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+        pending = dict(requests)
+        for attempt in range(self.max_retries + 1):
+            retry: Dict[str, Any] = {}
+            delays, rate_limited = [], False
+
+            def callback(request_id, response, exception):
+                nonlocal rate_limited
+                if exception is None:
+                    results[request_id] = response
+                elif isinstance(exception, HttpError) and attempt < self.max_retries and self.is_retryable(exception):
+                    retry[request_id] = pending[request_id]
+                    delays.append(self.retry_delay(api, exception, attempt))
+                    rate_limited = rate_limited or self.is_rate_limited(exception)
+                else:
+                    errors[request_id] = exception
+
+            request_ids = list(pending)
+            for start in range(0, len(request_ids), batch_size):
+                chunk = request_ids[start:start + batch_size]
+                batch = new_batch(callback=callback)
+                for request_id in chunk:
+                    batch.add(pending[request_id], request_id=request_id)
+                self.execute(api, batch, cost=len(chunk))
+
+            if not retry:
+                break
+            self._record(api, retries=len(retry))
+            if api in self.buckets and rate_limited:
+                self.buckets[api].pause(max(delays))
+            else:
+                self.sleep(max(delays))
+            pending = retry
+
+        if errors:
+            self._record(api, failures=len(errors))
+        return results, errors
+
+    def throttle(self, api: str, cost: int = 1) -> None:
+        """Block until the API's token bucket admits a request of the given cost."""
+        bucket = self.buckets.get(api)
+        if bucket is None:
+            return
+        wait = bucket.reserve(cost)
+        if wait <= 0:
+            return
+
+        with self._lock:
+            stats = self._stats[api]
+            stats["throttled"] += 1
+            stats["throttle_wait_seconds"] += wait
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+        try:
+            self.sleep(wait)
+        finally:
+            with self._lock:
+                self._stats[api]["queue_depth"] -= 1
+
+    @staticmethod
+    def is_rate_limited(error: HttpError) -> bool:
+        """Whether an HttpError reports an exhausted quota."""
+        status = error.resp.status if error.resp is not None else None
+        return status == 429 or (status == 403 and _error_reason(error) in RATE_LIMIT_REASONS)
+
+    @classmethod
+    def is_retryable(cls, error: HttpError) -> bool:
+        """Whether an HttpError is a rate limit or transient server error."""
+        status = error.resp.status if error.resp is not None else None
+        return status in RETRYABLE_STATUSES or cls.is_rate_limited(error)
+
+    def retry_delay(self, api: str, error: HttpError, attempt: int) -> float:
+        """Compute the backoff before retry number `attempt` (0-based).
+
+        Uses Retry-After when the server sent one, otherwise exponential
+        backoff with equal jitter.
+        """
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = min(retry_after, self.max_delay)
+            with self._lock:
+                self._stats.setdefault(api, self._empty_stats())["last_retry_after"] = retry_after
+        else:
+            backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+        return delay
+
+    def _record(self, api: str, **counts: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(api, self._empty_stats())
+            for key, value in counts.items():
+                stats[key] += value
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-API request, retry, throttle and queue depth metrics."""
+        with self._lock:
+            return {
+                api: dict(stats, throttle_wait_seconds=round(stats["throttle_wait_seconds"], 3))
+                for api, stats in self._stats.items()
+            }
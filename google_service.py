@@ -1,9 +1,12 @@
+import json
 import os
 import pickle
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,9 +16,20 @@ load_dotenv()
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/forms.body',
+    'https://www.googleapis.com/auth/forms.responses.readonly',
     'https://www.googleapis.com/auth/drive.readonly'
 ]
 
+def get_token_path() -> str:
+    """Path of the cached OAuth token, next to this script."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'token.pickle')
+
+
+def credentials_available() -> bool:
+    """Whether API calls can run without an interactive OAuth flow."""
+    return bool(os.getenv('GOOGLE_API_FAKE_URL')) or os.path.exists(get_token_path())
+
+
 def get_credentials() -> Credentials:
     """
     Get Google API credentials with automatic token refresh.
@@ -27,18 +41,21 @@ def get_credentials() -> Credentials:
         - On first run, opens browser for OAuth authorization
         - Tokens are cached in token.pickle for future use
         - Automatically refreshes expired tokens
+        - Asks for authorization again if the cached token lacks a required scope
     """
     creds = None
 
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    token_path = os.path.join(script_dir, 'token.pickle')
+    token_path = get_token_path()
 
     # Token file stores the user's access and refresh tokens
     if os.path.exists(token_path):
         with open(token_path, 'rb') as token:
             creds = pickle.load(token)
 
+        # Tokens granted before a scope was added must be re-authorized
+        if creds and not creds.has_scopes(SCOPES):
+            creds = None
+
     # If no valid credentials, let user log in
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -55,6 +72,46 @@ def get_credentials() -> Credentials:
     return creds
 
 
+def build_fake_service(service_name: str, version: str, fake_url: str):
+    """
+    Build an API client that talks to a local fake backend (see fake_google.py).
+    
+    Args:
+        service_name: API name, e.g. "sheets"
+        version: API version, e.g. "v4"
+        fake_url: Base URL of the fake server
+    
+    Returns:
+        Google API service object sending every request, including batch
+        requests, to fake_url without credentials
+    """
+    document = json.loads(get_static_doc(service_name, version))
+    root_url = fake_url.rstrip('/') + '/'
+    # Batch and mTLS URLs derive from these, so every endpoint points at the fake
+    document['rootUrl'] = root_url
+    document['mtlsRootUrl'] = root_url
+    document['baseUrl'] = root_url + document.get('servicePath', '')
+    return build_from_document(document, http=httplib2.Http())
+
+
+def build_service(service_name: str, version: str):
+    """
+    Build an API client, pointing it at the fake backend if GOOGLE_API_FAKE_URL is set.
+    
+    Args:
+        service_name: API name, e.g. "sheets"
+        version: API version, e.g. "v4"
+    
+    Returns:
+        Google API service object
+    """
+    fake_url = os.getenv('GOOGLE_API_FAKE_URL')
+    if fake_url:
+        return build_fake_service(service_name, version, fake_url)
+    creds = get_credentials()
+    return build(service_name, version, credentials=creds)
+
+
 def get_sheets_service():
     """
     Get Google Sheets API service.
@@ -62,8 +119,7 @@ def get_sheets_service():
     Returns:
         Google Sheets API service object (v4)
     """
-    creds = get_credentials()
-    return build('sheets', 'v4', credentials=creds)
+    return build_service('sheets', 'v4')
 
 
 def get_forms_service():
@@ -73,8 +129,7 @@ def get_forms_service():
     Returns:
         Google Forms API service object (v1)
     """
-    creds = get_credentials()
-    return build('forms', 'v1', credentials=creds)
+    return build_service('forms', 'v1')
 
 
 def get_drive_service():
@@ -84,6 +139,5 @@ def get_drive_service():
     Returns:
         Google Drive API service object (v3)
     """
-    creds = get_credentials()
-    return build('drive', 'v3', credentials=creds)
+    return build_service('drive', 'v3')
 
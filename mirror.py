@@ -0,0 +1,233 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tables mirrored locally, by model name, and how each is kept current:
+#   ("full",)              small dimension tables, recopied on every refresh
+#   ("watermark", columns) rows inserted/updated after the last seen (column, key) cursor
+#   ("keys", column[, parents])
+#                          tables without a change timestamp: rows whose primary key is
+#                          not mirrored yet, plus recent rows re-read to pick up edits -
+#                          those whose date column is within the lookback window, or
+#                          whose column references a parent row {parent model: date column}
+#                          dated within it; deleted keys are dropped
+MIRROR_TABLES: Dict[str, Tuple] = {
+    "AgencySites": ("full",),
+    "AgencySiteRooms": ("full",),
+    "DRDPItems": ("full",),
+    "DailyAttendanceLog": ("watermark", ["DOR", "Meal_Confirm_Datetime"]),
+    "DRDPRecord": ("watermark", ["Submit_Datetime", "DOR"]),
+    "LessonPlansPreschool": ("watermark", ["DOR"]),
+    "LessonPlansIT": ("watermark", ["DOR"]),
+    "LessonPlansDetail": ("keys", "Form_ID", {"LessonPlansPreschool": "DOR", "LessonPlansIT": "DOR"}),
+    "CenterSupportReport": ("keys", "Form_Date"),
+}
+
+
+class DatabaseMirror:
+    """Local SQLite mirror of the MySQL tables the query tools read.
+
+    The first refresh of a table copies it in primary-key order; later
+    refreshes only fetch what changed, according to the table's strategy in
+    MIRROR_TABLES, with cursors kept in the watermark store. Changes made
+    while a copy runs are picked up by the next refresh, because the
+    watermark cursors are taken before copying starts. A copy replaces the
+    table in a single mirror transaction, so readers see either the old or
+    the new copy, never a partial one. Watermark tables do
+    not see deletions until a full refresh, and key tables only see edits to
+    rows within the lookback window.
+    """
+
+    def __init__(self, watermarks, batch_size: int = 2000, lookback_days: int = 14):
+        """
+        Args:
+            watermarks: WatermarkStore holding per-table cursors and refresh times
+            batch_size: Rows fetched from MySQL and upserted per round trip
+            lookback_days: Days back from now whose rows of "keys" tables every
+                refresh re-reads, to pick up edits to recent rows
+        """
+        self.watermarks = watermarks
+        self.batch_size = batch_size
+        self.lookback_days = lookback_days
+        self._lock = threading.Lock()
+
+    def _state_key(self, model_name: str) -> str:
+        return f"mirror:{model_name}"
+
+    def refresh(self, tables: Optional[List[str]] = None, full: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Bring the mirror up to date with MySQL.
+
+        Args:
+            tables: Model names to refresh (default: every table in MIRROR_TABLES)
+            full: Recopy the tables instead of applying changes
+
+        Returns:
+            Per-table strategy, rows copied, rows deleted and elapsed seconds
+        """
+        import models
+        from database import get_mirror_engine
+
+        results = {}
+        with self._lock:
+            for model_name in tables or list(MIRROR_TABLES):
+                model = getattr(models, model_name)
+                model.__table__.create(bind=get_mirror_engine(), checkfirst=True)
+                strategy = MIRROR_TABLES[model_name]
+                state = None if full else self.watermarks.get(self._state_key(model_name))
+                started = time.perf_counter()
+                if strategy[0] == "full" or state is None:
+                    copied, deleted, cursors = self._copy_table(model, strategy)
+                    mode = "copy"
+                elif strategy[0] == "watermark":
+                    copied, cursors = self._apply_watermark_changes(model, strategy[1], state["cursors"])
+                    deleted, mode = 0, "watermark"
+                else:
+                    copied, deleted = self._apply_key_changes(model, strategy)
+                    cursors, mode = {}, "keys"
+                self.watermarks.set(self._state_key(model_name), {
+                    "cursors": cursors,
+                    "refreshed_at": datetime.now().isoformat(sep=" ", timespec="seconds")
+                })
+                results[model_name] = {
+                    "mode": mode,
+                    "rows_copied": copied,
+                    "rows_deleted": deleted,
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+        return results
+
+    def _rows(self, model, records) -> List[Dict[str, Any]]:
+        return [{column.name: getattr(record, column.key) for column in model.__table__.columns} for record in records]
+
+    def _upsert(self, model, records) -> None:
+        from database import bulk_insert, get_mirror_db_session
+
+        with get_mirror_db_session() as db:
+            bulk_insert(db, model, self._rows(model, records), on_duplicate="update")
+            db.commit()
+
+    def _copy_table(self, model, strategy: Tuple) -> Tuple[int, int, Dict[str, List]]:
+        """Replace the mirrored table with a fresh copy, returning (copied, deleted, cursors)."""
+        from database import bulk_insert, get_db_session, get_mirror_db_session
+        from sqlalchemy import delete, func
+
+        key = model.__table__.primary_key.columns.values()[0]
+        cursors = {}
+        with get_db_session() as db, get_mirror_db_session() as mirror_db:
+            if strategy[0] == "watermark":
+                # Cursors first, so rows changed during the copy are fetched again next time
+                for column_name in strategy[1]:
+                    latest = db.query(func.max(getattr(model, column_name))).scalar()
+                    cursors[column_name] = [latest.isoformat(sep=" ") if latest else None, ""]
+            # Delete and reinsert in one transaction; mirror readers keep the old copy until it commits
+            deleted = mirror_db.execute(delete(model.__table__)).rowcount
+            copied, last_key = 0, None
+            while True:
+                query = db.query(model)
+                if last_key is not None:
+                    query = query.filter(key > last_key)
+                records = query.order_by(key).limit(self.batch_size).all()
+                if not records:
+                    break
+                bulk_insert(mirror_db, model, self._rows(model, records), on_duplicate="update")
+                copied += len(records)
+                last_key = getattr(records[-1], key.key)
+                db.expunge_all()
+                if len(records) < self.batch_size:
+                    break
+            mirror_db.commit()
+        return copied, deleted, cursors
+
+    def _apply_watermark_changes(self, model, columns: List[str], cursors: Dict[str, List]) -> Tuple[int, Dict[str, List]]:
+        """Upsert rows changed after each column's cursor, returning (copied, new cursors)."""
+        from database import get_db_session
+        from sqlalchemy import and_, or_
+
+        key = model.__table__.primary_key.columns.values()[0]
+        copied = 0
+        cursors = dict(cursors)
+        with get_db_session() as db:
+            for column_name in columns:
+                column = getattr(model, column_name)
+                after, after_key = cursors.get(column_name) or [None, ""]
+                while True:
+                    query = db.query(model).filter(column.isnot(None))
+                    if after is not None:
+                        after_dt = datetime.fromisoformat(after)
+                        query = query.filter(or_(column > after_dt, and_(column == after_dt, key > after_key)))
+                    records = query.order_by(column, key).limit(self.batch_size).all()
+                    if not records:
+                        break
+                    self._upsert(model, records)
+                    copied += len(records)
+                    after = getattr(records[-1], column_name).isoformat(sep=" ")
+                    after_key = getattr(records[-1], key.key)
+                    db.expunge_all()
+                    if len(records) < self.batch_size:
+                        break
+                cursors[column_name] = [after, after_key]
+        return copied, cursors
+
+    def _recent_filter(self, model, strategy: Tuple):
+        """Criterion for a "keys" table's rows dated within the lookback window."""
+        import models
+        from sqlalchemy import or_, select
+
+        since = datetime.now() - timedelta(days=self.lookback_days)
+        column = getattr(model, strategy[1])
+        if len(strategy) < 3:
+            return column >= since
+        parents = [(getattr(models, name), date_name) for name, date_name in strategy[2].items()]
+        return or_(*(
+            column.in_(select(parent.__table__.primary_key.columns.values()[0]).where(getattr(parent, date_name) >= since))
+            for parent, date_name in parents
+        ))
+
+    def _apply_key_changes(self, model, strategy: Tuple) -> Tuple[int, int]:
+        """Copy rows whose key is not mirrored or that are recent, and drop mirrored rows gone from MySQL."""
+        from database import get_db_session, get_mirror_db_session
+        from sqlalchemy import delete, select
+
+        key = model.__table__.primary_key.columns.values()[0]
+        with get_db_session() as db, get_mirror_db_session() as mirror_db:
+            primary_keys = set(db.execute(select(key)).scalars())
+            mirrored_keys = set(mirror_db.execute(select(key)).scalars())
+            missing = sorted(primary_keys - mirrored_keys)
+            gone = sorted(mirrored_keys - primary_keys)
+            for start in range(0, len(gone), self.batch_size):
+                mirror_db.execute(delete(model.__table__).where(key.in_(gone[start:start + self.batch_size])))
+            mirror_db.commit()
+            for start in range(0, len(missing), self.batch_size):
+                records = db.query(model).filter(key.in_(missing[start:start + self.batch_size])).all()
+                self._upsert(model, records)
+                db.expunge_all()
+
+            # No change timestamp: re-read recent rows so edits to them are mirrored
+            refreshed, last_key = 0, None
+            recent = self._recent_filter(model, strategy)
+            while True:
+                query = db.query(model).filter(recent)
+                if last_key is not None:
+                    query = query.filter(key > last_key)
+                records = query.order_by(key).limit(self.batch_size).all()
+                if not records:
+                    break
+                self._upsert(model, records)
+                refreshed += len(records)
+                last_key = getattr(records[-1], key.key)
+                db.expunge_all()
+                if len(records) < self.batch_size:
+                    break
+        return len(missing) + refreshed, len(gone)
+
+    def status(self) -> Dict[str, Optional[str]]:
+        """Last refresh time of each mirrored table (None if never refreshed)."""
+        return {
+            model_name: (self.watermarks.get(self._state_key(model_name)) or {}).get("refreshed_at")
+            for model_name in MIRROR_TABLES
+        }
+
+    def is_ready(self) -> bool:
+        """Whether every table has been copied at least once."""
+        return all(self.status().values())
@@ -192,4 +192,51 @@ class DRDPRecord(Base):
     PD_HLTH_9 = Column(Float)
     PD_HLTH_10 = Column(Float)
 
-__all__ = ['ChildAttendance', 'DailyAttendanceLog', 'AgencySites', 'AgencySiteRooms', 'CenterSupportReport', 'LessonPlansPreschool', 'LessonPlansIT', 'LessonPlansDetail', 'DRDPItems', 'DRDPRecord']
+class FormResponseAnswer(Base):
+    __tablename__ = "form_response_answers"
+
+    Response_ID = Column(String(100), primary_key=True)
+    Question_ID = Column(String(100), primary_key=True)
+    Form_ID = Column(String(100), index=True)
+    Create_Time = Column(DateTime)
+    Last_Submitted_Time = Column(DateTime)
+    Respondent_Email = Column(String(200))
+    Answer = Column(Text)
+
+# Weekly/monthly summaries kept in the local store by refresh_summaries.
+# Missing site and room ids are stored as "" so they can be part of the key.
+class AttendanceSummary(Base):
+    __tablename__ = "attendance_summary"
+
+    Period = Column(String(10), primary_key=True)
+    Period_Start = Column(DateTime, primary_key=True)
+    Site_ID = Column(String(100), primary_key=True)
+    Room_ID = Column(String(100), primary_key=True)
+    Log_Count = Column(Integer)
+    Breakfast = Column(Integer)
+    Lunch = Column(Integer)
+    PM_Snack = Column(Integer)
+
+class SupportReportSummary(Base):
+    __tablename__ = "support_report_summary"
+
+    Period = Column(String(10), primary_key=True)
+    Period_Start = Column(DateTime, primary_key=True)
+    Site_ID = Column(String(500), primary_key=True)
+    Report_Count = Column(Integer)
+    Timed_Reports = Column(Integer)
+    Support_Hours = Column(Float)
+
+class DRDPSummary(Base):
+    __tablename__ = "drdp_summary"
+
+    Period = Column(String(10), primary_key=True)
+    Period_Start = Column(DateTime, primary_key=True)
+    Site_ID = Column(String(100), primary_key=True)
+    Room_ID = Column(String(100), primary_key=True)
+    Domain = Column(String(20), primary_key=True)
+    Record_Count = Column(Integer)
+    Rating_Sum = Column(Float)
+    Rating_Count = Column(Integer)
+
+__all__ = ['ChildAttendance', 'DailyAttendanceLog', 'AgencySites', 'AgencySiteRooms', 'CenterSupportReport', 'LessonPlansPreschool', 'LessonPlansIT', 'LessonPlansDetail', 'DRDPItems', 'DRDPRecord', 'FormResponseAnswer', 'AttendanceSummary', 'SupportReportSummary', 'DRDPSummary']
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+# MySQL error raised when a statement exceeds MAX_EXECUTION_TIME
+MYSQL_ER_QUERY_TIMEOUT = 3024
+
+
+class QueryCancelledError(Exception):
+    """Raised on a worker thread when its tool call was cancelled or timed out."""
+
+
+class QueryScope:
+    """Statements run by one tool call, so they can be bounded and killed.
+
+    The database layer reads the scope from a context variable (copied into
+    the worker thread): it adds the statement timeout hint, records which
+    MySQL connection is executing, and refuses to start new statements once
+    the call has been cancelled. A child scope (e.g. one date shard) can be
+    cancelled on its own; its statements also count as the parent's, so
+    cancelling the call stops them too.
+    """
+
+    def __init__(self, tool: str, statement_timeout: Optional[float], parent: Optional["QueryScope"] = None):
+        self.tool = tool
+        self.statement_timeout = statement_timeout
+        self.parent = parent
+        self.cancelled = False
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def statement_timeout_ms(self) -> Optional[int]:
+        return int(self.statement_timeout * 1000) if self.statement_timeout else None
+
+    def child(self) -> "QueryScope":
+        """A scope for part of this call, with the same statement timeout."""
+        return QueryScope(self.tool, self.statement_timeout, parent=self)
+
+    def statement_started(self, thread_id: int) -> None:
+        if self.parent is not None:
+            self.parent.statement_started(thread_id)
+        if self.cancelled:
+            if self.parent is not None:
+                self.parent.statement_finished(thread_id)
+            raise QueryCancelledError(f"{self.tool} was cancelled")
+        with self._lock:
+            self._running.add(thread_id)
+
+    def statement_finished(self, thread_id: int) -> None:
+        with self._lock:
+            self._running.discard(thread_id)
+        if self.parent is not None:
+            self.parent.statement_finished(thread_id)
+
+    def cancel(self) -> Set[int]:
+        """Mark the call cancelled; returns the connection ids still executing."""
+        with self._lock:
+            self.cancelled = True
+            return set(self._running)
+
+    def kill(self, thread_id: int, kill_query: Callable[[int], None]) -> bool:
+        """Send kill_query(thread_id) if that connection is still executing this scope's statement.
+
+        The scope stays locked while the kill is sent, so statement_finished
+        waits for it: the connection cannot go back to the pool and start
+        another call's statement before the KILL arrives.
+
+        Returns:
+            False if the statement had already finished, so nothing was sent
+        """
+        with self._lock:
+            if thread_id not in self._running:
+                return False
+            kill_query(thread_id)
+            return True
+
+
+_current_scope: contextvars.ContextVar[Optional[QueryScope]] = contextvars.ContextVar("query_scope", default=None)
+
+
+def current_query_scope() -> Optional[QueryScope]:
+    """Scope of the tool call running in this context, if any."""
+    return _current_scope.get()
+
+
+def run_in_scope(scope: Optional[QueryScope], fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call fn(*args, **kwargs) with `scope` as the current query scope."""
+    token = _current_scope.set(scope)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current_scope.reset(token)
+
+
+class QueryGuard:
+    """Per-tool statement timeouts and cancellation propagated to MySQL.
+
+    Wraps async (offloaded) DB tools. Each call runs in its own QueryScope;
+    SELECTs get a MAX_EXECUTION_TIME hint so MySQL aborts them server-side,
+    and when the MCP client cancels the call (or the thread pool times it
+    out) the statements still executing are killed with KILL QUERY, so the
+    worker thread fails fast and its pooled connection is returned at once.
+    """
+
+    def __init__(
+        self,
+        kill_query: Callable[[int], None],
+        default_timeout: Optional[float] = None,
+        tool_timeouts: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            kill_query: Blocking function aborting the statement on a MySQL connection id
+            default_timeout: Statement timeout in seconds for tools without their own (None for none)
+            tool_timeouts: Per-tool timeouts, overriding the decorator's defaults
+        """
+        self.kill_query = kill_query
+        self.default_timeout = default_timeout
+        self.tool_timeouts: Dict[str, Optional[float]] = dict(tool_timeouts or {})
+        self._lock = threading.Lock()
+        self._stats = {"cancelled": 0, "statement_timeouts": 0, "kills_sent": 0, "kill_failures": 0}
+
+    def guard(self, statement_timeout: Optional[float] = None):
+        """Decorator applying statement timeouts and kill-on-cancel to a tool.
+
+        Args:
+            statement_timeout: Default timeout in seconds for this tool; a
+                tool_timeouts entry takes precedence, then the guard's default
+        """
+        def decorator(fn: Callable[..., Any]):
+            tool = fn.__name__
+            self.tool_timeouts.setdefault(tool, statement_timeout or self.default_timeout)
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                scope = QueryScope(tool, self.tool_timeouts[tool])
+                token = _current_scope.set(scope)
+                try:
+                    return await fn(*args, **kwargs)
+                except (asyncio.CancelledError, TimeoutError):
+                    self._cancel(scope)
+                    raise
+                except Exception as e:
+                    if (getattr(getattr(e, "orig", None), "args", None) or (None,))[0] == MYSQL_ER_QUERY_TIMEOUT:
+                        with self._lock:
+                            self._stats["statement_timeouts"] += 1
+                        raise TimeoutError(
+                            f"{tool} exceeded its {scope.statement_timeout:g}s statement timeout; "
+                            "narrow the date range or filters"
+                        ) from e
+                    raise
+                finally:
+                    _current_scope.reset(token)
+            return wrapper
+        return decorator
+
+    def _cancel(self, scope: QueryScope) -> None:
+        with self._lock:
+            self._stats["cancelled"] += 1
+        self.abort(scope)
+
+    def abort(self, scope: QueryScope) -> None:
+        """Cancel a scope and kill its running statements, e.g. a shard whose rows are no longer needed."""
+        running = scope.cancel()
+        if running:
+            # Kill off the event loop without delaying the cancellation itself
+            threading.Thread(target=self._kill, args=(scope, running), name="query-kill", daemon=True).start()
+
+    def _kill(self, scope: QueryScope, thread_ids: Set[int]) -> None:
+        for thread_id in thread_ids:
+            try:
+                # Re-checked at send time: a statement that finished meanwhile may have freed its connection
+                sent = scope.kill(thread_id, self.kill_query)
+            except Exception:
+                with self._lock:
+                    self._stats["kill_failures"] += 1
+            else:
+                if sent:
+                    with self._lock:
+                        self._stats["kills_sent"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cancellation/kill counters and the configured statement timeouts."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["statement_timeouts_seconds"] = dict(self.tool_timeouts)
+        return stats
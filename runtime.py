@@ -0,0 +1,29 @@
+import os
+
+# Number of server processes sharing this host's budgets (set by the CLI for HTTP workers)
+WORKERS_ENV = "DATAHUB_WORKERS"
+
+
+def worker_count() -> int:
+    """Number of worker processes the server runs as (1 for stdio)."""
+    try:
+        return max(1, int(os.getenv(WORKERS_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def per_worker(total, minimum=1):
+    """Split a deployment-wide budget evenly across worker processes.
+
+    Connection pools, thread pools, cache memory and Google API quotas are
+    configured as totals for the deployment; each worker process takes its
+    share so N workers together stay within the configured limits.
+
+    Args:
+        total: Deployment-wide value (int or float)
+        minimum: Smallest share a worker gets
+
+    Returns:
+        The per-worker share, with the same type as total
+    """
+    return type(total)(max(minimum, total / worker_count()))
@@ -0,0 +1,89 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def estimate_values_size(values: List[List[Any]]) -> int:
+    """Approximate the in-memory size in bytes of a 2D list of cell values."""
+    size = sys.getsizeof(values)
+    for row in values:
+        size += sys.getsizeof(row)
+        for cell in row:
+            size += sys.getsizeof(cell)
+    return size
+
+
+class SheetValueCache:
+    """LRU cache of sheet values keyed by (spreadsheet ID, range).
+
+    Each entry remembers the Drive file revision (version or modifiedTime) it
+    was read at. A lookup with a different revision drops the entry, so callers
+    only need a cheap Drive metadata request to know whether cached values are
+    still current. Total size is bounded by an approximate byte budget and the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, List[List[Any]], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, spreadsheet_id: str, range_name: str, revision: str) -> Optional[List[List[Any]]]:
+        """Return cached values if they were read at the given revision."""
+        key = (spreadsheet_id, range_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != revision:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, spreadsheet_id: str, range_name: str, revision: str, values: List[List[Any]]) -> None:
+        """Store values read at the given revision, evicting LRU entries as needed."""
+        size = estimate_values_size(values)
+        if size > self.max_bytes:
+            return
+
+        key = (spreadsheet_id, range_name)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (revision, values, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, spreadsheet_id: str) -> None:
+        """Drop every cached range of a spreadsheet (e.g. after writing to it)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == spreadsheet_id]:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, memory use and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size -= size
@@ -0,0 +1,96 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+
+def records_to_rows(records: List[Dict[str, Any]]) -> List[List[Any]]:
+    """Turn a list of record dicts (e.g. a query tool's "records") into a header row plus rows.
+
+    Columns follow the order in which keys first appear. Nested values such
+    as lists or dicts are written as JSON text.
+    """
+    header: List[str] = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                header.append(key)
+
+    rows: List[List[Any]] = [list(header)]
+    for record in records:
+        row = []
+        for key in header:
+            value = record.get(key)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            row.append(value)
+        rows.append(row)
+    return rows
+
+
+def normalize_cell(value: Any) -> Any:
+    """Prepare a target value for a RAW write; None becomes an empty cell."""
+    return "" if value is None else value
+
+
+def cells_equal(existing: Any, desired: Any) -> bool:
+    """Compare an unformatted sheet value with a target value."""
+    if existing in (None, "") and desired in (None, ""):
+        return True
+    if isinstance(existing, bool) or isinstance(desired, bool):
+        return existing is desired
+    if isinstance(existing, (int, float)) and isinstance(desired, (int, float)):
+        return float(existing) == float(desired)
+    return str(existing) == str(desired)
+
+
+def diff_blocks(current: List[List[Any]], target: List[List[Any]], clear_extra: bool = True) -> List[Tuple[int, int, int, int, List[List[Any]]]]:
+    """Find the rectangles of cells that must be written to turn current into target.
+
+    Changed cells in a row are grouped into runs of adjacent columns, and runs
+    spanning the same columns in consecutive rows are merged into one block.
+
+    Args:
+        current: Values currently in the sheet (rows may be ragged)
+        target: Desired values, anchored at the same top-left cell
+        clear_extra: Also blank out cells that exist in current but not in target
+
+    Returns:
+        List of (first_row, first_col, last_row, last_col, values) blocks with
+        0-based offsets from the anchor
+    """
+    row_count = max(len(current), len(target)) if clear_extra else len(target)
+    runs = []
+    for i in range(row_count):
+        target_row = target[i] if i < len(target) else []
+        current_row = current[i] if i < len(current) else []
+        width = max(len(target_row), len(current_row)) if clear_extra else len(target_row)
+
+        run_start, run_values = None, []
+        for j in range(width + 1):
+            changed = False
+            if j < width:
+                desired = normalize_cell(target_row[j]) if j < len(target_row) else ""
+                existing = current_row[j] if j < len(current_row) else ""
+                changed = not cells_equal(existing, desired)
+            if changed:
+                if run_start is None:
+                    run_start, run_values = j, []
+                run_values.append(desired)
+            elif run_start is not None:
+                runs.append((i, run_start, j - 1, run_values))
+                run_start = None
+
+    # Merge runs over the same columns in consecutive rows into blocks
+    blocks = []
+    open_blocks: Dict[Tuple[int, int], list] = {}
+    for i, first_col, last_col, values in runs:
+        block = open_blocks.get((first_col, last_col))
+        if block is not None and block[2] == i - 1:
+            block[2] = i
+            block[4].append(values)
+        else:
+            block = [i, first_col, i, last_col, [values]]
+            open_blocks[(first_col, last_col)] = block
+            blocks.append(block)
+    return [tuple(block) for block in blocks]
@@ -0,0 +1,147 @@
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, String
+
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+]
+
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0"}
+
+
+def normalize_header(name: str) -> str:
+    """Normalize a header or column name for matching ("Site ID" -> "siteid")."""
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+
+def map_headers(headers: List[Any], model, column_map: Optional[Dict[str, str]] = None) -> Tuple[Dict[int, str], List[str]]:
+    """Match sheet headers to a model's columns.
+
+    Args:
+        headers: Header row from the sheet
+        model: Target ORM model
+        column_map: Optional explicit mapping of header -> column name,
+            taking precedence over name matching
+
+    Returns:
+        Tuple of (sheet column index -> model column name, unmapped headers)
+
+    Raises:
+        ValueError: If column_map names a column the model does not have
+    """
+    columns = {normalize_header(c.name): c.name for c in model.__table__.columns}
+    explicit = {}
+    for header, column in (column_map or {}).items():
+        if column not in model.__table__.c:
+            raise ValueError(f"Column '{column}' does not exist on {model.__tablename__}")
+        explicit[normalize_header(header)] = column
+
+    mapping, unmapped = {}, []
+    for index, header in enumerate(headers):
+        key = normalize_header(header)
+        column = explicit.get(key) or columns.get(key)
+        if column and column not in mapping.values():
+            mapping[index] = column
+        elif str(header).strip():
+            unmapped.append(str(header))
+    return mapping, unmapped
+
+
+def _coerce_integer(value: str) -> int:
+    number = float(value.replace(',', ''))
+    if not number.is_integer():
+        raise ValueError(f"'{value}' is not a whole number")
+    return int(number)
+
+
+def _coerce_float(value: str) -> float:
+    # "50%" is the formatted value of 0.5
+    if value.endswith('%'):
+        return float(value[:-1].replace(',', '')) / 100
+    return float(value.replace(',', ''))
+
+
+def _coerce_datetime(value: str) -> datetime:
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"'{value}' is not a recognized date/time")
+
+
+def _coerce_boolean(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(f"'{value}' is not a boolean")
+
+
+def column_coercer(column) -> Callable[[str], Any]:
+    """Build a function converting a sheet cell string to a column's Python type.
+
+    The returned function raises ValueError for values that do not fit.
+    """
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return _coerce_boolean
+    if isinstance(column_type, Integer):
+        return _coerce_integer
+    if isinstance(column_type, Float):
+        return _coerce_float
+    if isinstance(column_type, DateTime):
+        return _coerce_datetime
+    if isinstance(column_type, String) and column_type.length:
+        length = column_type.length
+
+        def coerce_string(value: str) -> str:
+            if len(value) > length:
+                raise ValueError(f"longer than {length} characters")
+            return value
+        return coerce_string
+    return str
+
+
+def make_row_converter(model, mapping: Dict[int, str]) -> Callable[[List[Any]], Dict[str, Any]]:
+    """Build a function turning a sheet row into a column dict for the model.
+
+    Every returned dict has the same keys (all mapped columns), as required
+    for executemany. Blank cells become NULL.
+
+    Raises (from the returned function):
+        ValueError: Naming the column whose value could not be converted, or
+            the missing primary key
+    """
+    table = model.__table__
+    coercers = [(index, name, column_coercer(table.c[name])) for index, name in mapping.items()]
+    primary_keys = [c.name for c in table.primary_key.columns if c.name in mapping.values()]
+
+    def convert(row: List[Any]) -> Dict[str, Any]:
+        record = {}
+        for index, name, coerce in coercers:
+            cell = row[index] if index < len(row) else None
+            text = str(cell).strip() if cell is not None else ''
+            if text == '':
+                record[name] = None
+                continue
+            try:
+                record[name] = coerce(text)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+        for name in primary_keys:
+            if record[name] is None:
+                raise ValueError(f"{name}: primary key is empty")
+        return record
+
+    return convert
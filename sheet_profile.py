@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from sheet_import import DATETIME_FORMATS
+
+# Share of non-empty cells that must parse for a column to get a numeric or date type
+TYPE_THRESHOLD = 0.9
+# Columns with at most this many distinct values (or a low distinct ratio) are categorical
+CATEGORICAL_MAX_UNIQUE = 50
+CATEGORICAL_MAX_RATIO = 0.2
+# Outlier values listed per numeric column
+OUTLIER_SAMPLES = 5
+# Leading values checked before attempting a full numeric or date parse
+TYPE_SAMPLE_SIZE = 200
+
+
+def _parse_numbers(values: List[str]) -> np.ndarray:
+    """Parse strings to floats, with NaN for values that are not numbers."""
+    cleaned = np.char.replace(np.char.replace(np.asarray(values, dtype=str), ',', ''), '$', '')
+    try:
+        # Fast path: the whole column converts in one vectorized call
+        return cleaned.astype(np.float64)
+    except ValueError:
+        pass
+    parsed = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(cleaned):
+        try:
+            parsed[i] = float(value.rstrip('%'))
+        except ValueError:
+            parsed[i] = np.nan
+    return parsed
+
+
+def _parse_dates(values: List[str]) -> np.ndarray:
+    """Parse strings to datetime64[s], with NaT for values that are not dates."""
+    try:
+        # Fast path for ISO dates and date-times
+        return np.asarray(values, dtype='datetime64[s]')
+    except ValueError:
+        pass
+    parsed = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[s]')
+    formats = list(DATETIME_FORMATS)
+    for i, value in enumerate(values):
+        for fmt in formats:
+            try:
+                parsed[i] = np.datetime64(datetime.strptime(value, fmt), 's')
+            except ValueError:
+                continue
+            # Columns use one format almost always; try the last match first
+            if fmt != formats[0]:
+                formats.remove(fmt)
+                formats.insert(0, fmt)
+            break
+    return parsed
+
+
+def _top_values(values: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+    uniques, counts = np.unique(values, return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top_k]
+    return [{"value": str(uniques[i]), "count": int(counts[i])} for i in order]
+
+
+def _round(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def profile_column(name: str, cells: List[Any], top_k: int = 5) -> Dict[str, Any]:
+    """Infer a column's type (numeric, date, categorical or text) and summarize it.
+
+    Args:
+        name: Column name
+        cells: Raw cell values, one per data row (missing trailing cells as "")
+        top_k: Number of most frequent values to report
+
+    Returns:
+        Dictionary with the inferred type, count and missing-value count, plus
+        type-specific statistics
+    """
+    text = np.asarray([str(c).strip() if c is not None else '' for c in cells], dtype=str)
+    present = text[text != '']
+    profile: Dict[str, Any] = {
+        "name": name,
+        "count": int(present.size),
+        "missing": int(text.size - present.size)
+    }
+    if present.size == 0:
+        profile["type"] = "empty"
+        return profile
+
+    # A sample rules out most columns cheaply before the full (possibly per-cell) parse
+    sample = present[:TYPE_SAMPLE_SIZE].tolist()
+    numbers = _parse_numbers(present.tolist()) if np.mean(~np.isnan(_parse_numbers(sample))) >= TYPE_THRESHOLD else np.array([])
+    valid_numbers = numbers[~np.isnan(numbers)]
+    if valid_numbers.size and valid_numbers.size >= TYPE_THRESHOLD * present.size:
+        q1, median, q3 = np.percentile(valid_numbers, [25, 50, 75])
+        iqr = q3 - q1
+        low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        outliers = valid_numbers[(valid_numbers < low) | (valid_numbers > high)]
+        extreme = outliers[np.argsort(-np.abs(outliers - median))][:OUTLIER_SAMPLES]
+        profile.update({
+            "type": "numeric",
+            "invalid": int(present.size - valid_numbers.size),
+            "min": _round(valid_numbers.min()),
+            "max": _round(valid_numbers.max()),
+            "mean": _round(valid_numbers.mean()),
+            "median": _round(median),
+            "std": _round(valid_numbers.std()),
+            "sum": _round(valid_numbers.sum()),
+            "p25": _round(q1),
+            "p75": _round(q3),
+            "outliers": {
+                "count": int(outliers.size),
+                "lower_fence": _round(low),
+                "upper_fence": _round(high),
+                "samples": [_round(v) for v in extreme]
+            }
+        })
+        if np.unique(valid_numbers).size <= CATEGORICAL_MAX_UNIQUE:
+            profile["top_values"] = _top_values(valid_numbers, top_k)
+        return profile
+
+    dates = _parse_dates(present.tolist()) if np.mean(~np.isnat(_parse_dates(sample))) >= TYPE_THRESHOLD else np.array([], dtype='datetime64[s]')
+    valid_dates = dates[~np.isnat(dates)]
+    if valid_dates.size and valid_dates.size >= TYPE_THRESHOLD * present.size:
+        earliest, latest = valid_dates.min(), valid_dates.max()
+        profile.update({
+            "type": "date",
+            "invalid": int(present.size - valid_dates.size),
+            "min": str(earliest),
+            "max": str(latest),
+            "span_days": int((latest - earliest) // np.timedelta64(1, 'D')),
+            "top_months": _top_values(valid_dates.astype('datetime64[M]'), top_k)
+        })
+        return profile
+
+    unique_count = np.unique(present).size
+    if unique_count <= CATEGORICAL_MAX_UNIQUE or unique_count <= CATEGORICAL_MAX_RATIO * present.size:
+        profile.update({
+            "type": "categorical",
+            "unique": int(unique_count),
+            "top_values": _top_values(present, top_k)
+        })
+        return profile
+
+    lengths = np.char.str_len(present)
+    profile.update({
+        "type": "text",
+        "unique": int(unique_count),
+        "avg_length": _round(lengths.mean()),
+        "max_length": int(lengths.max()),
+        "top_values": _top_values(present, top_k)
+    })
+    return profile
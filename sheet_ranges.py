@@ -0,0 +1,120 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Cell part of an A1 range, e.g. "A1", "A1:D20", "A:D", "5:10", "B2:B"
+_CELL_RANGE_PATTERN = re.compile(r"^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$")
+# Stricter form used to tell a bare cell range from a sheet title like "Sheet1"
+_BARE_CELL_RANGE_PATTERN = re.compile(r"^[A-Za-z]{0,3}\d*(?::[A-Za-z]{0,3}\d*)?$")
+
+
+@dataclass
+class A1Range:
+    """Parsed A1 range. Columns and rows are 1-based; None means unbounded."""
+    sheet: Optional[str] = None
+    start_col: Optional[int] = None
+    start_row: Optional[int] = None
+    end_col: Optional[int] = None
+    end_row: Optional[int] = None
+
+
+def column_to_index(column: str) -> int:
+    """Convert a column letter to a 1-based index (A -> 1, AA -> 27)."""
+    index = 0
+    for char in column.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index
+
+
+def index_to_column(index: int) -> str:
+    """Convert a 1-based column index to its letter (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def quote_sheet_name(title: str) -> str:
+    """Quote a sheet title for use in A1 notation."""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def _split_sheet(range_name: str):
+    """Split "Sheet!A1:B2" into (sheet, cells), honouring quoted titles."""
+    if range_name.startswith("'"):
+        i = 1
+        while i < len(range_name):
+            if range_name[i] == "'":
+                if i + 1 < len(range_name) and range_name[i + 1] == "'":
+                    i += 2
+                    continue
+                break
+            i += 1
+        sheet = range_name[1:i].replace("''", "'")
+        rest = range_name[i + 1:]
+        return sheet, rest[1:] if rest.startswith('!') else None
+
+    if '!' in range_name:
+        sheet, cells = range_name.rsplit('!', 1)
+        return sheet, cells
+
+    # Without "!" the text is either a bare cell range or a sheet title.
+    # Only treat it as cells when it has a row number or a colon, so that
+    # short titles such as "Jan" are not mistaken for column letters.
+    match = _BARE_CELL_RANGE_PATTERN.match(range_name)
+    if match and (any(c.isdigit() for c in range_name) or ':' in range_name):
+        return None, range_name
+    return range_name, None
+
+
+def parse_range(range_name: str) -> A1Range:
+    """Parse an A1 range such as "Sheet1", "'My Sheet'!A2:D" or "B2:C10".
+
+    Raises:
+        ValueError: If the cell part is not valid A1 notation
+    """
+    sheet, cells = _split_sheet(range_name.strip())
+    parsed = A1Range(sheet=sheet or None)
+    if not cells:
+        return parsed
+
+    match = _CELL_RANGE_PATTERN.match(cells)
+    if not match or cells in ('', ':'):
+        raise ValueError(f"Invalid A1 range: {range_name}")
+
+    start_col, start_row, end_col, end_row = match.groups()
+    parsed.start_col = column_to_index(start_col) if start_col else None
+    parsed.start_row = int(start_row) if start_row else None
+    if ':' in cells:
+        parsed.end_col = column_to_index(end_col) if end_col else None
+        parsed.end_row = int(end_row) if end_row else None
+    else:
+        # Single cell reference
+        parsed.end_col = parsed.start_col
+        parsed.end_row = parsed.start_row
+    return parsed
+
+
+def format_range(
+    sheet: Optional[str],
+    start_col: Optional[int],
+    start_row: Optional[int],
+    end_col: Optional[int],
+    end_row: Optional[int]
+) -> str:
+    """Build an A1 range string from 1-based bounds (None means unbounded).
+
+    Examples:
+        ("Sheet1", 1, 2, 4, 10) -> "'Sheet1'!A2:D10"
+        ("Sheet1", None, 5, None, 9) -> "'Sheet1'!5:9"
+        ("Sheet1", None, None, None, None) -> "'Sheet1'"
+    """
+    cells = ''
+    if any(bound is not None for bound in (start_col, start_row, end_col, end_row)):
+        start = (index_to_column(start_col) if start_col else '') + (str(start_row) if start_row else '')
+        end = (index_to_column(end_col) if end_col else '') + (str(end_row) if end_row else '')
+        cells = f"{start}:{end}"
+    if sheet is None:
+        return cells
+    return f"{quote_sheet_name(sheet)}!{cells}" if cells else quote_sheet_name(sheet)
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+SHEET_URI_PREFIX = "sheet://"
+
+
+def parse_sheet_uri(uri: str) -> Tuple[str, str]:
+    """Split "sheet://{spreadsheet_id}/{range_name}" into its parts.
+
+    Raises:
+        ValueError: If the URI is not a sheet:// resource URI
+    """
+    if not uri.startswith(SHEET_URI_PREFIX):
+        raise ValueError(f"Not a sheet resource URI: {uri}")
+    spreadsheet_id, _, range_name = uri[len(SHEET_URI_PREFIX):].partition('/')
+    if not spreadsheet_id or not range_name:
+        raise ValueError(f"Expected sheet://{{spreadsheet_id}}/{{range_name}}, got: {uri}")
+    return unquote(spreadsheet_id), unquote(range_name)
+
+
+class SheetSubscriptionManager:
+    """Tracks sheet:// resource subscriptions and notifies sessions of changes.
+
+    One background task polls every subscribed spreadsheet once per interval,
+    however many sessions or ranges are subscribed to it. Each poll is a
+    single Drive revision lookup; only when the revision moves are the
+    subscribed ranges re-read and hashed, and a resources/updated
+    notification goes out only for ranges whose content hash changed (so
+    formatting-only edits stay silent).
+    """
+
+    def __init__(
+        self,
+        get_revision: Callable[[str], Optional[str]],
+        read_content: Callable[[str, str], str],
+        interval: float = 30.0,
+        run_blocking: Callable[..., Awaitable[Any]] = asyncio.to_thread
+    ):
+        """
+        Args:
+            get_revision: Blocking function returning a spreadsheet's Drive revision
+            read_content: Blocking function returning a range's resource content
+            interval: Seconds between polling rounds
+            run_blocking: Coroutine function running a blocking call off the event loop
+        """
+        self.get_revision = get_revision
+        self.read_content = read_content
+        self.interval = interval
+        self.run_blocking = run_blocking
+        # uri -> sessions subscribed to it
+        self._subscribers: Dict[str, Set[Any]] = {}
+        # uri -> hash of the content last seen (None until first read succeeds)
+        self._hashes: Dict[str, Optional[str]] = {}
+        # spreadsheet_id -> revision last seen
+        self._revisions: Dict[str, Optional[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"polls": 0, "revision_changes": 0, "content_reads": 0, "notifications": 0, "errors": 0}
+
+    def _hash(self, spreadsheet_id: str, range_name: str) -> str:
+        self._stats["content_reads"] += 1
+        content = self.read_content(spreadsheet_id, range_name)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def subscribe(self, uri: str, session: Any) -> None:
+        """Register a session for updates to a sheet:// URI and start polling."""
+        spreadsheet_id, range_name = parse_sheet_uri(uri)
+        if uri not in self._subscribers:
+            self._subscribers[uri] = set()
+            # Baseline taken now so the first change after subscribing is caught
+            if spreadsheet_id not in self._revisions:
+                self._revisions[spreadsheet_id] = await self.run_blocking(self.get_revision, spreadsheet_id)
+            try:
+                self._hashes[uri] = await self.run_blocking(self._hash, spreadsheet_id, range_name)
+            except Exception:
+                self._stats["errors"] += 1
+                self._hashes[uri] = None
+        self._subscribers[uri].add(session)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def unsubscribe(self, uri: str, session: Any) -> None:
+        """Remove a session's subscription; polling stops when none remain."""
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            self._forget(uri)
+
+    def _forget(self, uri: str) -> None:
+        self._subscribers.pop(uri, None)
+        self._hashes.pop(uri, None)
+        spreadsheet_id, _ = parse_sheet_uri(uri)
+        if not any(parse_sheet_uri(other)[0] == spreadsheet_id for other in self._subscribers):
+            self._revisions.pop(spreadsheet_id, None)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll_once()
+            except Exception:
+                self._stats["errors"] += 1
+                logger.exception("Sheet subscription poll failed")
+
+    async def poll_once(self) -> None:
+        """Check every subscribed spreadsheet once and notify changed ranges."""
+        self._stats["polls"] += 1
+        by_spreadsheet: Dict[str, list] = {}
+        for uri in list(self._subscribers):
+            by_spreadsheet.setdefault(parse_sheet_uri(uri)[0], []).append(uri)
+
+        for spreadsheet_id, uris in by_spreadsheet.items():
+            revision = await self.run_blocking(self.get_revision, spreadsheet_id)
+            if revision is None or revision == self._revisions.get(spreadsheet_id):
+                continue
+            self._stats["revision_changes"] += 1
+            self._revisions[spreadsheet_id] = revision
+
+            for uri in uris:
+                if uri not in self._subscribers:
+                    continue
+                try:
+                    content_hash = await self.run_blocking(self._hash, *parse_sheet_uri(uri))
+                except Exception:
+                    self._stats["errors"] += 1
+                    logger.exception("Failed to read %s", uri)
+                    continue
+                if content_hash == self._hashes.get(uri):
+                    continue
+                self._hashes[uri] = content_hash
+                await self._notify(uri)
+
+    async def _notify(self, uri: str) -> None:
+        for session in list(self._subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+                self._stats["notifications"] += 1
+            except Exception:
+                # The session has gone away; drop it rather than retrying forever
+                self._stats["errors"] += 1
+                self._subscribers.get(uri, set()).discard(session)
+        if uri in self._subscribers and not self._subscribers[uri]:
+            self._forget(uri)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return subscription counts and polling/notification counters."""
+        return dict(
+            self._stats,
+            subscribed_uris=len(self._subscribers),
+            sessions=sum(len(sessions) for sessions in self._subscribers.values()),
+            spreadsheets=len(self._revisions),
+            interval_seconds=self.interval
+        )
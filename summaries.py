@@ -0,0 +1,281 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SUMMARY_PERIODS = ("week", "month")
+
+# Summaries kept by SummaryTables: (source model, column dating a row into a
+# week/month, timestamp columns marking an insert or update, summary model).
+# Support reports have no change timestamp; their recent buckets are recomputed instead.
+SUMMARY_SOURCES: Dict[str, Tuple[str, str, Optional[List[str]], str]] = {
+    "attendance": ("DailyAttendanceLog", "Form_Date", ["DOR", "Meal_Confirm_Datetime"], "AttendanceSummary"),
+    "support_reports": ("CenterSupportReport", "Form_Date", None, "SupportReportSummary"),
+    "drdp": ("DRDPRecord", "Submit_Datetime", ["Submit_Datetime", "DOR"], "DRDPSummary"),
+}
+
+# DRDP values that are not ratings: 11 (unable to rate) and 99 (conditional measure)
+DRDP_UNRATED_VALUES = (11, 99)
+
+
+def drdp_domain(measure: str) -> str:
+    """Domain of a DRDP measure column: its name without the trailing number (ATL_REG_1 -> ATL_REG)."""
+    return measure.rsplit("_", 1)[0]
+
+
+CLOCK_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I:%M:%S %p", "%I %p", "%I%p")
+
+
+def period_start(day: date, period: str) -> datetime:
+    """Start of the week (Monday) or month containing `day`."""
+    day = datetime(day.year, day.month, day.day)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(start: datetime, period: str) -> datetime:
+    """Start of the week or month after the one starting at `start`."""
+    if period == "week":
+        return start + timedelta(days=7)
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def parse_clock_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse a time of day such as "09:30", "9:30 AM" or "14:05:00" (None if unparseable)."""
+    if not value:
+        return None
+    text = value.strip().upper()
+    for fmt in CLOCK_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def support_hours(start_time: Optional[str], end_time: Optional[str]) -> Optional[float]:
+    """Hours between a report's start and end times, or None if either is missing or unparseable."""
+    start, end = parse_clock_time(start_time), parse_clock_time(end_time)
+    if start is None or end is None or end <= start:
+        return None
+    return (end - start).total_seconds() / 3600
+
+
+def _as_date(value) -> date:
+    # DATE() returns a date on MySQL and an ISO string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _merge_ranges(ranges: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    merged: List[List[datetime]] = []
+    for lower, upper in sorted(ranges):
+        if merged and lower <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], upper)
+        else:
+            merged.append([lower, upper])
+    return [(lower, upper) for lower, upper in merged]
+
+
+class SummaryTables:
+    """Weekly and monthly summary tables in the local store, updated incrementally.
+
+    A refresh finds the days that have rows inserted or updated since the
+    last refresh (through the source's change timestamps), recomputes just
+    the weeks and months containing those days from daily GROUP BY queries,
+    and replaces those buckets in the summary table. Reads then cost one
+    row per site/room and bucket, however long the raw history is.
+    """
+
+    def __init__(self, watermarks, drdp_columns: List[str], support_lookback_days: int = 14):
+        """
+        Args:
+            watermarks: WatermarkStore holding per-source change cursors
+            drdp_columns: DRDP measure columns, grouped into domains by drdp_domain
+            support_lookback_days: Days before the latest support report whose
+                buckets every refresh recomputes, to catch late or edited reports
+        """
+        self.watermarks = watermarks
+        self.drdp_columns = drdp_columns
+        self.support_lookback_days = support_lookback_days
+        self._lock = threading.Lock()
+
+    def _state_key(self, name: str) -> str:
+        return f"summary:{name}"
+
+    def state(self, name: str) -> Optional[Dict[str, Any]]:
+        """Stored refresh state of one summary (None if never built)."""
+        return self.watermarks.get(self._state_key(name))
+
+    def refresh(self, names: Optional[List[str]] = None, full: bool = False, source: str = "primary") -> Dict[str, Dict[str, Any]]:
+        """Recompute the summary buckets touched since the last refresh.
+
+        Args:
+            names: Summaries to refresh (default: every entry of SUMMARY_SOURCES)
+            full: Rebuild every bucket instead of only touched ones
+            source: Session source to aggregate from ("primary" or "mirror")
+
+        Returns:
+            Per-summary mode, number of week and month buckets rewritten and elapsed seconds
+        """
+        import models
+        from database import get_db_session, get_local_engine
+        from sqlalchemy import func
+
+        results = {}
+        with self._lock:
+            for name in names or list(SUMMARY_SOURCES):
+                model_name, bucket_name, change_names, summary_name = SUMMARY_SOURCES[name]
+                model, summary = getattr(models, model_name), getattr(models, summary_name)
+                summary.__table__.create(bind=get_local_engine(), checkfirst=True)
+                bucket_column = getattr(model, bucket_name)
+                state = None if full else self.state(name)
+                started = time.perf_counter()
+
+                with get_db_session(source) as db:
+                    # Cursors first, so rows changed while aggregating are picked up again next time
+                    cursors = {}
+                    for column_name in change_names or [bucket_name]:
+                        latest = db.query(func.max(getattr(model, column_name))).scalar()
+                        cursors[column_name] = latest.isoformat(sep=" ") if latest else None
+
+                    if state is None:
+                        days = self._all_days(db, bucket_column)
+                    elif change_names is None:
+                        latest = state["cursors"].get(bucket_name)
+                        since = datetime.fromisoformat(latest) - timedelta(days=self.support_lookback_days) if latest else None
+                        days = self._changed_days(db, bucket_column, [(bucket_column, since)])
+                    else:
+                        days = self._changed_days(db, bucket_column, [
+                            (getattr(model, column_name), datetime.fromisoformat(state["cursors"][column_name]) if state["cursors"].get(column_name) else None)
+                            for column_name in change_names
+                        ])
+
+                    buckets = {
+                        period: {period_start(day, period) for day in days}
+                        for period in SUMMARY_PERIODS
+                    }
+                    ranges = _merge_ranges(
+                        (start, period_end(start, period))
+                        for period, starts in buckets.items() for start in starts
+                    )
+                    rows = []
+                    for lower, upper in ranges:
+                        rows.extend(self._aggregate(db, name, model, bucket_column, lower, upper, buckets))
+
+                self._replace_buckets(summary, buckets, rows, replace_all=state is None)
+                self.watermarks.set(self._state_key(name), {
+                    "cursors": cursors,
+                    "refreshed_at": datetime.now().isoformat(sep=" ", timespec="seconds")
+                })
+                results[name] = {
+                    "mode": "full" if state is None else "incremental",
+                    "weeks": len(buckets["week"]),
+                    "months": len(buckets["month"]),
+                    "seconds": round(time.perf_counter() - started, 3)
+                }
+        return results
+
+    def _all_days(self, db, bucket_column) -> Set[date]:
+        from sqlalchemy import func
+
+        return {_as_date(day) for (day,) in db.query(func.date(bucket_column)).filter(bucket_column.isnot(None)).distinct()}
+
+    def _changed_days(self, db, bucket_column, changes: List[Tuple[Any, Optional[datetime]]]) -> Set[date]:
+        """Days (of bucket_column) of rows whose change column is at or after its cursor."""
+        from sqlalchemy import func
+
+        days = set()
+        for column, since in changes:
+            query = db.query(func.date(bucket_column)).filter(bucket_column.isnot(None))
+            # ">=" so rows stamped at the cursor after the last refresh are not missed; recomputing is idempotent.
+            # A column that had no values at the last refresh only counts rows that have one now.
+            query = query.filter(column >= since if since is not None else column.isnot(None))
+            days.update(_as_date(day) for (day,) in query.distinct())
+        return days
+
+    def _aggregate(self, db, name: str, model, bucket_column, lower: datetime, upper: datetime,
+                   buckets: Dict[str, Set[datetime]]) -> List[Dict[str, Any]]:
+        """Summary rows for the touched buckets within [lower, upper), from daily groups."""
+        from sqlalchemy import case, func
+
+        day = func.date(bucket_column)
+        in_range = (bucket_column >= lower, bucket_column < upper)
+        totals: Dict[Tuple, List] = {}
+
+        def add(day_value, key: Tuple, values: List) -> None:
+            for period in SUMMARY_PERIODS:
+                start = period_start(_as_date(day_value), period)
+                if start in buckets[period]:
+                    current = totals.setdefault((period, start) + key, [0] * len(values))
+                    for index, value in enumerate(values):
+                        current[index] += value or 0
+
+        if name == "attendance":
+            query = db.query(
+                day, model.Site_ID, model.Room_ID, func.count(),
+                func.sum(model.Breakfast), func.sum(model.Lunch), func.sum(model.PM_Snack)
+            ).filter(*in_range).group_by(day, model.Site_ID, model.Room_ID)
+            for day_value, site_id, room_id, *values in query:
+                add(day_value, (site_id or "", room_id or ""), values)
+            return [
+                {"Period": period, "Period_Start": start, "Site_ID": site_id, "Room_ID": room_id,
+                 "Log_Count": count, "Breakfast": breakfast, "Lunch": lunch, "PM_Snack": pm_snack}
+                for (period, start, site_id, room_id), (count, breakfast, lunch, pm_snack) in totals.items()
+            ]
+
+        if name == "support_reports":
+            # Start/end times are free-form strings, so hours are computed here rather than in SQL
+            query = db.query(bucket_column, model.Site_ID, model.Start_Time, model.End_Time).filter(*in_range)
+            for form_date, site_id, start_time, end_time in query:
+                hours = support_hours(start_time, end_time)
+                add(form_date, (site_id or "",), [1, 0 if hours is None else 1, hours or 0.0])
+            return [
+                {"Period": period, "Period_Start": start, "Site_ID": site_id,
+                 "Report_Count": count, "Timed_Reports": timed, "Support_Hours": round(hours, 4)}
+                for (period, start, site_id), (count, timed, hours) in totals.items()
+            ]
+
+        # DRDP: per-measure sums and counts of actual ratings, rolled up into domains
+        domains: Dict[str, List[int]] = {}
+        aggregates = []
+        for column_name in self.drdp_columns:
+            column = getattr(model, column_name)
+            rating = case((column.in_(DRDP_UNRATED_VALUES), None), else_=column)
+            domains.setdefault(drdp_domain(column_name), []).append(len(aggregates))
+            aggregates.extend([func.sum(rating), func.count(rating)])
+        query = db.query(day, model.Site_ID, model.Room_ID, func.count(), *aggregates).filter(*in_range)
+        for day_value, site_id, room_id, count, *values in query.group_by(day, model.Site_ID, model.Room_ID):
+            for domain, offsets in domains.items():
+                add(day_value, (site_id or "", room_id or "", domain), [
+                    count,
+                    sum(values[offset] or 0 for offset in offsets),
+                    sum(values[offset + 1] or 0 for offset in offsets)
+                ])
+        return [
+            {"Period": period, "Period_Start": start, "Site_ID": site_id, "Room_ID": room_id, "Domain": domain,
+             "Record_Count": count, "Rating_Sum": rating_sum, "Rating_Count": rating_count}
+            for (period, start, site_id, room_id, domain), (count, rating_sum, rating_count) in totals.items()
+        ]
+
+    def _replace_buckets(self, summary, buckets: Dict[str, Set[datetime]], rows: List[Dict[str, Any]],
+                         replace_all: bool = False) -> None:
+        """Delete the touched buckets (or every bucket) from the summary table and insert the new rows."""
+        from database import bulk_insert, get_local_db_session
+        from sqlalchemy import delete
+
+        with get_local_db_session() as db:
+            if replace_all:
+                db.execute(delete(summary.__table__))
+            for period, starts in buckets.items() if not replace_all else ():
+                starts = sorted(starts)
+                for index in range(0, len(starts), 500):
+                    db.execute(delete(summary.__table__).where(
+                        summary.Period == period, summary.Period_Start.in_(starts[index:index + 500])
+                    ))
+            bulk_insert(db, summary, rows)
+            db.commit()
+
+    def status(self) -> Dict[str, Optional[str]]:
+        """Last refresh time of each summary (None if never built)."""
+        return {name: (self.state(name) or {}).get("refreshed_at") for name in SUMMARY_SOURCES}
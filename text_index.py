@@ -0,0 +1,203 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the their they this to was were "
+    "will with".split()
+)
+
+# (key, {field: text}, metadata) as produced by a document loader
+Document = Tuple[Hashable, Dict[str, Optional[str]], Dict[str, Any]]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens of a text, without stopwords and single characters."""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int = 160) -> str:
+    """Excerpt of `text` around the first occurrence of any of the terms."""
+    text = " ".join(text.split())
+    lowered = text.lower()
+    positions = []
+    for term in terms:
+        match = re.search(rf"\b{re.escape(term)}", lowered)
+        if match:
+            positions.append(match.start())
+    start = max(0, min(positions) - width // 3) if positions else 0
+    snippet = text[start:start + width]
+    return ("..." if start > 0 else "") + snippet + ("..." if start + width < len(text) else "")
+
+
+def best_field(fields: Dict[str, str], terms: Iterable[str]) -> str:
+    """Name of the field containing the most query term occurrences."""
+    terms = set(terms)
+    return max(fields, key=lambda name: sum(token in terms for token in tokenize(fields[name])))
+
+
+class TextIndex:
+    """In-process BM25 inverted index over the text fields of database records.
+
+    The first refresh loads every record; later refreshes compare the
+    record keys in the database with the indexed ones and only load new
+    records (and drop deleted ones), so keeping the index current costs a
+    key scan plus the new rows. Edited records are picked up by a periodic
+    full rebuild (rebuild_seconds).
+    """
+
+    def __init__(self, min_refresh_seconds: float = 60, rebuild_seconds: Optional[float] = 86400,
+                 k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            min_refresh_seconds: Minimum seconds between refreshes against the database
+            rebuild_seconds: Seconds after which a refresh reloads every record (None never)
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.min_refresh_seconds = min_refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        self._docs: Dict[Hashable, Tuple[Dict[str, str], Dict[str, Any]]] = {}
+        self._total_length = 0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def refresh(
+        self,
+        list_keys: Callable[[], Iterable[Hashable]],
+        load_documents: Callable[[List[Hashable]], Iterable[Document]],
+        force: bool = False
+    ) -> Optional[Dict[str, int]]:
+        """Bring the index up to date with the records in the database.
+
+        Args:
+            list_keys: Returns the keys of all current records
+            load_documents: Loads the documents for a list of keys
+            force: Refresh even if the last refresh was within min_refresh_seconds
+
+        Returns:
+            {"added": n, "removed": m}, or None if the index was fresh enough
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at and now - self._refreshed_at < self.min_refresh_seconds:
+                return None
+            keys = set(list_keys())
+            rebuild = not self._built_at or (self.rebuild_seconds is not None and now - self._built_at >= self.rebuild_seconds)
+            removed = [key for key in self._docs if key not in keys]
+            for key in removed:
+                self.remove(key)
+            to_load = list(keys) if rebuild else [key for key in keys if key not in self._docs]
+            added = 0
+            for key, fields, meta in load_documents(to_load) if to_load else []:
+                self.add(key, fields, meta)
+                added += 1
+            self._refreshed_at = now
+            if rebuild:
+                self._built_at = now
+            return {"added": added, "removed": len(removed)}
+
+    def add(self, key: Hashable, fields: Dict[str, Optional[str]], meta: Dict[str, Any]) -> None:
+        """Index (or re-index) one record's text fields."""
+        with self._lock:
+            if key in self._docs:
+                self.remove(key)
+            fields = {name: value for name, value in fields.items() if value}
+            terms = Counter(token for value in fields.values() for token in tokenize(value))
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[key] = count
+            self._doc_terms[key] = terms
+            length = sum(terms.values())
+            self._doc_lengths[key] = length
+            self._total_length += length
+            self._docs[key] = (fields, meta)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a record from the index."""
+        with self._lock:
+            terms = self._doc_terms.pop(key, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings[term]
+                del postings[key]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(key)
+            del self._docs[key]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """Rank records against a free-text query with BM25.
+
+        Args:
+            query: Search words (any of them may match)
+            limit: Maximum number of hits
+            predicate: Optional filter on a record's metadata
+
+        Returns:
+            Hits, best first, each with key, score, meta, the best matching
+            field and a snippet of it
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            count = len(self._docs)
+            if not terms or not count:
+                return []
+            average_length = self._total_length / count or 1
+            scores: Dict[Hashable, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[key] / average_length)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            hits = []
+            for key, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+                fields, meta = self._docs[key]
+                if predicate is not None and not predicate(meta):
+                    continue
+                field = best_field(fields, terms)
+                hits.append({
+                    "key": key,
+                    "score": round(score, 4),
+                    "meta": meta,
+                    "field": field,
+                    "snippet": make_snippet(fields[field], terms)
+                })
+                if len(hits) >= limit:
+                    break
+            return hits
+
+    def stats(self) -> Dict[str, Any]:
+        """Return document and term counts and refresh ages."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "refreshed_seconds_ago": round(now - self._refreshed_at, 1) if self._refreshed_at else None,
+                "built_seconds_ago": round(now - self._built_at, 1) if self._built_at else None
+            }
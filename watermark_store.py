@@ -0,0 +1,89 @@
+import contextlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single worker only
+    fcntl = None
+
+
+@contextlib.contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on `path`.lock, shared by every process using the file.
+
+    Worker processes each keep their own copy of a JSON store; taking this
+    lock around re-read, update and save keeps one worker from overwriting
+    another's changes.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def file_version(path: str) -> Optional[Tuple[int, int]]:
+    """(inode, mtime) of `path`, which changes on every atomic-rename save (None if missing)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class WatermarkStore:
+    """Small JSON-file store of named watermarks for incremental syncs.
+
+    Each key maps to a JSON-serializable value (e.g. the last seen timestamp
+    and IDs for one form or table). Writes go through a temp file and an
+    atomic rename so a crash never leaves a half-written file. Several worker
+    processes can share one file: reads pick up other workers' saves, and
+    writes re-read and merge under a file lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._version: Optional[Tuple[int, int]] = None
+        self._reload()
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            self._reload()
+            return self._data.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock, file_lock(self.path):
+            self._reload()
+            self._data[key] = value
+            self._save()
+
+    def delete(self, key: str) -> None:
+        with self._lock, file_lock(self.path):
+            self._reload()
+            if self._data.pop(key, None) is not None:
+                self._save()
+
+    def _reload(self) -> None:
+        # Only parse the file when another process has saved it since it was last read
+        version = file_version(self.path)
+        if version is not None and version != self._version:
+            with open(self.path, 'r') as fh:
+                self._data = json.load(fh)
+                stat = os.fstat(fh.fileno())
+            self._version = (stat.st_ino, stat.st_mtime_ns)
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(self._data, fh, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+        self._version = file_version(self.path)